@@ -29,8 +29,10 @@ import json
 import ipaddress
 
 from collections import defaultdict
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from sdcm.sct_events import Severity
-from typing import List, Optional, Dict, Union, Set
+from typing import List, Optional, Dict, Union, Set, Tuple, Iterator
 from textwrap import dedent
 from datetime import datetime
 from functools import cached_property, wraps
@@ -59,13 +61,14 @@ from sdcm import wait, mgmt
 from sdcm.utils import alternator
 from sdcm.utils.common import deprecation, get_data_dir_path, verify_scylla_repo_file, S3Storage, get_my_ip, \
     get_latest_gemini_version, normalize_ipv6_url, download_dir_from_cloud, generate_random_string, ScyllaCQLSession, \
-    SCYLLA_YAML_PATH, get_test_name
+    SCYLLA_YAML_PATH, get_test_name, ParallelObject, wait_for_schema_agreement_in_session, SCHEMA_AGREEMENT_TIMEOUT
+from sdcm.utils.backtrace import DecodedBacktracesCache, get_backtrace_addresses
 from sdcm.utils.distro import Distro
 from sdcm.utils.docker_utils import ContainerManager, NotFound
 
-from sdcm.utils.health_checker import check_nodes_status, check_node_status_in_gossip_and_nodetool_status, \
-    check_schema_version, check_nulls_in_peers, check_schema_agreement_in_gossip_and_peers, \
-    CHECK_NODE_HEALTH_RETRIES, CHECK_NODE_HEALTH_RETRY_DELAY
+from sdcm.utils.health_checker import check_nodes_status, check_node_health_info, \
+    check_schema_agreement_in_gossip_and_peers, get_cluster_members, parse_gossip_endpoints, peers_rows_to_details, \
+    NodeHealthInfo, CHECK_NODE_HEALTH_RETRIES, CHECK_NODE_HEALTH_RETRY_DELAY, PEERS_INFO_COLUMNS
 from sdcm.utils.decorators import retrying, log_run_info
 from sdcm.utils.get_username import get_username
 from sdcm.utils.remotewebbrowser import WebDriverContainerMixin
@@ -73,7 +76,7 @@ from sdcm.utils.version_utils import SCYLLA_VERSION_RE, BUILD_ID_RE, get_gemini_
 from sdcm.sct_events.base import LogEvent
 from sdcm.sct_events.health import ClusterHealthValidatorEvent
 from sdcm.sct_events.system import TestFrameworkEvent
-from sdcm.sct_events.database import SYSTEM_ERROR_EVENTS_PATTERNS, BACKTRACE_RE
+from sdcm.sct_events.database import SYSTEM_ERROR_EVENTS_PATTERNS, SYSTEM_LOG_SCANNER, BACKTRACE_RE
 from sdcm.sct_events.grafana import set_grafana_url
 from sdcm.sct_events.decorators import raise_event_on_failure
 from sdcm.utils.auto_ssh import AutoSshContainerMixin
@@ -82,6 +85,7 @@ from sdcm.logcollector import GrafanaSnapshot, GrafanaScreenShot, PrometheusSnap
 from sdcm.utils.ldap import LDAP_SSH_TUNNEL_LOCAL_PORT, LDAP_BASE_OBJECT, LDAP_PASSWORD, LDAP_USERS, LDAP_ROLE
 from sdcm.utils.remote_logger import get_system_logging_thread
 from sdcm.utils.scylla_args import ScyllaArgParser
+from sdcm.utils.topology_cache import TopologyCache
 from sdcm.utils.file import File
 from sdcm.utils import cdc
 from sdcm.coredump import CoredumpExportSystemdThread
@@ -102,6 +106,15 @@ INSTALL_DIR = f"/home/{TEST_USER}/scylladb"
 
 INSTANCE_PROVISION_ON_DEMAND = 'on_demand'
 SPOT_TERMINATION_CHECK_DELAY = 5
+SYSTEM_LOG_READ_CHUNK_SIZE = 4 * 1024 * 1024  # bytes
+BACKTRACE_DECODING_WORKERS = 4
+BACKTRACE_DECODING_BATCH_SIZE = 32  # backtraces decoded by one remote command
+CQL_HEALTH_CHECK_TIMEOUT = 10  # seconds; to connect and to read system.peers by CQL driver, cqlsh is used if it fails
+CHECK_NODE_HEALTH_COMMAND_TIMEOUT = 60  # seconds; one attempt of a remote call of the health check can't take more
+CHECK_NODE_HEALTH_INFO_RETRY_DELAY = 5  # seconds
+CHECK_NODE_HEALTH_INFO_TIMEOUT = 300  # seconds; shared by all remote calls of BaseNode.get_health_info() and retries
+SCHEMA_AGREEMENT_MIN_CHECK_INTERVAL = 0.5  # seconds
+SCHEMA_AGREEMENT_MAX_CHECK_INTERVAL = 10  # seconds
 
 LOGGER = logging.getLogger(__name__)
 
@@ -420,7 +433,7 @@ class BaseNode(AutoSshContainerMixin, WebDriverContainerMixin):  # pylint: disab
         self._short_hostname = None
         self._alert_manager: Optional[PrometheusAlertManagerListener] = None
 
-        self._system_log_errors_index = []
+        self._system_log_errors_index = set()
         self._exclude_system_log_from_being_logged = [
             ' !INFO    | sshd[',
             ' !INFO    | systemd:',
@@ -504,6 +517,7 @@ class BaseNode(AutoSshContainerMixin, WebDriverContainerMixin):  # pylint: disab
     def refresh_ip_address(self):
         # Invalidate ip address cache
         self._private_ip_address_cached = self._public_ip_address_cached = self._ipv6_ip_address_cached = None
+        self.parent_cluster.topology_cache.invalidate()
 
         if self.ssh_login_info["hostname"] == self.external_address:
             return
@@ -1358,117 +1372,136 @@ class BaseNode(AutoSshContainerMixin, WebDriverContainerMixin):  # pylint: disab
         # pylint: disable=too-many-branches,too-many-locals,too-many-statements
 
         backtraces = []
-        index = 0
 
         if not os.path.exists(self.system_log):
             return
 
         if start_from_beginning:
-            start_search_from_byte = 0
-            last_line_no = 0
+            position = 0
+            index = 0
         else:
-            start_search_from_byte = self.last_log_position
-            last_line_no = self.last_line_no
-
-        with open(self.system_log, 'r') as db_file:
-            if start_search_from_byte:
-                db_file.seek(start_search_from_byte)
-            for index, line in enumerate(db_file, start=last_line_no):
-                json_log = None
-                if line[0] == '{':
-                    try:
-                        json_log = json.loads(line)
-                    except Exception:
-                        pass
-                if not start_from_beginning and Setup.RSYSLOG_ADDRESS:
-                    line = line.strip()
-                    if not exclude_from_logging:
-                        LOGGER.debug(line)
-                    else:
-                        exclude = False
-                        for pattern in exclude_from_logging:
-                            if pattern in line:
-                                exclude = True
-                                break
-                        if not exclude:
-                            LOGGER.debug(line)
-                if json_log:
-                    continue
-                match = BACKTRACE_RE.search(line)
-                one_line_backtrace = []
-                if match and backtraces:
-                    data = match.groupdict()
-                    if data['other_bt']:
-                        backtraces[-1]['backtrace'] += [data['other_bt'].strip()]
-                    if data['scylla_bt']:
-                        backtraces[-1]['backtrace'] += [data['scylla_bt'].strip()]
-                elif "backtrace:" in line.lower() and "0x" in line:
-                    # This part handles the backtrases are printed in one line.
-                    # Example:
-                    # [shard 2] seastar - Exceptional future ignored: exceptions::mutation_write_timeout_exception
-                    # (Operation timed out for system.paxos - received only 0 responses from 1 CL=ONE.),
-                    # backtrace:   0x3316f4d#012  0x2e2d177#012  0x189d397#012  0x2e76ea0#012  0x2e770af#012
-                    # 0x2eaf065#012  0x2ebd68c#012  0x2e48d5d#012  /opt/scylladb/libreloc/libpthread.so.0+0x94e1#012
-                    splitted_line = re.split("backtrace:", line, flags=re.IGNORECASE)
-                    for trace_line in splitted_line[1].split():
-                        if trace_line.startswith('0x') or 'scylladb/lib' in trace_line:
-                            one_line_backtrace.append(trace_line)
-
-                if index not in self._system_log_errors_index or start_from_beginning:
-                    # for each line use all regexes to match, and if found send an event
-                    for pattern, event in SYSTEM_ERROR_EVENTS_PATTERNS:
-                        match = pattern.search(line)
-                        if match:
-                            self._system_log_errors_index.append(index)
-                            cloned_event = event.clone().add_info(node=self, line_number=index, line=line)
-                            backtraces.append(dict(event=cloned_event, backtrace=[]))
-                            break  # Stop iterating patterns to avoid creating two events for one line of the log
-
-                if one_line_backtrace and backtraces:
-                    backtraces[-1]['backtrace'] = one_line_backtrace
+            position = self.last_log_position
+            index = self.last_line_no
 
-            if not start_from_beginning:
-                self.last_line_no = index if index else last_line_no
-                self.last_log_position = db_file.tell() + 1
+        log_lines = not start_from_beginning and Setup.RSYSLOG_ADDRESS
 
-        traces_count = 0
-        for backtrace in backtraces:
-            backtrace['event'].raw_backtrace = "\n".join(backtrace['backtrace'])
-            if backtrace['event'].type == 'BACKTRACE':
-                traces_count += 1
-
-        # A filter function to attach the backtrace to the correct error and not to the backtraces.
-        # If the error is within 10 lines and the last isn't backtrace type, the backtrace would be
-        # appended to the previous error.
-        def filter_backtraces(backtrace):
-            last_error = filter_backtraces.last_error
-            try:
-                if (last_error and
-                        backtrace['event'].line_number <= filter_backtraces.last_error.line_number + 20
-                        and not filter_backtraces.last_error.type == 'BACKTRACE' and backtrace['event'].type == 'BACKTRACE'):
-                    last_error.raw_backtrace = "\n".join(backtrace['backtrace'])
-                    backtrace['event'].dont_publish()
-                    return False
-                return True
-            finally:
-                filter_backtraces.last_error = backtrace['event']
-
-        # support interlaced reactor stalled
-        for _ in range(traces_count):
-            filter_backtraces.last_error = None
-            backtraces = list(filter(filter_backtraces, backtraces))
+        def process_line(index: int, line: str) -> None:
+            if line[0] == '{':
+                try:
+                    json.loads(line)
+                    return
+                except Exception:  # pylint: disable=broad-except
+                    pass
+            if log_lines:
+                line = line.strip()
+            match = BACKTRACE_RE.search(line)
+            one_line_backtrace = []
+            if match and backtraces:
+                data = match.groupdict()
+                if data['other_bt']:
+                    backtraces[-1]['backtrace'] += [data['other_bt'].strip()]
+                if data['scylla_bt']:
+                    backtraces[-1]['backtrace'] += [data['scylla_bt'].strip()]
+            elif "backtrace:" in line.lower() and "0x" in line:
+                # This part handles the backtrases are printed in one line.
+                # Example:
+                # [shard 2] seastar - Exceptional future ignored: exceptions::mutation_write_timeout_exception
+                # (Operation timed out for system.paxos - received only 0 responses from 1 CL=ONE.),
+                # backtrace:   0x3316f4d#012  0x2e2d177#012  0x189d397#012  0x2e76ea0#012  0x2e770af#012
+                # 0x2eaf065#012  0x2ebd68c#012  0x2e48d5d#012  /opt/scylladb/libreloc/libpthread.so.0+0x94e1#012
+                splitted_line = re.split("backtrace:", line, flags=re.IGNORECASE)
+                for trace_line in splitted_line[1].split():
+                    if trace_line.startswith('0x') or 'scylladb/lib' in trace_line:
+                        one_line_backtrace.append(trace_line)
+
+            if index not in self._system_log_errors_index or start_from_beginning:
+                # for each line use all regexes to match, and if found send an event
+                for pattern, event in SYSTEM_ERROR_EVENTS_PATTERNS:
+                    if pattern.search(line):
+                        self._system_log_errors_index.add(index)
+                        cloned_event = event.clone().add_info(node=self, line_number=index, line=line)
+                        backtraces.append(dict(event=cloned_event, backtrace=[]))
+                        break  # Stop iterating patterns to avoid creating two events for one line of the log
+
+            if one_line_backtrace and backtraces:
+                backtraces[-1]['backtrace'] = one_line_backtrace
+
+        def log_line(line: str) -> None:
+            line = line.strip()
+            if not exclude_from_logging or not any(pattern in line for pattern in exclude_from_logging):
+                LOGGER.debug(line)
+
+        # Read the log by big chunks of complete lines and process only lines found by the scanner.
+        # An incomplete last line is left for the next call unless the log is read from the beginning.
+        with open(self.system_log, 'rb') as db_file:
+            db_file.seek(position)
+            tail = b""
+            while True:
+                chunk = db_file.read(SYSTEM_LOG_READ_CHUNK_SIZE)
+                if chunk:
+                    data = tail + chunk
+                    if not (end := data.rfind(b"\n") + 1):
+                        tail = data
+                        continue
+                    data, tail = data[:end], data[end:]
+                elif tail and start_from_beginning:
+                    data, tail = tail + b"\n", b""
+                else:
+                    break
+                position += len(data)
+
+                if log_lines and LOGGER.isEnabledFor(logging.DEBUG):
+                    for line in data.decode("utf-8", errors="replace").splitlines():
+                        log_line(line)
+
+                line_end = 0
+                for line_start in SYSTEM_LOG_SCANNER.find_lines(data):
+                    index += data.count(b"\n", line_end, line_start)
+                    line_end = data.index(b"\n", line_start) + 1
+                    process_line(index=index, line=data[line_start:line_end].decode("utf-8", errors="replace"))
+                    index += 1
+                index += data.count(b"\n", line_end)
 
+            if not start_from_beginning:
+                self.last_line_no = index
+                self.last_log_position = position
+
+        # Attach backtraces to the correct error and not to the previous backtraces: a run of backtraces which
+        # starts within 20 lines after an error is attached to it (the last one wins) and is not published.
+        # Consecutive backtraces out of this range are published as separate events, as well as interlaced ones.
+        last_error = None
+        filtered_backtraces = []
         for backtrace in backtraces:
-            if Setup.BACKTRACE_DECODING and backtrace["event"].raw_backtrace:
-                scylla_debug_info = self.get_scylla_debuginfo_file()
-                self.log.debug("Debug info file %s", scylla_debug_info)
-                Setup.DECODING_QUEUE.put({
-                    "node": self,
-                    "debug_file": scylla_debug_info,
-                    "event": backtrace["event"],
-                })
+            event = backtrace["event"]
+            event.raw_backtrace = "\n".join(backtrace["backtrace"])
+            if event.type == "BACKTRACE":
+                if last_error and event.line_number <= last_error.line_number + 20:
+                    last_error.raw_backtrace = event.raw_backtrace
+                    event.dont_publish()
+                    continue
+                last_error = None
+            else:
+                last_error = event
+            filtered_backtraces.append(event)
+
+        # Same backtraces are decoded once: the decoding thread sets the decoded backtrace to all duplicates.
+        unique_backtraces = {}
+        for event in filtered_backtraces:
+            if not Setup.BACKTRACE_DECODING or not event.raw_backtrace:
+                event.publish()
+            elif (fingerprint := get_backtrace_addresses(event.raw_backtrace)) in unique_backtraces:
+                unique_backtraces[fingerprint]["duplicates"].append(event)
             else:
-                backtrace["event"].publish()
+                unique_backtraces[fingerprint] = {"node": self, "event": event, "duplicates": []}
+        if unique_backtraces:
+            scylla_debug_info = self.get_scylla_debuginfo_file()
+            self.log.debug("Debug info file %s", scylla_debug_info)
+            for obj in unique_backtraces.values():
+                if obj["duplicates"]:
+                    self.log.debug("Found %s same backtraces, first one at line %s:\n%s",
+                                   len(obj["duplicates"]) + 1, obj["event"].line_number, obj["event"].raw_backtrace)
+                obj["debug_file"] = scylla_debug_info
+                Setup.DECODING_QUEUE.put(obj)
 
     def start_decode_on_monitor_node_thread(self):
         self._decoding_backtraces_thread = threading.Thread(
@@ -1476,32 +1509,86 @@ class BaseNode(AutoSshContainerMixin, WebDriverContainerMixin):  # pylint: disab
         self._decoding_backtraces_thread.daemon = True
         self._decoding_backtraces_thread.start()
 
-    def decode_backtrace(self):
-        scylla_debug_file = None
-        while True:
-            event = None
-            obj = None
-            try:
-                obj = Setup.DECODING_QUEUE.get(timeout=5)
+    def _get_backtraces_to_decode(self) -> Tuple[list, bool]:
+        """Get up to BACKTRACE_DECODING_BATCH_SIZE items from the decoding queue.
+
+        Return the items and True if the end of the queue was reached.
+        """
+
+        batch = []
+        try:
+            obj = Setup.DECODING_QUEUE.get(timeout=5)
+            while True:
+                Setup.DECODING_QUEUE.task_done()
                 if obj is None:
-                    Setup.DECODING_QUEUE.task_done()
+                    return batch, True
+                batch.append(obj)
+                if len(batch) >= BACKTRACE_DECODING_BATCH_SIZE:
                     break
-                event = obj["event"]
-                if not scylla_debug_file:
-                    scylla_debug_file = self.copy_scylla_debug_info(obj["node"], obj["debug_file"])
-                output = self.decode_raw_backtrace(scylla_debug_file, " ".join(event.raw_backtrace.split('\n')))
-                event.backtrace = output.stdout
-                Setup.DECODING_QUEUE.task_done()
-            except queue.Empty:
-                pass
-            except Exception as details:  # pylint: disable=broad-except
-                self.log.error("failed to decode backtrace %s", details)
-            finally:
-                if event:
-                    event.publish()
+                obj = Setup.DECODING_QUEUE.get_nowait()
+        except queue.Empty:
+            pass
+        return batch, False
 
-            if self.termination_event.isSet() and Setup.DECODING_QUEUE.empty():
-                break
+    def decode_backtrace(self):
+        scylla_debug_files = {}
+        decoded_backtraces = DecodedBacktracesCache()
+        with ThreadPoolExecutor(max_workers=BACKTRACE_DECODING_WORKERS,
+                                thread_name_prefix="DecodeOnMonitorNodeWorker") as executor:
+            while True:
+                batch, end_of_queue = self._get_backtraces_to_decode()
+                events_by_debug_file = defaultdict(list)
+                for obj in batch:
+                    try:
+                        if obj["debug_file"] not in scylla_debug_files:
+                            scylla_debug_files[obj["debug_file"]] = \
+                                self.copy_scylla_debug_info(obj["node"], obj["debug_file"])
+                        events_by_debug_file[scylla_debug_files[obj["debug_file"]]].extend(
+                            [obj["event"], *obj.get("duplicates", ())])
+                    except Exception as details:  # pylint: disable=broad-except
+                        self.log.error("failed to decode backtrace %s", details)
+                        for event in (obj["event"], *obj.get("duplicates", ())):
+                            event.publish()
+                for scylla_debug_file, events in events_by_debug_file.items():
+                    executor.submit(self._decode_backtraces_and_publish_events,
+                                    scylla_debug_file=scylla_debug_file,
+                                    events=events,
+                                    decoded_backtraces=decoded_backtraces)
+                if end_of_queue or self.termination_event.isSet() and Setup.DECODING_QUEUE.empty():
+                    break
+
+    def _decode_backtraces_and_publish_events(self,
+                                              scylla_debug_file: str,
+                                              events: list,
+                                              decoded_backtraces: DecodedBacktracesCache) -> None:
+        """Decode all backtraces not found in the cache by one remote command and publish the events.
+
+        Fallback to decoding of the backtraces one by one if the output of the command can't be split.
+        """
+
+        backtraces = [get_backtrace_addresses(event.raw_backtrace) for event in events]
+        try:
+            raw_backtraces = {}
+            for event, addresses in zip(events, backtraces):
+                if decoded_backtraces.get(scylla_debug_file, addresses) is None:
+                    raw_backtraces.setdefault(addresses, " ".join(event.raw_backtrace.split("\n")))
+            if len(raw_backtraces) > 1:
+                unique_addresses = dict.fromkeys(itertools.chain.from_iterable(raw_backtraces))
+                output = self.decode_raw_backtrace(scylla_debug_file, " ".join(unique_addresses))
+                if decoded_backtraces.put_batch(scylla_debug_file, list(raw_backtraces), output.stdout):
+                    raw_backtraces.clear()
+                else:
+                    self.log.debug("Failed to split decoded backtraces, decode them one by one")
+            for addresses, raw_backtrace in raw_backtraces.items():
+                output = self.decode_raw_backtrace(scylla_debug_file, raw_backtrace)
+                decoded_backtraces.put(scylla_debug_file, addresses, output.stdout)
+        except Exception as details:  # pylint: disable=broad-except
+            self.log.error("failed to decode backtrace %s", details)
+        finally:
+            for event, addresses in zip(events, backtraces):
+                if (backtrace := decoded_backtraces.get(scylla_debug_file, addresses)) is not None:
+                    event.backtrace = backtrace
+                event.publish()
 
     def copy_scylla_debug_info(self, node, debug_file):
         """Copy scylla debug file from db-node to monitor-node
@@ -1520,7 +1607,7 @@ class BaseNode(AutoSshContainerMixin, WebDriverContainerMixin):  # pylint: disab
         final_scylla_debug_file = os.path.join("/tmp", base_scylla_debug_file)
 
         if not os.path.exists(transit_scylla_debug_file):
-            node.remoter.receive_files(debug_file, transit_scylla_debug_file)
+            node.remoter.receive_files(debug_file, transit_scylla_debug_file, chunked=True)
         res = self.remoter.run(
             "test -f {}".format(final_scylla_debug_file), ignore_status=True, verbose=False)
         if res.exited != 0:
@@ -2591,28 +2678,10 @@ class BaseNode(AutoSshContainerMixin, WebDriverContainerMixin):  # pylint: disab
         for retry_n in range(1, retries+1):
             LOGGER.debug("Check the health of the node `%s' [attempt #%d]", self.name, retry_n)
 
-            nodes_status = self.get_nodes_status()
-            peers_details = self.get_peers_info() or {}
-            gossip_info = self.get_gossip_info() or {}
-
-            events = itertools.chain(
-                check_nodes_status(
-                    nodes_status=nodes_status,
-                    current_node=self,
-                    removed_nodes_list=self.parent_cluster.dead_nodes_ip_address_list),
-                check_node_status_in_gossip_and_nodetool_status(
-                    gossip_info=gossip_info,
-                    nodes_status=nodes_status,
-                    current_node=self),
-                check_schema_version(
-                    gossip_info=gossip_info,
-                    peers_details=peers_details,
-                    nodes_status=nodes_status,
-                    current_node=self),
-                check_nulls_in_peers(
-                    gossip_info=gossip_info,
-                    peers_details=peers_details,
-                    current_node=self), )
+            events = check_node_health_info(
+                current_node=self,
+                health_info=self.get_health_info(),
+                removed_nodes_list=self.parent_cluster.dead_nodes_ip_address_list)
 
             event = next(events, None)
             if event is None:
@@ -2631,10 +2700,44 @@ class BaseNode(AutoSshContainerMixin, WebDriverContainerMixin):  # pylint: disab
                          CHECK_NODE_HEALTH_RETRY_DELAY, self.name)
             time.sleep(CHECK_NODE_HEALTH_RETRY_DELAY)
 
-    def get_nodes_status(self):
+    def get_health_info(self, timeout: float = CHECK_NODE_HEALTH_INFO_TIMEOUT, session=None) -> NodeHealthInfo:
+        """Get views of the cluster from the node in `timeout' seconds, each remote call gets the time which is left.
+
+        `session' is a CQL session to the cluster which can be shared by health checks of all nodes.
+        """
+        end_time = time.perf_counter() + timeout
+        nodes_status = self.get_nodes_status(timeout=timeout)
+        peers_details = self.get_peers_info(timeout=end_time - time.perf_counter(), session=session)
+        gossip_info = self.get_gossip_info(timeout=end_time - time.perf_counter())
+        return NodeHealthInfo(nodes_status=nodes_status,
+                              peers_details=peers_details or {},
+                              gossip_info=gossip_info or {})
+
+    def _retry_health_info_call(self, func, timeout: float, **kwargs):
+        """Retry `func(**kwargs)' until it succeeds or `timeout' seconds are over and raise the last error then.
+
+        Each attempt gets the time which is left as `timeout' argument, but not more than one command can take.
+        """
+        end_time = time.perf_counter() + timeout
+        while (timeout := end_time - time.perf_counter()) > 0:
+            try:
+                return func(timeout=min(timeout, CHECK_NODE_HEALTH_COMMAND_TIMEOUT), **kwargs)
+            except Exception as exc:  # pylint: disable=broad-except
+                if end_time - time.perf_counter() <= CHECK_NODE_HEALTH_INFO_RETRY_DELAY:
+                    raise
+                self.log.debug("%s failed, retry in %s seconds: %s", func.__name__, CHECK_NODE_HEALTH_INFO_RETRY_DELAY,
+                               exc)
+            time.sleep(CHECK_NODE_HEALTH_INFO_RETRY_DELAY)
+        raise TimeoutError(f"No time left to run {func.__name__}")
+
+    def get_nodes_status(self, timeout: float = CHECK_NODE_HEALTH_INFO_TIMEOUT):
+        def nodetool_status(timeout):
+            return self.parent_cluster.parse_nodetool_status(
+                self.run_nodetool('status', timeout=timeout, verbose=False).stdout)
+
         nodes_status = {}
         try:
-            statuses = self.parent_cluster.get_nodetool_status(verification_node=self)
+            statuses = self._retry_health_info_call(nodetool_status, timeout=timeout)
 
             for dc, dc_status in statuses.items():
                 for node_ip, node_properties in dc_status.items():
@@ -2648,10 +2751,41 @@ class BaseNode(AutoSshContainerMixin, WebDriverContainerMixin):  # pylint: disab
             ).publish()
         return nodes_status
 
-    @retrying(n=5, sleep_time=5, raise_on_exceeded=False)
-    def get_peers_info(self):
+    def get_peers_info(self, timeout: float = CHECK_NODE_HEALTH_INFO_TIMEOUT, session=None):
+        """Read system.peers of the node or return None if it's failed in `timeout' seconds.
+
+        The query is run by `session' if it's given and connected to the node, or by an exclusive CQL connection,
+        and by cqlsh if CQL driver fails.
+        """
+        try:
+            return self._retry_health_info_call(self._get_peers_info, timeout=timeout, session=session)
+        except Exception as exc:  # pylint: disable=broad-except
+            self.log.warning("Unable to get system.peers: %s", exc)
+            return None
+
+    def _get_peers_info(self, timeout: float, session=None):
+        end_time = time.perf_counter() + timeout
+        query = f"SELECT peer, {', '.join(PEERS_INFO_COLUMNS)} FROM system.peers"
+        try:
+            if session is not None:
+                host = next((host for host in session.cluster.metadata.all_hosts()
+                             if host.endpoint.address == self.external_address), None)
+                if host is None:
+                    raise ValueError(f"CQL session is not connected to {self.external_address}")
+                return peers_rows_to_details(
+                    session.execute(query, host=host, timeout=min(CQL_HEALTH_CHECK_TIMEOUT, timeout)))
+            with self.parent_cluster.cql_connection_exclusive(
+                    self, connect_timeout=min(CQL_HEALTH_CHECK_TIMEOUT, timeout), verbose=False) as exclusive:
+                return peers_rows_to_details(exclusive.execute(
+                    query, timeout=min(CQL_HEALTH_CHECK_TIMEOUT, max(end_time - time.perf_counter(), 1))))
+        except Exception as exc:  # pylint: disable=broad-except
+            self.log.debug("Unable to get system.peers using CQL driver, fallback to cqlsh: %s", exc)
+
+        # cqlsh gets 30 seconds more than its request timeout to finish, see run_cqlsh().
+        cqlsh_timeout = max(int(end_time - time.perf_counter()) - 30, 1)
         cql_result = self.run_cqlsh('select peer, data_center, host_id, rack, release_version, '
                                     'rpc_address, schema_version, supported_features from system.peers',
+                                    timeout=cqlsh_timeout, connect_timeout=CQL_HEALTH_CHECK_TIMEOUT,
                                     split=True, verbose=False)
         # peer | data_center | host_id | rack | release_version | rpc_address | schema_version | supported_features
         # ------+-------------+---------+------+-----------------+-------------+----------------+--------------------
@@ -2678,9 +2812,26 @@ class BaseNode(AutoSshContainerMixin, WebDriverContainerMixin):  # pylint: disab
 
         return peers_details
 
-    @retrying(n=5, sleep_time=10, raise_on_exceeded=False)
-    def get_gossip_info(self):
-        gossip_info = self.run_nodetool('gossipinfo', verbose=False)
+    def get_gossip_info(self, timeout: float = CHECK_NODE_HEALTH_INFO_TIMEOUT):
+        """Get gossip info of the node or return None if it's failed in `timeout' seconds."""
+        try:
+            return self._retry_health_info_call(self._get_gossip_info, timeout=timeout)
+        except Exception as exc:  # pylint: disable=broad-except
+            self.log.warning("Unable to get gossip info: %s", exc)
+            return None
+
+    def _get_gossip_info(self, timeout: float):
+        end_time = time.perf_counter() + timeout
+        try:
+            result = self.remoter.run(
+                "curl -s --fail -X GET --header 'Accept: application/json' "
+                "http://127.0.0.1:10000/failure_detector/endpoints",
+                timeout=timeout / 2, verbose=False)  # leave the rest of the time to nodetool
+            return parse_gossip_endpoints(json.loads(result.stdout))
+        except Exception as exc:  # pylint: disable=broad-except
+            self.log.debug("Unable to get gossip info using REST API, fallback to nodetool: %s", exc)
+
+        gossip_info = self.run_nodetool('gossipinfo', timeout=max(end_time - time.perf_counter(), 1), verbose=False)
         gossip_node_schemas = {}
         schema = ip = status = dc = ''
         for line in gossip_info.stdout.split():
@@ -2957,6 +3108,22 @@ class BaseCluster:  # pylint: disable=too-many-instance-attributes,too-many-publ
                 pass
         return results
 
+    def run_on_all(self, cmd: str, node_list: Optional[list] = None, timeout: Optional[float] = None,
+                   verbose: bool = True) -> Iterator[tuple]:
+        """Run same command on each node and yield (node, result, exception) tuples as commands complete.
+
+        When all nodes use same type of remoter it runs the commands in the cheapest way the remoter supports,
+        e.g., libssh2 remoter multiplexes them over persistent sessions from a single thread.
+        Exit status is not checked, use `result.ok'.
+        """
+        if node_list is None:
+            node_list = self.nodes
+        nodes = {node.remoter: node for node in node_list}
+        remoter_classes = {type(remoter) for remoter in nodes}
+        remoter_class = remoter_classes.pop() if len(remoter_classes) == 1 else RemoteCmdRunnerBase
+        for remoter, result, exc in remoter_class.run_on_all(list(nodes), cmd, timeout=timeout, verbose=verbose):
+            yield nodes[remoter], result, exc
+
     def get_backtraces(self):
         for node in self.nodes:
             try:
@@ -3011,6 +3178,7 @@ class BaseCluster:  # pylint: disable=too-many-instance-attributes,too-many-publ
             self.dead_nodes_ip_address_list.add(node.ip_address)
         if node in self.nodes:
             self.nodes.remove(node)
+        self.topology_cache.invalidate()
         node.destroy()
 
     def get_db_auth(self):
@@ -3039,13 +3207,12 @@ class BaseCluster:  # pylint: disable=too-many-instance-attributes,too-many-publ
             if hasattr(node, "set_keep_alive"):
                 node.set_keep_alive()
 
+    @cached_property
+    def topology_cache(self) -> TopologyCache:
+        return TopologyCache()
+
     def get_node_by_ip(self, node_ip, datacenter=None):
-        full_node_ip = f"{datacenter}.{node_ip}" if datacenter else node_ip
-        for node in self.nodes:
-            region_ip = f"{node.datacenter}.{node.ip_address}" if datacenter else node.ip_address
-            if region_ip == full_node_ip:
-                return node
-        return None
+        return self.topology_cache.get_node_by_ip(self.nodes, node_ip, datacenter)
 
     def _create_session(self, node, keyspace, user, password, compression,
                         # pylint: disable=too-many-arguments, too-many-locals
@@ -3317,6 +3484,9 @@ def wait_for_init_wrap(method):
         while len(results) != len(node_list):
             verify_node_setup(start_time)
 
+        # new nodes could join the cluster or replace other nodes
+        cl_inst.topology_cache.invalidate()
+
         if isinstance(cl_inst, BaseScyllaCluster):
             cl_inst.wait_for_nodes_up_and_normal(nodes=node_list, verification_node=node_list[0])
 
@@ -3598,7 +3768,7 @@ class BaseScyllaCluster:  # pylint: disable=too-many-public-methods, too-many-in
         return node_info_list
 
     @retrying(n=3, sleep_time=5)
-    def get_nodetool_status(self, verification_node=None):  # pylint: disable=too-many-locals
+    def get_nodetool_status(self, verification_node=None):
         """
             Runs nodetool status and generates status structure.
             Status format:
@@ -3619,9 +3789,14 @@ class BaseScyllaCluster:  # pylint: disable=too-many-public-methods, too-many-in
         """
         if not verification_node:
             verification_node = random.choice(self.nodes)
-        status = {}
         res = verification_node.run_nodetool('status')
-        data_centers = res.stdout.strip().split("Datacenter: ")
+        return self.parse_nodetool_status(res.stdout)
+
+    @staticmethod
+    def parse_nodetool_status(output):  # pylint: disable=too-many-locals
+        """Generates status structure of get_nodetool_status() from output of nodetool status."""
+        status = {}
+        data_centers = output.strip().split("Datacenter: ")
         for dc in data_centers:
             if dc:
                 lines = dc.splitlines()
@@ -3676,8 +3851,7 @@ class BaseScyllaCluster:  # pylint: disable=too-many-public-methods, too-many-in
         # Don't run health check in case parallel nemesis.
         # TODO: find how to recognize, that nemesis on the node is running
         if self.nemesis_count == 1:
-            for node in self.nodes:
-                node.check_node_health()
+            self.check_nodes_health()
         else:
             ClusterHealthValidatorEvent.Info(
                 message="Test runs with parallel nemesis. Nodes health checks are disabled.",
@@ -3686,6 +3860,72 @@ class BaseScyllaCluster:  # pylint: disable=too-many-public-methods, too-many-in
         self.check_nodes_running_nemesis_count()
         ClusterHealthValidatorEvent.Done(message="Cluster health check finished").publish()
 
+    def check_nodes_health(self, retries: int = CHECK_NODE_HEALTH_RETRIES) -> None:
+        """Gather views of the cluster from all nodes in parallel and cross-check them.
+
+        Only nodes which failed the validation are checked again on the next retry, health info of other nodes is kept.
+        A node which can't provide its health info in time is reported by a health event and not waited for.
+        All nodes read their system.peers using one CQL session.
+        """
+        try:
+            connection = self.cql_connection(self.nodes[0], connect_timeout=CQL_HEALTH_CHECK_TIMEOUT, verbose=False)
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.debug("Unable to connect to the cluster using CQL driver, nodes will use own connections: %s", exc)
+            connection = nullcontext()
+        with connection as session:
+            self._check_nodes_health(retries=retries, session=session)
+
+    def _check_nodes_health(self, retries: int, session) -> None:
+        def get_health_info(node):
+            return node.get_health_info(timeout=CHECK_NODE_HEALTH_INFO_TIMEOUT, session=session)
+
+        health_info = {}
+        nodes_to_check = list(self.nodes)
+        for retry_n in range(1, retries+1):
+            LOGGER.debug("Check the health of %d node(s) [attempt #%d]", len(nodes_to_check), retry_n)
+            for result in ParallelObject(nodes_to_check, timeout=None).iter_results(
+                    get_health_info, task_timeout=CHECK_NODE_HEALTH_INFO_TIMEOUT):
+                if isinstance(result.exc, FuturesTimeoutError):
+                    ClusterHealthValidatorEvent.NodeStatus(
+                        severity=Severity.ERROR,
+                        node=result.obj.name,
+                        error=f"Unable to get health info of the node `{result.obj.name}' "
+                              f"in {CHECK_NODE_HEALTH_INFO_TIMEOUT} seconds",
+                    ).publish()
+                elif result.exc is not None:
+                    LOGGER.warning("Unable to get health info of the node `%s': %s", result.obj.name, result.exc)
+                health_info[result.obj] = result.result or NodeHealthInfo(nodes_status={}, peers_details={},
+                                                                          gossip_info={})
+            cluster_members = get_cluster_members(health_info.values())
+
+            unhealthy_nodes = {}
+            for node in self.nodes:
+                events = check_node_health_info(current_node=node,
+                                                health_info=health_info[node],
+                                                removed_nodes_list=self.dead_nodes_ip_address_list,
+                                                cluster_members=cluster_members)
+                if (event := next(events, None)) is not None:
+                    unhealthy_nodes[node] = (event, events)
+            if not unhealthy_nodes:
+                LOGGER.debug("All nodes are healthy")
+                break
+            if retry_n == retries:  # publish health validation events on the last retry.
+                LOGGER.debug("One or more nodes health validation has failed: %s",
+                             ", ".join(node.name for node in unhealthy_nodes))
+                for event, events in unhealthy_nodes.values():
+                    event.publish()
+                    for event in events:
+                        event.publish()
+                break
+
+            for event, _ in unhealthy_nodes.values():
+                event.dont_publish()
+            nodes_to_check = list(unhealthy_nodes)
+
+            LOGGER.debug("Wait for %d secs before next try to validate the health of the nodes",
+                         CHECK_NODE_HEALTH_RETRY_DELAY)
+            time.sleep(CHECK_NODE_HEALTH_RETRY_DELAY)
+
     def check_nodes_running_nemesis_count(self):
         nodes_running_nemesis = [node for node in self.nodes if node.running_nemesis]
 
@@ -3700,11 +3940,33 @@ class BaseScyllaCluster:  # pylint: disable=too-many-public-methods, too-many-in
             message=f"There are more then expected nodes running nemesis: {message}",
         ).publish()
 
-    @retrying(n=6, sleep_time=10, allowed_exceptions=(AssertionError,))
-    def wait_for_schema_agreement(self):
+    def wait_for_schema_agreement(self, timeout: float = SCHEMA_AGREEMENT_TIMEOUT):
+        """Wait until all nodes agree on the schema version, both in system tables and in the gossip.
 
-        for node in self.nodes:
-            assert check_schema_agreement_in_gossip_and_peers(node), 'Schema agreement is not reached'
+        First, the driver polls schema versions in system tables over one connection and returns as soon as they
+        converge.  Then the gossip and system.peers of all nodes are checked in parallel, nodes which don't agree
+        yet are checked again with growing intervals until the timeout.
+        """
+        def check_schema_agreement(node):
+            return check_schema_agreement_in_gossip_and_peers(node, retries=1)
+
+        end_time = time.perf_counter() + timeout
+        with self.cql_connection_patient(self.nodes[0], verbose=False) as session:
+            assert wait_for_schema_agreement_in_session(session, timeout), 'Schema agreement is not reached'
+        nodes = list(self.nodes)
+        check_interval = SCHEMA_AGREEMENT_MIN_CHECK_INTERVAL
+        while True:
+            parallel_object = ParallelObject(nodes, timeout=max(end_time - time.perf_counter(), 0))
+            # a node which is not checked in time hasn't agreed yet: its result has FuturesTimeoutError as `exc'
+            nodes = [result.obj for result in parallel_object.iter_results(check_schema_agreement)
+                     if result.exc is not None or not result.result]
+            if not nodes:
+                break
+            assert time.perf_counter() + check_interval < end_time, 'Schema agreement is not reached'
+            self.log.debug("Schema agreement is not reached on %s yet, check again in %s seconds",
+                           ", ".join(node.name for node in nodes), check_interval)
+            time.sleep(check_interval)
+            check_interval = min(check_interval * 2, SCHEMA_AGREEMENT_MAX_CHECK_INTERVAL)
         self.log.debug('Schema agreement is reached')
         return True
 
@@ -4109,6 +4371,7 @@ class BaseScyllaCluster:  # pylint: disable=too-many-public-methods, too-many-in
 
         target_node_ip = node.ip_address
         node.run_nodetool("decommission")
+        self.topology_cache.invalidate()  # pylint: disable=no-member
         verification_node = random.choice(self.nodes)
         node_ip_list = get_node_ip_list(verification_node)
         while verification_node == node or node_ip_list is None:
@@ -20,22 +20,28 @@ import platform
 import logging
 import json
 from textwrap import dedent
-from math import sqrt
-from typing import Optional
+from math import isnan, sqrt
+from typing import Any, Dict, List, Optional
 from functools import cached_property
 from collections import defaultdict
 
 import yaml
 import requests
+from requests.adapters import HTTPAdapter
 
 from sdcm.es import ES
-from sdcm.utils.common import get_job_name, normalize_ipv6_url
+from sdcm.utils.common import get_job_name, normalize_ipv6_url, ParallelObject
 from sdcm.utils.decorators import retrying
 from sdcm.sct_events.system import ElasticsearchEvent
 
 
 LOGGER = logging.getLogger(__name__)
 
+PROMETHEUS_QUERY_WORKERS = 8  # max concurrent HTTP requests to Prometheus server from one client
+PROMETHEUS_QUERY_MAX_POINTS = 1000  # a range query which returns more points per series is split to sub-ranges
+PROMETHEUS_STATS_MIN_VALUE_RATIO = 0.01  # values which are less than this ratio of the max are not counted in stats
+PROMETHEUS_STATS_MIN_VALUES = 4  # less values than this is not enough to calculate stats
+
 
 class CassandraStressCmdParseError(Exception):
     def __init__(self, cmd, ex):
@@ -173,25 +179,69 @@ def get_cdcreader_cmd_params(cmd):
     return get_raw_cmd_params(cmd)
 
 
+def get_query_sub_ranges(start, end, step, max_points: int = PROMETHEUS_QUERY_MAX_POINTS) -> list:
+    """Split [start, end] range to sub-ranges of up to `max_points' steps which have same evaluation timestamps.
+
+    Timestamps which are not numbers (e.g., RFC 3339) can't be split and returned as one range.
+    """
+    if not all(isinstance(value, (int, float)) for value in (start, end, step)) or step <= 0:
+        return [(start, end)]
+    sub_range = step * (max_points - 1)
+    sub_ranges = []
+    sub_start = start
+    while sub_start + sub_range < end:
+        sub_ranges.append((sub_start, sub_start + sub_range))
+        sub_start += sub_range + step
+    if sub_start <= end or not sub_ranges:
+        sub_ranges.append((sub_start, end))
+    return sub_ranges
+
+
+def merge_query_results(results) -> List[dict]:
+    """Merge results of range queries for consecutive sub-ranges to one result by labels of the series."""
+
+    merged = {}
+    for result in results:
+        for series in result:
+            key = tuple(sorted(series["metric"].items()))
+            if key in merged:
+                merged[key]["values"].extend(series["values"])
+            else:
+                merged[key] = {"metric": series["metric"], "values": list(series["values"])}
+    return list(merged.values())
+
+
 class PrometheusDBStats():
+    """Client of Prometheus HTTP API.
+
+    Requests are sent over a pooled session, queries are run concurrently by `query_all()', and range queries with
+    too many points are split to sub-ranges which are queried in parallel and merged.  Prometheus configuration is
+    loaded on the first use.
+    """
+
     def __init__(self, host, port=9090, alternator=None):
         self.host = host
         self.port = port
         self.range_query_url = "http://{}:{}/api/v1/query_range?query=".format(normalize_ipv6_url(host), port)
-        self.config = self.get_configuration()
+        self.instant_query_url = "http://{}:{}/api/v1/query?query=".format(normalize_ipv6_url(host), port)
         self.alternator = alternator
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=PROMETHEUS_QUERY_WORKERS))
+
+    @cached_property
+    def config(self):
+        return self.get_configuration()
 
     @property
     def scylla_scrape_interval(self):
         return int(self.config["scrape_configs"]["scylla"]["scrape_interval"][:-1])
 
-    @staticmethod
     @retrying(n=5, sleep_time=7, allowed_exceptions=(requests.ConnectionError, requests.HTTPError))
-    def request(url, post=False):
+    def request(self, url, post=False):
         if post:
-            response = requests.post(url)
+            response = self._session.post(url)
         else:
-            response = requests.get(url)
+            response = self._session.get(url)
         response.raise_for_status()
 
         result = json.loads(response.content)
@@ -223,11 +273,33 @@ class PrometheusDBStats():
                   values: [[linux_timestamp1, value1], [linux_timestamp2, value2]...[linux_timestampN, valueN]]
                  }
         """
-        url = "http://{}:{}/api/v1/query_range?query=".format(normalize_ipv6_url(self.host), self.port)
+        return self.query_all({query: query}, start=start, end=end, scrap_metrics_step=scrap_metrics_step)[query]
+
+    def query_all(self, queries: Dict[Any, str], start, end, scrap_metrics_step=None) -> Dict[Any, List[dict]]:
+        """Run range queries concurrently and return their results by same keys as in `queries'.
+
+        The range is split to sub-ranges of up to PROMETHEUS_QUERY_MAX_POINTS steps, queries for all sub-ranges are
+        run by up to PROMETHEUS_QUERY_WORKERS threads and then merged by series.
+        """
         if not scrap_metrics_step:
             scrap_metrics_step = self.scylla_scrape_interval
+        sub_ranges = get_query_sub_ranges(start, end, scrap_metrics_step)
+        tasks = [(key, query, sub_start, sub_end, scrap_metrics_step)
+                 for key, query in queries.items() for sub_start, sub_end in sub_ranges]
+        sub_results = {}
+        for result in ParallelObject(tasks, timeout=None, num_workers=PROMETHEUS_QUERY_WORKERS,
+                                     disable_logging=True).iter_results(self._query_range, unpack_objects=True):
+            if result.exc is not None:
+                raise result.exc
+            key, _, sub_start, _, _ = result.obj
+            sub_results[(key, sub_start)] = result.result
+        return {key: merge_query_results(sub_results[(key, sub_start)] for sub_start, _ in sub_ranges)
+                for key in queries}
+
+    def _query_range(self, key, query, start, end,  # pylint: disable=unused-argument,too-many-arguments
+                     scrap_metrics_step):
         _query = "{url}{query}&start={start}&end={end}&step={scrap_metrics_step}".format(
-            url=url, query=query, start=start, end=end, scrap_metrics_step=scrap_metrics_step)
+            url=self.range_query_url, query=query, start=start, end=end, scrap_metrics_step=scrap_metrics_step)
         LOGGER.debug("Query to PrometheusDB: %s", _query)
         result = self.request(url=_query)
         if result:
@@ -236,6 +308,64 @@ class PrometheusDBStats():
             LOGGER.error("Prometheus query unsuccessful!")
             return []
 
+    def query_instant_all(self, queries: Dict[Any, str], time_) -> Dict[Any, List[dict]]:
+        """Run instant queries at `time_' concurrently and return their results by same keys as in `queries'."""
+
+        results = {}
+        tasks = [(key, query, time_) for key, query in queries.items()]
+        for result in ParallelObject(tasks, timeout=None, num_workers=PROMETHEUS_QUERY_WORKERS,
+                                     disable_logging=True).iter_results(self._query_instant, unpack_objects=True):
+            if result.exc is not None:
+                raise result.exc
+            results[result.obj[0]] = result.result
+        return results
+
+    def _query_instant(self, key, query, time_):  # pylint: disable=unused-argument
+        _query = "{url}{query}&time={time_}".format(url=self.instant_query_url, query=query, time_=time_)
+        LOGGER.debug("Query to PrometheusDB: %s", _query)
+        result = self.request(url=_query)
+        if result:
+            return result["data"]["result"]
+        else:
+            LOGGER.error("Prometheus query unsuccessful!")
+            return []
+
+    def get_stats_over_time(self, query, start_time, end_time, scrap_metrics_step=None):
+        """Calculate stats of a query values for [start_time, end_time] range on Prometheus server.
+
+        Same stats as `TestStatsMixin._calc_stats()' does for the values of a range query, but only the scalars are
+        transferred: max is calculated first and then min, avg and stdev of values which are not less than
+        PROMETHEUS_STATS_MIN_VALUE_RATIO of the max.  Return an empty dict if there is not enough data.
+        """
+        if not self._check_start_end_time(start_time, end_time):
+            return {}
+        if not scrap_metrics_step:
+            scrap_metrics_step = self.scylla_scrape_interval
+        # the subquery covers [start_time, end_time] with the same resolution as a range query would
+        subquery_range = "[{}s:{}s]".format(int(end_time - start_time) + 1, scrap_metrics_step)
+
+        def get_value(result):
+            return float(result[0]["value"][1]) if result else float("nan")
+
+        max_value = get_value(self.query_instant_all(
+            {"max": "max_over_time(({}){})".format(query, subquery_range)}, end_time)["max"])
+        if isnan(max_value):
+            return {}
+        filtered_subquery = "(({}) >= {:f}){}".format(query, max_value * PROMETHEUS_STATS_MIN_VALUE_RATIO,
+                                                      subquery_range)
+        results = self.query_instant_all({
+            "count": "count_over_time({})".format(filtered_subquery),
+            "min": "min_over_time({})".format(filtered_subquery),
+            "avg": "avg_over_time({})".format(filtered_subquery),
+            "stdev": "stddev_over_time({})".format(filtered_subquery),
+        }, end_time)
+        stat = {name: get_value(result) for name, result in results.items()}
+        count = stat.pop("count")
+        if isnan(count) or count < PROMETHEUS_STATS_MIN_VALUES or any(isnan(value) for value in stat.values()):
+            return {}
+        stat["max"] = max_value
+        return stat
+
     @staticmethod
     def _check_start_end_time(start_time, end_time):
         if end_time - start_time < 120:
@@ -259,12 +389,15 @@ class PrometheusDBStats():
         """
         if not self._check_start_end_time(start_time, end_time):
             return []
+        return self._get_query_values(self.throughput_query, start_time, end_time,
+                                      scrap_metrics_step=scrap_metrics_step)
+
+    @property
+    def throughput_query(self):
         # the query is taken from the Grafana Dashborad definition
         if self.alternator:
-            query = "sum(irate(scylla_alternator_operation{}[30s]))"
-        else:
-            query = "sum(irate(scylla_transport_requests_served{}[30s]))%20%2B%20sum(irate(scylla_thrift_served{}[30s]))"
-        return self._get_query_values(query, start_time, end_time, scrap_metrics_step=scrap_metrics_step)
+            return "sum(irate(scylla_alternator_operation{}[30s]))"
+        return "sum(irate(scylla_transport_requests_served{}[30s]))%20%2B%20sum(irate(scylla_thrift_served{}[30s]))"
 
     def get_scylla_reactor_utilization(self, start_time, end_time, scrap_metrics_step=None):
         """
@@ -321,9 +454,21 @@ class PrometheusDBStats():
         assert latency_type in ["read", "write"]
         if not self._check_start_end_time(start_time, end_time):
             return []
-        query = "histogram_quantile(0.99, sum(rate(scylla_storage_proxy_" \
+        return self._get_query_values(self.get_latency_query(latency_type), start_time, end_time,
+                                      scrap_metrics_step=scrap_metrics_step)
+
+    @staticmethod
+    def get_latency_query(latency_type):
+        return "histogram_quantile(0.99, sum(rate(scylla_storage_proxy_" \
             "coordinator_%s_latency_bucket{}[30s])) by (le))" % latency_type
-        return self._get_query_values(query, start_time, end_time, scrap_metrics_step=scrap_metrics_step)
+
+    @property
+    def latency_read_99_query(self):
+        return self.get_latency_query(latency_type="read")
+
+    @property
+    def latency_write_99_query(self):
+        return self.get_latency_query(latency_type="write")
 
     def get_latency_read_99(self, start_time, end_time, scrap_metrics_step=None):
         return self.get_latency(start_time, end_time, latency_type="read",
@@ -575,7 +720,7 @@ class TestStatsMixin(Stats):
 
     def _calc_stats(self, ps_results):
         try:
-            if not ps_results or len(ps_results) <= 3:
+            if not ps_results or len(ps_results) < PROMETHEUS_STATS_MIN_VALUES:
                 self.log.error("Not enough data from Prometheus: %s" % ps_results)
                 return {}
             stat = {}
@@ -600,11 +745,28 @@ class TestStatsMixin(Stats):
         offset = 120  # 2 minutes offset
         start = int(self._stats["test_details"]["start_time"] + offset)
         end = int(time.time() - offset)
-        prometheus_stats = {}
-        for stat in self.PROMETHEUS_STATS:
+
+        def get_stat(stat):
+            # calculate the stats on Prometheus server and fallback to the calculation on the values if it fails
+            try:
+                stat_values = prometheus_db_stats.get_stats_over_time(
+                    query=getattr(prometheus_db_stats, stat + "_query"),
+                    start_time=start, end_time=end, scrap_metrics_step=scrap_metrics_step)
+                if stat_values:
+                    self.log.debug("Stats: %s", stat_values)
+                    return stat_values
+            except Exception as ex:  # pylint: disable=broad-except
+                self.log.warning("Failed to calculate %s stats on PrometheusDB: %s", stat, ex)
+            self.log.debug("Calculating %s stats using values from PrometheusDB", stat)
             stat_calc_func = getattr(prometheus_db_stats, "get_" + stat)
-            prometheus_stats[stat] = self._calc_stats(ps_results=stat_calc_func(start_time=start, end_time=end,
-                                                                                scrap_metrics_step=scrap_metrics_step))
+            return self._calc_stats(
+                ps_results=stat_calc_func(start_time=start, end_time=end, scrap_metrics_step=scrap_metrics_step))
+
+        prometheus_stats = {}
+        for result in ParallelObject(self.PROMETHEUS_STATS, timeout=None).iter_results(get_stat):
+            if result.exc is not None:
+                raise result.exc
+            prometheus_stats[result.obj] = result.result
         self._stats['results'].update(prometheus_stats)
         return prometheus_stats
 
@@ -29,6 +29,7 @@ from cassandra.protocol import ProtocolException  # pylint: disable=no-name-in-m
 from pkg_resources import parse_version
 
 from sdcm.tester import ClusterTester
+from sdcm.utils.common import wait_for_schema_agreement_in_session
 from sdcm.utils.decorators import retrying
 
 
@@ -2950,18 +2951,18 @@ class FillDatabaseData(ClusterTester):
 
             if not item['skip'] and ('skip_condition' not in item or eval(str(item['skip_condition']))):
                 for create_table in item['create_tables']:
-                    # wait a while before creating index, there is a delay of create table for waiting the schema agreement
+                    # wait for the schema agreement on the created table before creating index
                     if 'CREATE INDEX' in create_table.upper():
-                        time.sleep(15)
+                        wait_for_schema_agreement_in_session(session)
                     self.log.debug(f"create table: {create_table}")
                     session.execute(create_table)
                     if 'CREATE TYPE' in create_table.upper():
-                        time.sleep(15)
+                        wait_for_schema_agreement_in_session(session)
                 for truncate in item['truncates']:
                     truncates.append(truncate)
-        # Sleep a while after creating test tables to avoid schema disagreement.
+        # Wait for the schema agreement after creating test tables to avoid schema disagreement.
         # Refs: https://github.com/scylladb/scylla/issues/5235
-        time.sleep(30)
+        wait_for_schema_agreement_in_session(session)
         for truncate in truncates:
             session.execute(truncate)
 
@@ -220,7 +220,7 @@ class FileLog(CommandLog):
     def collect_from_builder(self, builder, local_dst, search_in_dir) -> None:
         if file_path := self.find_on_builder(builder, self.name, search_in_dir):
             if archive_logfile := LogCollector.archive_log_remotely(builder, file_path):
-                builder.remoter.receive_files(archive_logfile, local_dst, timeout=self.collect_timeout)
+                builder.remoter.receive_files(archive_logfile, local_dst, timeout=self.collect_timeout, chunked=True)
 
 
 class PrometheusSnapshots(BaseMonitoringEntity):
@@ -327,7 +327,7 @@ class MonitoringStack(BaseMonitoringEntity):
         if not check_archive(node.remoter, archive_name):
             LOGGER.error("Archive with monitoring data stack (%s) is corrupted.", archive_name)
             return ""
-        node.remoter.receive_files(src=archive_name, dst=local_dist, timeout=self.collect_timeout)
+        node.remoter.receive_files(src=archive_name, dst=local_dist, timeout=self.collect_timeout, chunked=True)
 
         return os.path.join(local_dist, os.path.basename(archive_name))
 
@@ -701,7 +701,8 @@ class LogCollector:
         if node.remoter:
             node.remoter.receive_files(src=remote_log_path,
                                        dst=local_dir,
-                                       timeout=timeout)
+                                       timeout=timeout,
+                                       chunked=True)
         return local_dir
 
     def collect_logs(self, local_search_path: Optional[str] = None) -> Optional[str]:
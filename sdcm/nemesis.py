@@ -614,6 +614,7 @@ class Nemesis:  # pylint: disable=too-many-instance-attributes,too-many-public-m
         except (NodeSetupFailed, NodeSetupTimeout):
             self.log.warning("Setup of the '%s' failed, removing it from list of nodes" % new_node)
             self.cluster.nodes.remove(new_node)
+            self.cluster.topology_cache.invalidate()
             self.log.warning("Node will not be terminated. Please terminate manually!!!")
             raise
         self.cluster.wait_for_nodes_up_and_normal(nodes=[new_node])
@@ -2852,6 +2853,7 @@ def log_time_elapsed_and_status(method):  # pylint: disable=too-many-statements
             })
             args[0].duration_list.append(time_elapsed)
             args[0].operation_log.append(log_info)
+            args[0].cluster.topology_cache.invalidate()  # nemesis could change the topology
             args[0].log.debug('%s duration -> %s s', args[0].current_disruption, time_elapsed)
 
             if class_name.find('Chaos') < 0:
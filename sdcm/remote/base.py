@@ -17,6 +17,7 @@ import shlex
 import logging
 import re
 import os
+import threading
 import subprocess
 from textwrap import dedent
 
@@ -24,6 +25,9 @@ from invoke.watchers import StreamWatcher, Responder
 from invoke.runners import Result
 from fabric import Connection
 
+LOG_WRITE_WATCHER_FLUSH_SIZE = 64 * 1024  # bytes
+LOG_WRITE_WATCHER_FLUSH_INTERVAL = 1  # seconds
+
 
 class OutputCheckError(Exception):
     """
@@ -89,6 +93,14 @@ class CommandRunner(metaclass=ABCMeta):
             watchers.append(LogWriteWatcher(log_file))
         return watchers
 
+    @staticmethod
+    def _close_watchers(watchers: List[StreamWatcher]) -> None:
+        """Flush output which is buffered by the watchers, should be called when a command is completed."""
+
+        for watcher in watchers:
+            if isinstance(watcher, LogWriteWatcher):
+                watcher.close()
+
     # pylint: disable=too-many-arguments
     @abstractmethod
     def run(self,
@@ -226,24 +238,98 @@ class OutputWatcher(StreamWatcher):  # pylint: disable=too-few-public-methods
         self.log.debug(line.rstrip('\n'))
 
 
+class _LogFileWriter:
+    """Buffered writer of a log file which can be used from many threads.
+
+    The output is flushed to the file when enough of it is buffered, by a timer in LOG_WRITE_WATCHER_FLUSH_INTERVAL
+    seconds after the first write to an empty buffer (so no output waits in the buffer longer than that, even if
+    the command is quiet), or when the writer is closed.
+    """
+
+    def __init__(self, log_file: str):
+        self.log_file = log_file
+        self._file = None
+        self._buffered = 0
+        self._lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+
+    def write(self, chunk: str):
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.log_file, "a+", buffering=LOG_WRITE_WATCHER_FLUSH_SIZE)
+            self._file.write(chunk)
+            self._buffered += len(chunk)
+            if self._buffered >= LOG_WRITE_WATCHER_FLUSH_SIZE:
+                self._flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(LOG_WRITE_WATCHER_FLUSH_INTERVAL, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        self._cancel_flush_timer()
+        if self._file is not None:
+            self._file.flush()
+        self._buffered = 0
+
+    def _cancel_flush_timer(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def close(self):
+        with self._lock:
+            self._cancel_flush_timer()
+            if self._file is not None:
+                try:
+                    self._file.close()
+                finally:
+                    self._file = None
+                    self._buffered = 0
+
+
 class LogWriteWatcher(StreamWatcher):  # pylint: disable=too-few-public-methods
+    """Write output of a command to a log file.
+
+    The file is kept open while the command runs and is closed when the command is completed (see `close()'.)
+
+    StreamWatcher is thread-local: a position in the stream (`len') is per thread, because each stream is read by
+    its own thread.  The file writer is kept in a slot, so all threads (including the one which closes the watcher)
+    share it.
+    """
+
+    __slots__ = ("_writer", )
+
+    # Output is written as is, so there is no need to split it into lines
+    accepts_chunks = True
+
     def __init__(self, log_file: str):
         super().__init__()
         self.len = 0
         self.log_file = log_file
+        if not hasattr(self, "_writer"):  # `__init__()' is called again for each thread which uses the watcher.
+            self._writer = _LogFileWriter(log_file)
 
     def submit(self, stream: str) -> list:
-        stream_buffer = stream[self.len:]
-
-        with open(self.log_file, "a+") as log_file:
-            log_file.write(stream_buffer)
-
+        self.submit_chunk(stream[self.len:])
         self.len = len(stream)
         return []
 
     def submit_line(self, line: str):
-        with open(self.log_file, "a+") as log_file:
-            log_file.write(line)
+        self.submit_chunk(line)
+
+    def submit_chunk(self, chunk: str):
+        self._writer.write(chunk)
+
+    def flush(self):
+        self._writer.flush()
+
+    def close(self):
+        self._writer.close()
 
 
 class FailuresWatcher(Responder):
@@ -0,0 +1,224 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+import os
+import time
+import hashlib
+import logging
+import threading
+import subprocess
+from shlex import quote
+from typing import List, Tuple, Optional, NamedTuple
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNKED_TRANSFER_MIN_FILE_SIZE = 256 * 1024 ** 2  # bytes
+CHUNKED_TRANSFER_CHUNK_SIZE = 64 * 1024 ** 2  # bytes
+CHUNKED_TRANSFER_WORKERS = 4
+CHUNKED_TRANSFER_RETRIES = 3
+CHUNKED_TRANSFER_READ_SIZE = 1024 ** 2  # bytes
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ChunkedTransferError(Exception):
+    """
+    Transfer of a range of a file failed.
+    """
+
+
+class FileStat(NamedTuple):
+    size: int
+    mode: int
+    mtime: int
+
+
+def get_chunks(size: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """Split a file of `size' bytes to (offset, length) ranges of up to `chunk_size' bytes."""
+
+    return [(offset, min(chunk_size, size - offset)) for offset in range(0, size, chunk_size)]
+
+
+def dd_read_cmd(path: str, offset: int, length: int) -> str:
+    return f"dd if={quote(path)} iflag=skip_bytes,count_bytes skip={offset} count={length} bs=1M status=none"
+
+
+def dd_write_cmd(path: str, offset: int) -> str:
+    return f"dd of={quote(path)} conv=notrunc oflag=seek_bytes seek={offset} bs=1M status=none"
+
+
+def get_local_checksum(path: str, offset: int, length: int) -> str:
+    md5 = hashlib.md5()
+    with open(path, "rb") as local_file:
+        local_file.seek(offset)
+        while length > 0 and (data := local_file.read(min(length, CHUNKED_TRANSFER_READ_SIZE))):
+            md5.update(data)
+            length -= len(data)
+    return md5.hexdigest()
+
+
+class ChunkedFileTransfer:
+    """Transfer a large regular file by ranges over several concurrent SSH connections.
+
+    Destination file is allocated with the size of the source before the transfer, so an interrupted transfer can be
+    resumed: ranges which have same checksums at both sides are not transferred again.  Each transferred range is
+    verified by comparing the checksum of the source range with the checksum of data which was transferred, and it's
+    transferred again on mismatch.
+    """
+
+    def __init__(self, remoter, ssh_command: str, chunk_size: int = CHUNKED_TRANSFER_CHUNK_SIZE,
+                 workers: int = CHUNKED_TRANSFER_WORKERS):
+        self._remoter = remoter
+        self._ssh_command = ssh_command
+        self._chunk_size = chunk_size
+        self._workers = workers
+
+    def get_remote_stat(self, path: str) -> Optional[FileStat]:
+        """Return stat of a remote regular file or None if there is no such file."""
+
+        result = self._remoter.run(
+            f"test -f {quote(path)} && stat -L -c '%s %a %Y' {quote(path)}", ignore_status=True, verbose=False)
+        if not result.ok:
+            return None
+        size, mode, mtime = result.stdout.split()
+        return FileStat(size=int(size), mode=int(mode, 8), mtime=int(mtime))
+
+    def get_remote_checksum(self, path: str, offset: int, length: int) -> str:
+        return self._remoter.run(f"{dd_read_cmd(path, offset, length)} | md5sum", verbose=False).stdout.split()[0]
+
+    def _remote_command(self, cmd: str) -> str:
+        return f"{self._ssh_command} {quote(self._remoter.hostname)} {quote(cmd)}"
+
+    def receive(self, remote_path: str, local_path: str, timeout: float = None,
+                remote_stat: FileStat = None) -> FileStat:
+        """Copy a remote regular file to `local_path' and return stat of the remote file."""
+
+        stat = remote_stat or self.get_remote_stat(remote_path)
+        if stat is None:
+            raise ChunkedTransferError(f"{remote_path} is not a regular file")
+        resume = os.path.isfile(local_path) and os.path.getsize(local_path) == stat.size
+        if not resume:
+            with open(local_path, "wb") as local_file:
+                local_file.truncate(stat.size)
+        self._transfer(self._receive_chunk, local_path, remote_path, stat.size, resume, timeout)
+        return stat
+
+    def send(self, local_path: str, remote_path: str, timeout: float = None) -> None:
+        """Copy a local regular file to `remote_path'."""
+
+        size = os.path.getsize(local_path)
+        remote_stat = self.get_remote_stat(remote_path)
+        resume = remote_stat is not None and remote_stat.size == size
+        if not resume:
+            self._remoter.run(f"truncate -s {size} {quote(remote_path)}", verbose=False)
+        self._transfer(self._send_chunk, local_path, remote_path, size, resume, timeout)
+
+    def _transfer(self, transfer_chunk, local_path: str, remote_path: str,  # pylint: disable=too-many-arguments
+                  size: int, resume: bool, timeout: Optional[float]) -> None:
+        end_time = None if timeout is None else time.perf_counter() + timeout
+        chunks = get_chunks(size, self._chunk_size)
+        with ThreadPoolExecutor(max_workers=max(min(self._workers, len(chunks)), 1)) as executor:
+            futures = [executor.submit(self._transfer_chunk, transfer_chunk, local_path, remote_path,
+                                       offset, length, resume, end_time)
+                       for offset, length in chunks]
+            try:
+                transferred = sum(future.result() for future in futures)
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+        LOGGER.debug("%s <-> %s:%s: %d of %d bytes transferred by %d chunks",
+                     local_path, self._remoter.hostname, remote_path, transferred, size, len(chunks))
+
+    def _transfer_chunk(self, transfer_chunk, local_path: str, remote_path: str,  # pylint: disable=too-many-arguments
+                        offset: int, length: int, resume: bool, end_time: Optional[float]) -> int:
+        """Transfer a range of the file, if it's not transferred yet, and return number of transferred bytes.
+
+        Transferred data is verified by the checksum of the range of the remote file, which is the source when
+        receiving and the destination when sending.
+        """
+
+        if resume and get_local_checksum(local_path, offset, length) == \
+                self.get_remote_checksum(remote_path, offset, length):
+            return 0
+        for attempt in range(1, CHUNKED_TRANSFER_RETRIES + 1):
+            timeout = None if end_time is None else end_time - time.perf_counter()
+            if timeout is not None and timeout <= 0:
+                break
+            try:
+                checksum = transfer_chunk(local_path, remote_path, offset, length, timeout)
+                if checksum == self.get_remote_checksum(remote_path, offset, length):
+                    return length
+                LOGGER.warning("%s[%d:%d]: attempt #%d failed: checksum mismatch",
+                               remote_path, offset, offset + length, attempt)
+            except ChunkedTransferError as exc:
+                LOGGER.warning("%s[%d:%d]: attempt #%d failed: %s", remote_path, offset, offset + length, attempt, exc)
+        raise ChunkedTransferError(f"Failed to transfer {remote_path}[{offset}:{offset + length}]")
+
+    def _receive_chunk(self, local_path: str, remote_path: str,  # pylint: disable=too-many-arguments
+                       offset: int, length: int, timeout: Optional[float]) -> str:
+        md5 = hashlib.md5()
+        received = 0
+        with subprocess.Popen(self._remote_command(dd_read_cmd(remote_path, offset, length)), shell=True,
+                              stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc, \
+                open(local_path, "r+b") as local_file, _KillOnTimeout(proc, timeout):
+            local_file.seek(offset)
+            while data := proc.stdout.read(CHUNKED_TRANSFER_READ_SIZE):
+                md5.update(data)
+                local_file.write(data)
+                received += len(data)
+            stderr = proc.stderr.read()
+        if proc.returncode or received != length:
+            raise ChunkedTransferError(
+                f"received {received} of {length} bytes, exit status {proc.returncode}: {stderr.decode().strip()}")
+        return md5.hexdigest()
+
+    def _send_chunk(self, local_path: str, remote_path: str,  # pylint: disable=too-many-arguments
+                    offset: int, length: int, timeout: Optional[float]) -> str:
+        md5 = hashlib.md5()
+        with subprocess.Popen(self._remote_command(dd_write_cmd(remote_path, offset)), shell=True,
+                              stdin=subprocess.PIPE, stderr=subprocess.PIPE) as proc, \
+                open(local_path, "rb") as local_file, _KillOnTimeout(proc, timeout):
+            local_file.seek(offset)
+            try:
+                left = length
+                while left > 0 and (data := local_file.read(min(left, CHUNKED_TRANSFER_READ_SIZE))):
+                    md5.update(data)
+                    proc.stdin.write(data)
+                    left -= len(data)
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            stderr = proc.stderr.read()
+        if proc.returncode:
+            raise ChunkedTransferError(f"exit status {proc.returncode}: {stderr.decode().strip()}")
+        return md5.hexdigest()
+
+
+class _KillOnTimeout:  # pylint: disable=too-few-public-methods
+    """Kill a process if it's still running after timeout, wait for it to exit on leaving the context."""
+
+    def __init__(self, proc: subprocess.Popen, timeout: Optional[float]):
+        self._proc = proc
+        self._timer = None if timeout is None else threading.Timer(timeout, proc.kill)
+
+    def __enter__(self):
+        if self._timer is not None:
+            self._timer.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self._proc.kill()
+        self._proc.wait()
+        if self._timer is not None:
+            self._timer.cancel()
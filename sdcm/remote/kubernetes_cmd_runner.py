@@ -156,7 +156,8 @@ class KubernetesCmdRunner(RemoteCmdRunnerBase):
 
     # pylint: disable=too-many-arguments,unused-argument
     @retrying(n=3, sleep_time=5, allowed_exceptions=(RetryableNetworkException, ))
-    def receive_files(self, src, dst, delete_dst=False, preserve_perm=True, preserve_symlinks=False, timeout=300):
+    def receive_files(self, src, dst, delete_dst=False, preserve_perm=True, preserve_symlinks=False, timeout=300,
+                      chunked=False):
         KubernetesOps.copy_file(self, f"{self.namespace}/{self.pod}:{src}", dst,
                                 container=self.container, timeout=timeout)
         return True
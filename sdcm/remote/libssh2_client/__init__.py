@@ -17,20 +17,24 @@ from os.path import normpath, expanduser, exists
 from sys import float_info
 from io import StringIO
 from warnings import warn
-from socket import socket, AF_INET, AF_INET6, SOCK_STREAM, gaierror, gethostbyname, error as sock_error
-from threading import Thread, Lock, Event, BoundedSemaphore
+from socket import socket, AF_INET, AF_INET6, SOCK_STREAM, IPPROTO_TCP, TCP_NODELAY, gaierror, gethostbyname, \
+    error as sock_error
+from threading import Thread, Lock, Event
 from abc import abstractmethod, ABC
-from queue import SimpleQueue as Queue
+from queue import SimpleQueue as Queue, Empty
+from codecs import getincrementaldecoder
 import ipaddress
 
 from ssh2.channel import Channel  # pylint: disable=no-name-in-module
 from ssh2.exceptions import AuthenticationError  # pylint: disable=no-name-in-module
 from ssh2.error_codes import LIBSSH2_ERROR_EAGAIN  # pylint: disable=no-name-in-module
 
+from .adaptive_limiter import AdaptiveLimiter
 from .exceptions import AuthenticationException, UnknownHostException, ConnectError, PKeyFileError, UnexpectedExit, \
     CommandTimedOut, FailedToReadCommandOutput, ConnectTimeout, FailedToRunCommand, OpenChannelTimeout
 from .result import Result
 from .session import Session
+from .shell import PersistentShell, PERSISTENT_SHELL_COMMAND
 from .timings import Timings, NullableTiming
 
 
@@ -45,10 +49,16 @@ class __DEFAULT__:  # pylint: disable=invalid-name, too-few-public-methods
 
 
 class StreamWatcher(ABC):
+    # Watchers which set it to True get chunks of output by `submit_chunk' instead of lines by `submit_line'
+    accepts_chunks: bool = False
+
     @abstractmethod
     def submit_line(self, line: str):
         pass
 
+    def submit_chunk(self, chunk: str):
+        pass
+
 
 class SSHReaderThread(Thread):  # pylint: disable=too-many-instance-attributes
     """
@@ -56,12 +66,14 @@ class SSHReaderThread(Thread):  # pylint: disable=too-many-instance-attributes
     It is needed because socket buffer gets overflowed if data is sent faster than watchers can process it, so
       we have to have Queue as a buffer with 'endless' memory, and fast reader that reads data from the socket
       and forward it to the Queue.
-      As part of this process it splits data into lines, because watchers expect it is organized in this way.
+      Data is forwarded by chunks as they are read from the channel, as `(STDOUT or STDERR, chunk)' tuples,
+      and the end of the output is marked by None.
     """
+    STDOUT = 0
+    STDERR = 1
 
     def __init__(self, session: Session, channel: Channel, timeout: NullableTiming, timeout_read_data: NullableTiming):
-        self.stdout = Queue()
-        self.stderr = Queue()
+        self.output = Queue()
         self.timeout_reached = False
         self._session = session
         self._channel = channel
@@ -74,19 +86,18 @@ class SSHReaderThread(Thread):  # pylint: disable=too-many-instance-attributes
 
     def run(self):
         try:
-            self._read_output(self._session, self._channel, self._timeout,
-                              self._timeout_read_data, self.stdout, self.stderr)
+            self._read_output(self._session, self._channel, self._timeout, self._timeout_read_data, self.output)
         except Exception as exc:  # pylint: disable=broad-except
             self.raised = exc
+        finally:
+            self.output.put(None)
 
-    def _read_output(  # pylint: disable=too-many-arguments,too-many-branches
+    def _read_output(  # pylint: disable=too-many-arguments
             self, session: Session, channel: Channel, timeout: NullableTiming, timeout_read_data: NullableTiming,
-            stdout_stream: Queue, stderr_stream: Queue):
-        """Reads data from ssh session, split it into lines and forward lines into stderr ad stdout pipes
-        It is required for it to be fast, that is why there is code duplications and non-pythonic code
+            output: Queue):
+        """Reads data from ssh session and forward chunks of stdout and stderr into the output queue
+        It is required for it to be fast, that is why there is non-pythonic code
         """
-        # pylint: disable=too-many-locals
-        stdout_remainder = stderr_remainder = b''
         if timeout is None:
             end_time = float_info.max
         else:
@@ -105,38 +116,59 @@ class SSHReaderThread(Thread):  # pylint: disable=too-many-instance-attributes
                 stdout_size, stdout_chunk = channel.read()
                 stderr_size, stderr_chunk = channel.read_stderr()
                 eof_result = channel.eof()
-
-            if stdout_chunk and stdout_stream is not None:
-                data_splitted = stdout_chunk.split(LINESEP)
-                if len(data_splitted) == 1:
-                    stdout_remainder = stdout_remainder + data_splitted.pop()
-                else:
-                    if stdout_remainder:
-                        stdout_stream.put(stdout_remainder + data_splitted.pop(0))
-                    stdout_remainder = data_splitted.pop()
-                for chunk in data_splitted:
-                    stdout_stream.put(chunk)
-
-            if stderr_chunk and stderr_stream is not None:
-                data_splitted = stderr_chunk.split(LINESEP)
-                if len(data_splitted) == 1:
-                    stderr_remainder = stderr_remainder + data_splitted.pop()
-                else:
-                    if stderr_remainder:
-                        stderr_stream.put(stderr_remainder + data_splitted.pop(0))
-                    stderr_remainder = data_splitted.pop()
-                for chunk in data_splitted:
-                    stderr_stream.put(chunk)
-        if stdout_remainder:
-            stdout_stream.put(stdout_remainder)
-        if stderr_remainder:
-            stderr_stream.put(stderr_remainder)
+            if stdout_chunk:
+                output.put((self.STDOUT, stdout_chunk))
+            if stderr_chunk:
+                output.put((self.STDERR, stderr_chunk))
 
     def stop(self, timeout: float = None):
         self._can_run.clear()
         self.join(timeout)
 
 
+class OutputFeeder:
+    """Decode chunks of a command output stream and write them to a buffer and the watchers.
+
+    Decoding is incremental, so a multibyte character can be split between chunks.  Watchers which set
+    `accepts_chunks' get decoded chunks as is by `submit_chunk()', other ones get complete lines by `submit_line()'.
+    """
+
+    def __init__(self, stream: Optional[StringIO], watchers: List[StreamWatcher], encoding: str):
+        self._stream = stream
+        self._chunk_watchers = [watcher for watcher in watchers if getattr(watcher, 'accepts_chunks', False)]
+        self._line_watchers = [watcher for watcher in watchers if not getattr(watcher, 'accepts_chunks', False)]
+        self._decoder = getincrementaldecoder(encoding)()
+        self._remainder = ''
+        self._last_char = ''
+
+    def feed(self, chunk: bytes, final: bool = False) -> None:
+        """Feed a chunk of the stream, `final' one completes the last line if it has no line separator."""
+
+        data = self._decoder.decode(chunk, final)
+        if final and self._watchers_present and (data[-1:] or self._last_char) not in ('', '\n'):
+            data += '\n'
+        if not data:
+            return
+        self._last_char = data[-1]
+        if self._stream is not None:
+            self._stream.write(data)
+        for watcher in self._chunk_watchers:
+            watcher.submit_chunk(data)
+        if self._line_watchers:
+            data = self._remainder + data
+            end = data.rfind('\n') + 1
+            self._remainder = data[end:]
+            if end:
+                for line in data[:end - 1].split('\n'):
+                    line += '\n'
+                    for watcher in self._line_watchers:
+                        watcher.submit_line(line)
+
+    @property
+    def _watchers_present(self) -> bool:
+        return bool(self._chunk_watchers or self._line_watchers)
+
+
 class KeepAliveThread(Thread):
     def __init__(self, session: Session, keepalive_timeout: NullableTiming):
         self._keep_running = Event()
@@ -172,18 +204,22 @@ class FloodPreventingFacility(dict):
     To calculate hash it splits `hash` attribute by comma(,),
       for each chunk it reads data source attribute and adds it's value to the hash.
     Get a lock from the store based on that hash, if there is no one - create it.
-    The lock is `BoundedSemaphore`, a lock with acquire limit equals to `limit` attribute.
+    The lock is `AdaptiveLimiter`, a lock with acquire limit which starts from `limit` attribute and is adjusted
+      up to `max_limit` attribute by success rate and latency of the operations it guards.
     """
     # TODO: Does not support multiprocessing, look at multiprocessing.Queue.__getstate__ as example
     limit: int = 5
+    max_limit: int = None
     _hash_items: str = 'host'
     _hash_items_splitted: list = ['host']
 
-    def __init__(self, limit: int = None, hash_items: str = None):
+    def __init__(self, limit: int = None, hash_items: str = None, max_limit: int = None):
         if limit is not None:
             self.limit = limit
         if hash_items is not None:
             self.hash_items = hash_items
+        if max_limit is not None:
+            self.max_limit = max_limit
         self._read_lock = Lock()
         super().__init__()
 
@@ -197,7 +233,7 @@ class FloodPreventingFacility(dict):
         self._hash_items_splitted = hash_items.split(',')
 
     def __reduce__(self):
-        return self.__class__, (self.limit, self.hash_items)
+        return self.__class__, (self.limit, self.hash_items, self.max_limit)
 
     def _get_hash(self, session: object) -> str:
         """Calculate hash.
@@ -209,14 +245,14 @@ class FloodPreventingFacility(dict):
             lock_hash.append(getattr(session, hash_item, 'NONE'))
         return '|'.join(lock_hash)
 
-    def get_lock(self, session: object) -> BoundedSemaphore:
+    def get_lock(self, session: object) -> AdaptiveLimiter:
         """Get a lock from the store based on that hash, if there is no any - create it and return.
         """
         lock_hash = self._get_hash(session)
         with self._read_lock:
             lock = self.get(lock_hash, None)
             if lock is None:
-                self[lock_hash] = lock = BoundedSemaphore(self.limit)
+                self[lock_hash] = lock = AdaptiveLimiter(self.limit, max_limit=self.max_limit)
         return lock
 
     def acquire(self, session: object, blocking: bool = True):
@@ -229,8 +265,15 @@ class FloodPreventingFacility(dict):
         """
         self[self._get_hash(session)].release()
 
+    def get_metrics(self) -> Dict[str, dict]:
+        """Return current limit, success rate, latency and backoff of the operations for each hash.
+        """
+        with self._read_lock:
+            locks = dict(self)
+        return {lock_hash: lock.get_metrics() for lock_hash, lock in locks.items()}
+
 
-DEFAULT_FLOOD_PREVENTING = FloodPreventingFacility(hash_items='host', limit=2)
+DEFAULT_FLOOD_PREVENTING = FloodPreventingFacility(hash_items='host', limit=2, max_limit=16)
 
 
 class Client:  # pylint: disable=too-many-instance-attributes
@@ -283,11 +326,16 @@ class Client:  # pylint: disable=too-many-instance-attributes
     keepalive_seconds: int = 60
     timings: Timings = Timings()
     flood_preventing: FloodPreventingFacility = DEFAULT_FLOOD_PREVENTING
+    # Number of channels which are opened in advance for next commands
+    channels_pool_size: int = 1
+    # Run commands without `env' in a long-lived remote shell instead of opening a channel for each of them
+    persistent_shell: bool = False
 
-    def __init__(self, host: str, user: str, password: str = None,  # pylint: disable=too-many-arguments
+    def __init__(self, host: str, user: str, password: str = None,  # pylint: disable=too-many-arguments,too-many-locals
                  port: int = None, pkey: str = None, allow_agent: bool = None, forward_ssh_agent: bool = None,
                  proxy_host: str = None, keepalive_seconds: int = None, timings: Timings = None,
-                 flood_preventing: FloodPreventingFacility = None):
+                 flood_preventing: FloodPreventingFacility = None, channels_pool_size: int = None,
+                 persistent_shell: bool = None):
         self.host = host
         self.user = user
         if password is not None:
@@ -308,14 +356,21 @@ class Client:  # pylint: disable=too-many-instance-attributes
             self.timings = timings
         if flood_preventing is not None:
             self.flood_preventing = flood_preventing
+        if channels_pool_size is not None:
+            self.channels_pool_size = channels_pool_size
+        if persistent_shell is not None:
+            self.persistent_shell = persistent_shell
         self.channel_lock = Lock()
         self.session: Optional[Session] = None
         self.sock: Optional[socket] = None
+        self._channels_pool: List[Channel] = []
+        self._shell: Optional[PersistentShell] = None
 
     def __reduce__(self):
         return self.__class__, (
             self.host, self.user, self.password, self.port, self.pkey, self.allow_agent, self.forward_ssh_agent,
-            self.proxy_host, self.keepalive_seconds, self.timings, self.flood_preventing)
+            self.proxy_host, self.keepalive_seconds, self.timings, self.flood_preventing, self.channels_pool_size,
+            self.persistent_shell)
 
     def __enter__(self):
         return self
@@ -411,6 +466,7 @@ class Client:  # pylint: disable=too-many-instance-attributes
             if family is None:
                 raise ValueError(f"Can't resolve '{host}' to and ip")
         self.sock = socket(family, SOCK_STREAM)
+        self.sock.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
         if self.timings.socket_timeout:
             self.sock.settimeout(self.timings.socket_timeout)
         try:
@@ -422,43 +478,43 @@ class Client:  # pylint: disable=too-many-instance-attributes
             raise ConnectError("Error connecting to host '%s:%s' - %s" % (host, port, str(error_type)))
 
     @staticmethod
-    def _process_output(  # pylint: disable=too-many-arguments, too-many-branches
+    def _process_output(  # pylint: disable=too-many-arguments
             watchers: List[StreamWatcher], encoding: str, stdout_stream: StringIO, stderr_stream: StringIO,
             reader: SSHReaderThread, timeout: NullableTiming, timeout_read_data_chunk: NullableTiming):
         """Separate different approach for the case when watchers are present, since watchers are slow,
           we can loose data due to the socket buffer limit, if endpoint sending it faster than watchers can read it.
-        To avoid that we run `SSHReaderThread` thread that picks data up from the socket, splits it into lines
-        and puts it to stdout and stderr `Queues`.
-        Meanwhile this function reads data from these `Queues` and store them in StringIO and throw it to the watchers
+        To avoid that we run `SSHReaderThread` thread that picks data up from the socket and puts chunks of stdout
+        and stderr to a `Queue`.
+        Meanwhile this function reads chunks from this `Queue`, decodes them, stores in StringIO and throws them to
+        the watchers
         """
         reader.start()
         if timeout:
             end_time = perf_counter() + timeout
         else:
             end_time = float_info.max
-        while reader.is_alive() or reader.stdout.qsize() or reader.stderr.qsize():
+        feeders = {
+            SSHReaderThread.STDOUT: OutputFeeder(stdout_stream, watchers, encoding),
+            SSHReaderThread.STDERR: OutputFeeder(stderr_stream, watchers, encoding),
+        }
+        if stdout_stream is None:
+            del feeders[SSHReaderThread.STDOUT]
+        if stderr_stream is None:
+            del feeders[SSHReaderThread.STDERR]
+        while True:
             if perf_counter() > end_time:
                 reader.stop()
                 return False
-            if stdout_stream is not None:
-                try:
-                    stdout = reader.stdout.get(timeout=timeout_read_data_chunk)
-                    data = stdout.decode(encoding) + '\n'
-                    stdout_stream.write(data)
-                    for watcher in watchers:
-                        watcher.submit_line(data)
-                except:  # pylint: disable=bare-except
-                    pass
-            if stderr_stream is not None:
-                if reader.stderr.qsize():
-                    try:
-                        stderr = reader.stderr.get(timeout=timeout_read_data_chunk)
-                        data = stderr.decode(encoding) + '\n'
-                        stderr_stream.write(data)
-                        for watcher in watchers:
-                            watcher.submit_line(data)
-                    except:  # pylint: disable=bare-except
-                        pass
+            try:
+                item = reader.output.get(timeout=timeout_read_data_chunk)
+            except Empty:
+                continue
+            if item is None:
+                break
+            if (feeder := feeders.get(item[0])) is not None:
+                feeder.feed(item[1])
+        for feeder in feeders.values():
+            feeder.feed(b'', final=True)
         return True
 
     @staticmethod
@@ -470,6 +526,8 @@ class Client:  # pylint: disable=too-many-instance-attributes
             end_time = perf_counter() + timeout
         else:
             end_time = float_info.max
+        stdout_decoder = getincrementaldecoder(encoding)()
+        stderr_decoder = getincrementaldecoder(encoding)()
         while eof_result == LIBSSH2_ERROR_EAGAIN or stdout_size == LIBSSH2_ERROR_EAGAIN or stdout_size > 0 or \
                 stderr_size == LIBSSH2_ERROR_EAGAIN or stderr_size > 0:  # pylint: disable=consider-using-in
             if perf_counter() > end_time:
@@ -481,9 +539,13 @@ class Client:  # pylint: disable=too-many-instance-attributes
                 stdout_size, stdout_chunk = channel.read()
                 stderr_size, stderr_chunk = channel.read_stderr()
             if stdout_chunk and stdout_stream is not None:
-                stdout_stream.write(stdout_chunk.decode(encoding))
+                stdout_stream.write(stdout_decoder.decode(stdout_chunk))
             if stderr_chunk and stderr_stream is not None:
-                stderr_stream.write(stderr_chunk.decode(encoding))
+                stderr_stream.write(stderr_decoder.decode(stderr_chunk))
+        if stdout_stream is not None:
+            stdout_stream.write(stdout_decoder.decode(b'', True))
+        if stderr_stream is not None:
+            stderr_stream.write(stderr_decoder.decode(b'', True))
         return True
 
     def check_if_alive(self, timeout: NullableTiming = __DEFAULT__):
@@ -500,8 +562,8 @@ class Client:  # pylint: disable=too-many-instance-attributes
             timeout = self.timings.connect_timeout
         if not timeout:
             try:
-                with self.flood_preventing.get_lock(self):
-                    self._connect()
+                with self.flood_preventing.get_lock(self) as lock:
+                    self._connect_and_report(lock)
             except Exception as exc:
                 self.disconnect()
                 raise ConnectError(str(exc))
@@ -510,9 +572,9 @@ class Client:  # pylint: disable=too-many-instance-attributes
         delays_iter = iter(self.timings.connect_delays)
         delay = next(delays_iter)
         while True:
-            with self.flood_preventing.get_lock(self):
+            with self.flood_preventing.get_lock(self) as lock:
                 try:
-                    self._connect()
+                    self._connect_and_report(lock)
                     break
                 except AuthenticationError:
                     self.disconnect()
@@ -522,10 +584,23 @@ class Client:  # pylint: disable=too-many-instance-attributes
                     if perf_counter() > end_time:
                         raise ConnectTimeout(
                             f'Failed to connect in {timeout} seconds, last error: ({type(exc).__name__}){str(exc)}')
-            delay = next(delays_iter, delay)
+            delay = max(next(delays_iter, delay), lock.backoff)
             sleep(delay)
         return
 
+    def _connect_and_report(self, lock: AdaptiveLimiter):
+        """Connect and report the result to the flood preventing lock, so it can adjust the limit.
+        """
+        start_time = perf_counter()
+        try:
+            self._connect()
+        except AuthenticationError:
+            raise
+        except Exception:
+            lock.report_failure()
+            raise
+        lock.report_success(perf_counter() - start_time)
+
     def _connect(self):
         self._init_socket(self.host, self.port)
         self._init_ssh()
@@ -537,6 +612,8 @@ class Client:  # pylint: disable=too-many-instance-attributes
         if self.keepalive_thread:
             self.keepalive_thread.stop()
             self.keepalive_thread = None
+        self._channels_pool.clear()
+        self._shell = None
         if self.session is not None:
             try:
                 self.session.eagain(self.session.disconnect)
@@ -582,6 +659,8 @@ class Client:  # pylint: disable=too-many-instance-attributes
             stdout='',
             stderr=''
         )
+        if self.persistent_shell and not env:
+            return self._run_in_persistent_shell(command, encoding, watchers, timeout, result, warn, stdout, stderr)
         channel: Optional[Channel] = None
         try:
             if self.session is None:
@@ -619,6 +698,41 @@ class Client:  # pylint: disable=too-many-instance-attributes
                 exception = FailedToReadCommandOutput(result, exc)
         return self._complete_run(channel, exception, timeout_reached, timeout, result, warn, stdout, stderr)
 
+    def _run_in_persistent_shell(  # pylint: disable=too-many-arguments,redefined-outer-name
+            self, command: str, encoding: str, watchers: Optional[List[StreamWatcher]], timeout: NullableTiming,
+            result: Result, warn: bool, stdout: StringIO, stderr: StringIO) -> Result:
+        """Run command in the persistent shell, start the shell if needed.
+
+        The shell is closed if the command is not completed, because its state is unknown after that.
+        """
+        try:
+            if self.session is None:
+                self.connect()
+            if self._shell is None:
+                self._shell = PersistentShell(self.session, self.execute(PERSISTENT_SHELL_COMMAND))
+        except Exception as exc:  # pylint: disable=broad-except
+            return self._complete_run(
+                None, FailedToRunCommand(result, exc), False, timeout, result, warn, stdout, stderr)
+        exception = None
+        try:
+            result.exited = self._shell.run(
+                command, encoding, stdout, stderr, watchers or [], timeout,
+                self.timings.interactive_read_data_chunk_timeout if watchers else self.timings.read_data_chunk_timeout)
+        except Exception as exc:  # pylint: disable=broad-except
+            exception = FailedToReadCommandOutput(result, exc)
+        if exception is not None or result.exited is None:
+            self._close_persistent_shell()
+        return self._complete_run(
+            None, exception, exception is None and result.exited is None, timeout, result, warn, stdout, stderr)
+
+    def _close_persistent_shell(self):
+        if self._shell is not None:
+            try:
+                self._shell.close()
+            except Exception as exc:  # pylint: disable=broad-except
+                print(f'Failed to close persistent shell due to the following error: {exc}')
+            self._shell = None
+
     @staticmethod
     def _apply_env(channel: Channel, env: Dict[str, str]):
         if env:
@@ -630,7 +744,7 @@ class Client:  # pylint: disable=too-many-instance-attributes
                       stdout: StringIO, stderr: StringIO) -> Result:
         """Complete executing command and return result, no matter what had happened.
         """
-        exit_status = None
+        exit_status = result.exited
         result.stdout = stdout.getvalue()
         result.stderr = stderr.getvalue()
         if channel is not None:
@@ -645,6 +759,7 @@ class Client:  # pylint: disable=too-many-instance-attributes
             exit_status = channel.get_exit_status()
             self.session.drop_channel(channel)
             result.exited = exit_status
+            self._open_channel_in_advance()
         if exception:
             raise exception
         if timeout_reached:
@@ -663,9 +778,25 @@ class Client:  # pylint: disable=too-many-instance-attributes
         self.session.eagain(channel.execute, args=(cmd,))
         return channel
 
+    def _open_channel_in_advance(self) -> None:
+        """Start opening of a channel for a next command and don't wait for the reply of the endpoint.
+
+        The opening is completed by `open_channel`, so the channel setup round trip overlaps with the time between
+        commands instead of being added to the latency of the next command.
+        """
+        if self.session is None or len(self._channels_pool) >= self.channels_pool_size:
+            return
+        try:
+            with self.session.lock:
+                chan = self.session.open_session()
+        except Exception:  # pylint: disable=broad-except
+            return
+        if chan != LIBSSH2_ERROR_EAGAIN:
+            self._channels_pool.append(chan)
+
     def open_channel(self) -> Channel:
-        """Open new channel in ssh2 session"""
-        chan = LIBSSH2_ERROR_EAGAIN
+        """Open new channel in ssh2 session or take one from the pool of channels opened in advance"""
+        chan = self._channels_pool.pop() if self._channels_pool else LIBSSH2_ERROR_EAGAIN
         timeout = self.timings.open_channel_timeout
         if timeout:
             end_time = perf_counter() + timeout
@@ -673,7 +804,7 @@ class Client:  # pylint: disable=too-many-instance-attributes
             end_time = float_info.max
         delay_iter = iter(self.timings.open_channel_delays)
         delay = next(delay_iter)
-        while chan == LIBSSH2_ERROR_EAGAIN:
+        while chan == LIBSSH2_ERROR_EAGAIN:  # an opening started by `_open_channel_in_advance' is completed here
             try:
                 chan = self.session.eagain(self.session.open_session)
                 if chan != LIBSSH2_ERROR_EAGAIN:
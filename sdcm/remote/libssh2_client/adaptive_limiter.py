@@ -0,0 +1,129 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+from time import perf_counter
+from threading import Condition
+from typing import Optional
+
+# Weight of a new sample in the average latency, same as for smoothed RTT in TCP
+LATENCY_SMOOTHING_FACTOR = 0.125
+
+
+class AdaptiveLimiter:  # pylint: disable=too-many-instance-attributes
+    """A semaphore which limit is adjusted by results of the operations it guards, like TCP congestion window.
+
+    The limit is doubled while it's below the threshold (slow start) and grows by one per `limit' successful
+      operations after that (additive increase), up to `max_limit'.
+    A failure or an operation which took more than `latency_factor' times the minimal latency halves the limit and
+      sets the threshold to it (multiplicative decrease), it's done once per average latency at most, because
+      operations which were started concurrently are likely to fail for the same reason.
+    Consecutive failures also increase `backoff', a delay which callers should wait before the next attempt.
+    """
+
+    def __init__(self, limit: int, max_limit: int = None, min_limit: int = 1,  # pylint: disable=too-many-arguments
+                 latency_factor: float = 4, backoff_base: float = 0.1, max_backoff: float = 15):
+        self.min_limit = min_limit
+        self.max_limit = limit if max_limit is None else max(max_limit, limit)
+        self.latency_factor = latency_factor
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self._window = float(limit)
+        self._threshold = float(self.max_limit)
+        self._in_flight = 0
+        self._condition = Condition()
+        self._decreased_at = 0.0
+        self._consecutive_failures = 0
+        self.attempts = 0
+        self.successes = 0
+        self.failures = 0
+        self.min_latency: Optional[float] = None
+        self.avg_latency: Optional[float] = None
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._window))
+
+    @property
+    def backoff(self) -> float:
+        if not self._consecutive_failures:
+            return 0
+        return min(self.max_backoff, self.backoff_base * 2 ** (self._consecutive_failures - 1))
+
+    def acquire(self, blocking: bool = True, timeout: float = None) -> bool:
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._in_flight < self.limit, timeout if blocking else 0):
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self):
+        with self._condition:
+            if self._in_flight <= 0:
+                raise ValueError("Limiter released too many times")
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def report_success(self, latency: float):
+        with self._condition:
+            self.attempts += 1
+            self.successes += 1
+            self._consecutive_failures = 0
+            if self.min_latency is None:
+                self.min_latency = self.avg_latency = latency
+            else:
+                self.min_latency = min(self.min_latency, latency)
+                self.avg_latency += LATENCY_SMOOTHING_FACTOR * (latency - self.avg_latency)
+            if latency > self.latency_factor * self.min_latency:
+                self._decrease()
+                return
+            if self._window < self._threshold:
+                self._window = min(self._window + 1, self._threshold)
+            else:
+                self._window += 1 / self._window
+            self._window = min(self._window, self.max_limit)
+            self._condition.notify_all()
+
+    def report_failure(self):
+        with self._condition:
+            self.attempts += 1
+            self.failures += 1
+            self._consecutive_failures += 1
+            self._decrease()
+
+    def _decrease(self):
+        now = perf_counter()
+        if now - self._decreased_at < (self.avg_latency or 0):
+            return
+        self._decreased_at = now
+        self._window = self._threshold = max(self._window / 2, self.min_limit)
+
+    def get_metrics(self) -> dict:
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "attempts": self.attempts,
+                "successes": self.successes,
+                "failures": self.failures,
+                "success_rate": self.successes / self.attempts if self.attempts else None,
+                "min_latency": self.min_latency,
+                "avg_latency": self.avg_latency,
+                "backoff": self.backoff,
+            }
@@ -0,0 +1,186 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+from codecs import getincrementaldecoder
+from io import StringIO
+from select import poll, POLLIN, POLLOUT  # pylint: disable=no-name-in-module
+from sys import float_info
+from time import perf_counter
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+
+from ssh2.channel import Channel  # pylint: disable=no-name-in-module
+from ssh2.error_codes import LIBSSH2_ERROR_EAGAIN  # pylint: disable=no-name-in-module
+from ssh2.session import (  # pylint: disable=no-name-in-module
+    LIBSSH2_SESSION_BLOCK_INBOUND, LIBSSH2_SESSION_BLOCK_OUTBOUND)
+
+from .exceptions import CommandTimedOut, FailedToReadCommandOutput, FailedToRunCommand
+from .result import Result
+from .timings import NullableTiming
+
+# Max time to wait for any of the sessions to be ready, to re-check timeouts
+MULTIPLEXER_POLL_TIMEOUT = 1  # seconds
+# Max number of steps of a command before switching to other ones
+MULTIPLEXER_STEPS_PER_TURN = 16
+
+
+class MultiplexedResult(NamedTuple):
+    key: Any
+    result: Result
+    exc: Optional[Exception]
+
+
+class _MultiplexedCommand:  # pylint: disable=too-many-instance-attributes
+    """State of a command on one of the clients, each step does as much as it can without blocking.
+
+    A step returns True if it made a progress and False if it should be called again when the session socket
+    is ready for `block_directions()' of the session.
+    """
+
+    def __init__(self, key: Any, client, command: str, encoding: str):
+        self.key = key
+        self.client = client
+        self.session = client.session
+        self.command = command
+        self.channel: Optional[Channel] = None
+        self.result = Result(command=command, encoding=encoding, stdout='', stderr='')
+        self.exc: Optional[Exception] = None
+        self.done = False
+        self._stdout = StringIO()
+        self._stderr = StringIO()
+        self._stdout_decoder = getincrementaldecoder(encoding)()
+        self._stderr_decoder = getincrementaldecoder(encoding)()
+        self._step = self._open_channel
+
+    def step(self) -> bool:
+        try:
+            with self.session.lock:
+                return self._step()
+        except Exception as exc:  # pylint: disable=broad-except
+            if self._step in (self._open_channel, self._execute):
+                self.fail(FailedToRunCommand(self.result, exc))
+            else:
+                self.fail(FailedToReadCommandOutput(self.result, exc))
+            return True
+
+    def fileno(self) -> int:
+        return self.session.sock.fileno()
+
+    def poll_events(self) -> int:
+        directions = self.session.block_directions()
+        events = 0
+        if directions & LIBSSH2_SESSION_BLOCK_INBOUND:
+            events |= POLLIN
+        if directions & LIBSSH2_SESSION_BLOCK_OUTBOUND:
+            events |= POLLOUT
+        return events or POLLIN
+
+    def _open_channel(self) -> bool:
+        # pylint: disable=protected-access
+        channel = self.client._channels_pool.pop() if self.client._channels_pool else self.session.open_session()
+        if channel == LIBSSH2_ERROR_EAGAIN:
+            return False
+        self.channel = channel
+        self._step = self._execute
+        return True
+
+    def _execute(self) -> bool:
+        if self.channel.execute(self.command) == LIBSSH2_ERROR_EAGAIN:
+            return False
+        self._step = self._read
+        return True
+
+    def _read(self) -> bool:
+        stdout_size, stdout_chunk = self.channel.read()
+        stderr_size, stderr_chunk = self.channel.read_stderr()
+        if stdout_chunk:
+            self._stdout.write(self._stdout_decoder.decode(stdout_chunk))
+        if stderr_chunk:
+            self._stderr.write(self._stderr_decoder.decode(stderr_chunk))
+        if stdout_size > 0 or stderr_size > 0:
+            return True
+        if stdout_size == LIBSSH2_ERROR_EAGAIN or stderr_size == LIBSSH2_ERROR_EAGAIN or not self.channel.eof():
+            return False
+        self._stdout.write(self._stdout_decoder.decode(b'', True))
+        self._stderr.write(self._stderr_decoder.decode(b'', True))
+        self._step = self._close
+        return True
+
+    def _close(self) -> bool:
+        if self.channel.close() == LIBSSH2_ERROR_EAGAIN:
+            return False
+        self._step = self._wait_closed
+        return True
+
+    def _wait_closed(self) -> bool:
+        if self.channel.wait_closed() == LIBSSH2_ERROR_EAGAIN:
+            return False
+        self.result.exited = self.channel.get_exit_status()
+        self._complete()
+        return True
+
+    def _complete(self):
+        self.result.stdout = self._stdout.getvalue()
+        self.result.stderr = self._stderr.getvalue()
+        if self.channel is not None:
+            self.session.drop_channel(self.channel)
+            self.channel = None
+        self.done = True
+
+    def fail(self, exc: Exception):
+        self.exc = exc
+        self._complete()
+
+
+def run_on_all(clients: Dict[Any, Any], command: str, timeout: NullableTiming = None,
+               encoding: str = 'utf-8') -> Iterator[MultiplexedResult]:
+    """Run the same command using each of connected `clients' and yield results as commands complete.
+
+    All the commands are driven by a single loop which polls sockets of the sessions, so no thread is used per client.
+    Exit status is not checked, an error to run a command or to read its output is returned in `exc' field.
+    """
+
+    end_time = float_info.max if timeout is None else perf_counter() + timeout
+    # Commands which can make a progress without waiting and commands which wait for their sockets
+    ready = [_MultiplexedCommand(key, client, command, encoding) for key, client in clients.items()]
+    waiting = []
+    while ready or waiting:
+        if perf_counter() > end_time:
+            for cmd in ready + waiting:
+                cmd.fail(CommandTimedOut(cmd.result, timeout))
+                yield MultiplexedResult(key=cmd.key, result=cmd.result, exc=cmd.exc)
+            break
+        still_ready = []
+        for cmd in ready:
+            progress = True
+            for _ in range(MULTIPLEXER_STEPS_PER_TURN):  # don't let a command with a long output starve others
+                if cmd.done or not (progress := cmd.step()):
+                    break
+            if cmd.done:
+                cmd.client._open_channel_in_advance()  # pylint: disable=protected-access
+                yield MultiplexedResult(key=cmd.key, result=cmd.result, exc=cmd.exc)
+            elif progress:
+                still_ready.append(cmd)
+            else:
+                waiting.append(cmd)
+        ready = still_ready
+        if not waiting:
+            continue
+        poller = poll()
+        by_fd = {}
+        for cmd in waiting:
+            by_fd[cmd.fileno()] = cmd
+            poller.register(cmd.fileno(), cmd.poll_events())
+        poll_timeout = 0 if ready else min(MULTIPLEXER_POLL_TIMEOUT, max(end_time - perf_counter(), 0))
+        for fd, _ in poller.poll(poll_timeout * 1000):
+            ready.append(by_fd.pop(fd))
+        waiting = list(by_fd.values())
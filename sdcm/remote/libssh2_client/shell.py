@@ -0,0 +1,151 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+from io import StringIO
+from sys import float_info
+from time import perf_counter
+from shlex import quote
+from uuid import uuid4
+from typing import List, Optional
+
+from ssh2.channel import Channel  # pylint: disable=no-name-in-module
+from ssh2.error_codes import LIBSSH2_ERROR_EAGAIN  # pylint: disable=no-name-in-module
+
+from .session import Session
+from .timings import NullableTiming
+
+LINESEP = b'\n'
+
+PERSISTENT_SHELL_COMMAND = 'exec /bin/bash'
+
+
+class PersistentShellOutput:  # pylint: disable=too-few-public-methods
+    """Output stream of a command which runs in `PersistentShell`, which ends with a delimiter line."""
+
+    def __init__(self, delimiter: bytes, stream: Optional[StringIO], watchers: list, encoding: str):
+        self.delimiter = LINESEP + delimiter
+        self.stream = stream
+        self.watchers = watchers
+        self.encoding = encoding
+        self.data = bytearray()
+        self.submitted = 0
+        self.delimiter_start = None
+        self.end = None
+        self.tail = b''
+
+    def feed(self, chunk: bytes) -> None:
+        """Add a chunk of data and submit complete lines to the watchers.
+
+        The last complete line is held back until the next one, because its line separator can be the first byte
+        of the delimiter, which is not a part of the command output.
+        """
+
+        if self.delimiter_start is None:
+            search_from = max(len(self.data) - len(self.delimiter) + 1, self.submitted)
+            self.data += chunk
+            if (delimiter_start := self.data.find(self.delimiter, search_from)) >= 0:
+                self.delimiter_start = delimiter_start
+        else:
+            self.data += chunk
+        if self.delimiter_start is not None \
+                and (tail_end := self.data.find(LINESEP, self.delimiter_start + len(self.delimiter))) >= 0:
+            self.end = self.delimiter_start
+            self.tail = bytes(self.data[self.end + len(self.delimiter):tail_end])
+            self._submit_lines(self.end, last=True)
+        elif self.watchers:
+            self._submit_lines(self.data.rfind(LINESEP, 0, self.data.rfind(LINESEP)) + 1)
+
+    def _submit_lines(self, end: int, last: bool = False) -> None:
+        if self.watchers and end > self.submitted:
+            lines = self.data[self.submitted:end].split(LINESEP)
+            if not last or not lines[-1]:
+                lines.pop()
+            for line in lines:
+                data = line.decode(self.encoding) + '\n'
+                for watcher in self.watchers:
+                    watcher.submit_line(data)
+        self.submitted = max(self.submitted, end)
+
+    def complete(self) -> None:
+        if self.stream is not None:
+            output = self.data[:self.end].decode(self.encoding)
+            if self.watchers and output and not output.endswith('\n'):
+                output += '\n'  # same as output of a command with watchers which runs in a separate channel
+            self.stream.write(output)
+
+
+class PersistentShell:
+    """Long-lived remote shell which runs short commands one by one without opening a channel for each of them.
+
+    Each command runs in a subshell with stdin redirected from /dev/null, so it can't change the state of the shell
+    or read the commands that follow.  End of the output of a command is framed by a delimiter line which is unique
+    for the command and is written to both stdout and stderr; stdout one has the exit status of the command.
+    """
+
+    def __init__(self, session: Session, channel: Channel):
+        self._session = session
+        self._channel = channel
+        self._delimiter = f'__SCT_SHELL_{uuid4().hex}'
+        self._commands_count = 0
+
+    @property
+    def channel(self) -> Channel:
+        return self._channel
+
+    def _write(self, data: bytes, timeout: NullableTiming) -> None:
+        while data:
+            with self._session.lock:
+                size, written = self._channel.write(data)
+                if size == LIBSSH2_ERROR_EAGAIN:
+                    self._session.simple_select(timeout=timeout)
+                    continue
+            data = data[written:]
+
+    def run(self, command: str, encoding: str,  # pylint: disable=too-many-arguments
+            stdout_stream: Optional[StringIO], stderr_stream: Optional[StringIO], watchers: List,
+            timeout: NullableTiming, timeout_read_data_chunk: NullableTiming) -> Optional[int]:
+        """Run command and return its exit status or None if the timeout is reached.
+
+        Raise EOFError if the shell was closed before the end of the command output.
+        """
+
+        self._commands_count += 1
+        delimiter = f'{self._delimiter}_{self._commands_count}_'
+        self._write(
+            f'( eval {quote(command)} ) </dev/null; '
+            f"printf '\\n{delimiter} %d\\n' $?; printf '\\n{delimiter}\\n' >&2\n".encode(),
+            timeout=timeout_read_data_chunk)
+        stdout = PersistentShellOutput(delimiter.encode(), stdout_stream, watchers, encoding)
+        stderr = PersistentShellOutput(delimiter.encode(), stderr_stream, watchers, encoding)
+        end_time = float_info.max if timeout is None else perf_counter() + timeout
+        stdout_size = stderr_size = LIBSSH2_ERROR_EAGAIN
+        while stdout.end is None or stderr.end is None:
+            if perf_counter() > end_time:
+                return None
+            with self._session.lock:
+                if stdout_size == LIBSSH2_ERROR_EAGAIN and stderr_size == LIBSSH2_ERROR_EAGAIN:  # pylint: disable=consider-using-in
+                    self._session.simple_select(timeout=timeout_read_data_chunk)
+                stdout_size, stdout_chunk = self._channel.read()
+                stderr_size, stderr_chunk = self._channel.read_stderr()
+                if self._channel.eof() and not stdout_chunk and not stderr_chunk:
+                    raise EOFError('Persistent shell has been closed')
+            if stdout_chunk:
+                stdout.feed(stdout_chunk)
+            if stderr_chunk:
+                stderr.feed(stderr_chunk)
+        stdout.complete()
+        stderr.complete()
+        return int(stdout.tail)
+
+    def close(self) -> None:
+        self._session.drop_channel(self._channel)
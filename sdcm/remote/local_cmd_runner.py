@@ -80,14 +80,18 @@ class LocalCmdRunner(CommandRunner):  # pylint: disable=too-few-public-methods
                     self._print_command_results(details.result, verbose, ignore_status)
                 raise
 
-        result = _run()
+        try:
+            result = _run()
+        finally:
+            self._close_watchers(watchers)
         self._print_command_results(result, verbose, ignore_status)
         return result
 
     @retrying(n=3, sleep_time=5, allowed_exceptions=(RetryableNetworkException,))
     def receive_files(  # pylint: disable=too-many-arguments,unused-argument
             self, src: str, dst: str, delete_dst: bool = False, preserve_perm: bool = True,
-            preserve_symlinks: bool = False, timeout: float = 300) -> bool:  # pylint: disable=too-many-arguments,unused-argument
+            preserve_symlinks: bool = False, timeout: float = 300,
+            chunked: bool = False) -> bool:  # pylint: disable=too-many-arguments,unused-argument
         if src == dst:
             return True
         return self.run(f'cp {src} {dst}', timeout=timeout).ok
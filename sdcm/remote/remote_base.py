@@ -12,7 +12,8 @@
 # Copyright (c) 2020 ScyllaDB
 
 from abc import abstractmethod
-from typing import Type, Tuple, List, Optional
+from typing import Type, Tuple, List, Optional, Iterator, NamedTuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from shlex import quote
 import glob
 import os
@@ -27,9 +28,16 @@ from invoke.runners import Result
 from sdcm.utils.decorators import retrying
 
 from .base import RetryableNetworkException, CommandRunner
+from .chunked_transfer import ChunkedFileTransfer, ChunkedTransferError, CHUNKED_TRANSFER_MIN_FILE_SIZE
 from .local_cmd_runner import LocalCmdRunner
 
 
+class RunOnAllResult(NamedTuple):
+    remoter: 'RemoteCmdRunnerBase'
+    result: Optional[Result]
+    exc: Optional[Exception]
+
+
 class RemoteCmdRunnerBase(CommandRunner):  # pylint: disable=too-many-instance-attributes
     port: int = 22
     connect_timeout: int = 60
@@ -164,7 +172,8 @@ class RemoteCmdRunnerBase(CommandRunner):  # pylint: disable=too-many-instance-a
 
     @retrying(n=3, sleep_time=5, allowed_exceptions=(RetryableNetworkException,))
     def receive_files(self, src: str, dst: str, delete_dst: bool = False,  # pylint: disable=too-many-arguments
-                      preserve_perm: bool = True, preserve_symlinks: bool = False, timeout: float = 300):
+                      preserve_perm: bool = True, preserve_symlinks: bool = False, timeout: float = 300,
+                      chunked: bool = False):
         """
         Copy files from the remote host to a local path.
 
@@ -189,6 +198,9 @@ class RemoteCmdRunnerBase(CommandRunner):  # pylint: disable=too-many-instance-a
         :param preserve_symlinks: Try to preserve symlinks instead of
             transforming them into files/dirs on copy.
         :param timeout: Timeout in seconds.
+        :param chunked: Expect a single large regular file and try to receive it by ranges over several
+            concurrent SSH connections first.  It costs an extra remote command to get the size of the file,
+            so use it for big files only, like archives of logs.
 
         :raises: invoke.exceptions.UnexpectedExit, invoke.exceptions.Failure if the remote copy command failed.
         """
@@ -199,6 +211,11 @@ class RemoteCmdRunnerBase(CommandRunner):  # pylint: disable=too-many-instance-a
             src = [src]
         dst = os.path.abspath(dst)
 
+        if chunked and not preserve_symlinks and self._receive_file_by_chunks(src, dst, timeout):
+            if not preserve_perm:
+                self._set_umask_perms(dst)
+            return True
+
         # If rsync is disabled or fails, try scp.
         files_received = True
         try_scp = True
@@ -289,6 +306,9 @@ class RemoteCmdRunnerBase(CommandRunner):  # pylint: disable=too-many-instance-a
             src = [src]
         remote_dest = self._encode_remote_paths([dst])
 
+        if not delete_dst and not preserve_symlinks and self._send_file_by_chunks(src, dst):
+            return True
+
         # If rsync is disabled or fails, try scp.
         try_scp = True
         files_sent = True
@@ -353,6 +373,58 @@ class RemoteCmdRunnerBase(CommandRunner):  # pylint: disable=too-many-instance-a
                     files_sent = False
         return files_sent
 
+    def _get_chunked_file_transfer(self) -> ChunkedFileTransfer:
+        ssh_cmd = self._make_ssh_command(user=self.user, port=self.port, opts='-T', hosts_file=self.known_hosts_file,
+                                         key_file=self.key_file, extra_ssh_options=self.extra_ssh_options)
+        return ChunkedFileTransfer(remoter=self, ssh_command=ssh_cmd)
+
+    def _receive_file_by_chunks(self, src: List[str], dst: str, timeout: float) -> bool:
+        """
+        Receive a single large regular file by ranges over several concurrent SSH connections.
+
+        Return False if the source is not such file or if the transfer failed, so other ways should be tried.
+        """
+        if len(src) != 1 or src[0].endswith('/') or glob.has_magic(src[0]):
+            return False
+        remote_path = src[0]
+        transfer = self._get_chunked_file_transfer()
+        stat = transfer.get_remote_stat(remote_path)
+        if stat is None or stat.size < CHUNKED_TRANSFER_MIN_FILE_SIZE:
+            return False
+        local_path = os.path.join(dst, os.path.basename(remote_path)) if os.path.isdir(dst) else dst
+        try:
+            transfer.receive(remote_path, local_path, timeout=timeout, remote_stat=stat)
+        except (ChunkedTransferError, OSError, self.exception_failure, self.exception_unexpected) as ex:
+            self.log.warning("Trying rsync/scp, chunked transfer failed: %s", ex)
+            return False
+        os.chmod(local_path, stat.mode)
+        os.utime(local_path, (stat.mtime, stat.mtime))
+        return True
+
+    def _send_file_by_chunks(self, src: List[str], dst: str) -> bool:
+        """
+        Send a single large regular file by ranges over several concurrent SSH connections.
+
+        Return False if the source is not such file or if the transfer failed, so other ways should be tried.
+        """
+        if len(src) != 1:
+            return False
+        local_path = os.path.expanduser(src[0])
+        if not os.path.isfile(local_path) or os.path.getsize(local_path) < CHUNKED_TRANSFER_MIN_FILE_SIZE:
+            return False
+        remote_path = dst
+        if self.run(f"test -d {quote(dst)}", ignore_status=True, verbose=False).ok:
+            remote_path = os.path.join(dst, os.path.basename(local_path))
+        try:
+            self._get_chunked_file_transfer().send(local_path, remote_path)
+            stat = os.stat(local_path)
+            self.run(f"chmod {stat.st_mode & 0o7777:o} {quote(remote_path)} && "
+                     f"touch -m -d @{int(stat.st_mtime)} {quote(remote_path)}", verbose=False)
+        except (ChunkedTransferError, OSError, self.exception_failure, self.exception_unexpected) as ex:
+            self.log.warning("Trying rsync/scp, chunked transfer failed: %s", ex)
+            return False
+        return True
+
     def use_rsync(self) -> bool:
         if self._use_rsync is not None:
             return self._use_rsync
@@ -601,9 +673,32 @@ class RemoteCmdRunnerBase(CommandRunner):  # pylint: disable=too-many-instance-a
                 if self._run_on_exception(exc, verbose, ignore_status):
                     raise
 
-        result = _run()
+        try:
+            result = _run()
+        finally:
+            self._close_watchers(watchers)
         self._print_command_results(result, verbose, ignore_status)
         if change_context and result.ok:
             # Will trigger reconnect on next run for any connection that belongs to the remoter
             self._context_generation += 1
         return result
+
+    @classmethod
+    def run_on_all(cls, remoters: List['RemoteCmdRunnerBase'], cmd: str, timeout: Optional[float] = None,
+                   verbose: bool = True) -> Iterator[RunOnAllResult]:
+        """
+        Run same command on each of the remoters and yield results as commands complete.
+
+        Exit status is not checked, an exception raised while running the command is returned in `exc`.
+        This implementation runs a thread per remoter, subclasses can do it in a cheaper way.
+        """
+        if not remoters:
+            return
+        with ThreadPoolExecutor(max_workers=len(remoters)) as executor:
+            futures = {executor.submit(remoter.run, cmd, timeout=timeout, ignore_status=True, verbose=verbose): remoter
+                       for remoter in remoters}
+            for future in as_completed(futures):
+                if (exc := future.exception()) is not None:
+                    yield RunOnAllResult(remoter=futures[future], result=None, exc=exc)
+                else:
+                    yield RunOnAllResult(remoter=futures[future], result=future.result(), exc=None)
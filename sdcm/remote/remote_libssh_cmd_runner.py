@@ -14,13 +14,19 @@
 import os
 import time
 import socket
+import logging
+from typing import Iterator, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 
 from .libssh2_client import Client as LibSSH2Client, Timings
+from .libssh2_client.multiplexer import run_on_all
 from .libssh2_client.exceptions import AuthenticationException, UnknownHostException, ConnectError, \
     FailedToReadCommandOutput, CommandTimedOut, FailedToRunCommand, OpenChannelTimeout, SocketRecvError, \
     UnexpectedExit, Failure
 from .base import RetryableNetworkException
-from .remote_base import RemoteCmdRunnerBase
+from .remote_base import RemoteCmdRunnerBase, RunOnAllResult
+
+LOGGER = logging.getLogger(__name__)
 
 
 class RemoteLibSSH2CmdRunner(RemoteCmdRunnerBase, ssh_transport='libssh2'):  # pylint: disable=too-many-instance-attributes
@@ -31,6 +37,7 @@ class RemoteLibSSH2CmdRunner(RemoteCmdRunnerBase, ssh_transport='libssh2'):  # p
       And if it is not there, we create it.
     """
     connection: LibSSH2Client
+    persistent_shell: bool = False
     exception_unexpected = UnexpectedExit
     exception_failure = Failure
     exception_retryable = (
@@ -45,9 +52,52 @@ class RemoteLibSSH2CmdRunner(RemoteCmdRunnerBase, ssh_transport='libssh2'):  # p
             user=self.user,
             port=self.port,
             pkey=os.path.expanduser(self.key_file),
-            timings=Timings(keepalive_timeout=0, connect_timeout=self.connect_timeout)
+            timings=Timings(keepalive_timeout=0, connect_timeout=self.connect_timeout),
+            persistent_shell=self.persistent_shell,
         )
 
+    @classmethod
+    def run_on_all(cls, remoters: List['RemoteLibSSH2CmdRunner'], cmd: str, timeout: Optional[float] = None,
+                   verbose: bool = True) -> Iterator[RunOnAllResult]:
+        """Run same command on each of the remoters and yield results as commands complete.
+
+        Commands are multiplexed over connections of the current thread by a single loop, connections which are not
+          established yet are established concurrently first.
+        Exit status is not checked, an exception raised while running the command is returned in `exc`.
+        """
+        if verbose:
+            LOGGER.debug('Running command "%s" on %s...', cmd, ", ".join(remoter.hostname for remoter in remoters))
+        start_time = time.perf_counter()
+        connections = {}
+        for remoter in remoters:
+            connection = remoter.connection
+            if not remoter._is_connection_generation_ok(connection):  # pylint: disable=protected-access
+                connection.close()
+                remoter._bind_generation_to_connection(connection)  # pylint: disable=protected-access
+            connections[remoter] = connection
+        not_connected = [remoter for remoter, connection in connections.items() if connection.session is None]
+        if not_connected:
+            with ThreadPoolExecutor(max_workers=len(not_connected)) as executor:
+                connect_errors = executor.map(cls._try_to_connect, [connections[remoter] for remoter in not_connected])
+                for remoter, exc in zip(not_connected, connect_errors):
+                    if exc is not None:
+                        del connections[remoter]
+                        yield RunOnAllResult(remoter=remoter, result=None, exc=exc)
+        for remoter, result, exc in run_on_all(connections, cmd, timeout=timeout):
+            result.duration = time.perf_counter() - start_time
+            result.exit_status = result.exited
+            if exc is None:
+                remoter._print_command_results(result, verbose, ignore_status=True)  # pylint: disable=protected-access
+            yield RunOnAllResult(remoter=remoter, result=result, exc=exc)
+
+    @staticmethod
+    def _try_to_connect(connection: LibSSH2Client) -> Optional[Exception]:
+        try:
+            connection.connect()
+        except Exception as exc:  # pylint: disable=broad-except
+            return exc
+        return None
+
     def is_up(self, timeout: float = 30) -> bool:
         end_time = time.perf_counter() + timeout
         while time.perf_counter() <= end_time:
@@ -338,6 +338,9 @@ class SCTConfiguration(dict):
              help="""Turn on sct profiling"""),
         dict(name="ssh_transport", env="SSH_TRANSPORT", type=str,
              help="""Set type of ssh library to use. Could be 'fabric' (default) or 'libssh2'"""),
+        dict(name="ssh_persistent_shell", env="SCT_SSH_PERSISTENT_SHELL", type=boolean,
+             help="""If true, libssh2 transport runs commands in a long-lived remote shell
+                     instead of opening a new channel for each command"""),
         # should be removed once stress commands would be refactored
         dict(name="bench_run", env="SCT_BENCH_RUN", type=boolean,
              help="""If true would kill the scylla-bench thread in the test teardown"""),
@@ -56,6 +56,14 @@ class SctEventTypesRegistry(Dict[str, Type["SctEvent"]]):
         self[owner.__name__] = owner  # add owner class to the registry.
 
 
+def format_timestamp(timestamp: Optional[float]) -> str:
+    try:
+        return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    except (TypeError, OverflowError, OSError, ):
+        LOGGER.exception("Failed to format a timestamp: %r", timestamp)
+        return "0000-00-00 <UnknownTimestamp>"
+
+
 class SctEvent:
     _sct_event_types_registry: SctEventTypesRegistry = SctEventTypesRegistry()
     _events_processes_registry: Optional[EventsProcessesRegistry] = None
@@ -73,6 +81,9 @@ class SctEvent:
 
     _ready_to_publish: bool = False  # set it to True in __init__() and to False in publish() to prevent double-publish
 
+    coalesce_storms: bool = False  # coalesce storms of equivalent events by EventsDevice; see EventsCoalescer.
+    coalesced: Optional[Dict[str, Any]] = None  # set by EventsCoalescer for an event which summarizes a storm
+
     def __init_subclass__(cls, abstract: bool = False):
         # pylint: disable=unsupported-membership-test; pylint doesn't know about Dict
         if cls.__name__ in cls._sct_event_types_registry:
@@ -138,11 +149,7 @@ class SctEvent:
 
     @property
     def formatted_timestamp(self) -> str:
-        try:
-            return datetime.fromtimestamp(self.timestamp).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        except (TypeError, OverflowError, OSError, ):
-            LOGGER.exception("Failed to format a timestamp: %r", self.timestamp)
-            return "0000-00-00 <UnknownTimestamp>"
+        return format_timestamp(self.timestamp)
 
     def publish(self, warn_not_ready: bool = True) -> None:
         # pylint: disable=import-outside-toplevel; to avoid cyclic imports
@@ -195,6 +202,14 @@ class SctEvent:
         return {attr: value for attr, value in self.__dict__.items() if not attr.startswith("_")}
 
     def __str__(self):
+        if self.coalesced:
+            return self.formatter(self.msgfmt, self) + \
+                "\n(coalesced {count} similar events from {first} to {last}; samples:\n{samples})".format(
+                    count=self.coalesced["count"],
+                    first=format_timestamp(self.coalesced["first_timestamp"]),
+                    last=format_timestamp(self.coalesced["last_timestamp"]),
+                    samples="\n".join(self.coalesced["samples"]),
+                )
         return self.formatter(self.msgfmt, self)
 
     def __eq__(self, other):
@@ -0,0 +1,195 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+import os
+import re
+import time
+import atexit
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sdcm.sct_events import Severity
+from sdcm.sct_events.base import SctEvent
+from sdcm.sct_events.events_processes import verbose_suppress
+
+
+EVENTS_STORM_WINDOW: float = 10  # seconds
+EVENTS_STORM_THRESHOLD: int = 10  # equivalent events per window which are published one by one
+EVENTS_STORM_SAMPLES: int = 3  # lines of coalesced events to keep in a summary
+
+# Numbers, addresses and timestamps differ between otherwise equivalent log lines.
+NORMALIZE_MESSAGE_RE = re.compile(r"0x[0-9a-f]+|\d+", re.IGNORECASE)
+
+LOGGER = logging.getLogger(__name__)
+
+_EVENTS_COALESCER_INIT_LOCK = threading.Lock()
+
+EventsStormKey = Tuple[str, str, str]
+
+
+class EventsStorm:  # pylint: disable=too-few-public-methods
+    """State of equivalent events (same type, node and normalized message) in the current window."""
+
+    __slots__ = ("window_start", "count", "max_severity", "held", "held_severity", "first_timestamp",
+                 "last_timestamp", "samples", "last_event", )
+
+    def __init__(self, window_start: float, severity: Severity):
+        self.window_start = window_start
+        self.count = 1
+        self.max_severity = severity
+        self.held = 0
+        self.held_severity = Severity.UNKNOWN
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.samples: List[str] = []
+        self.last_event: Optional[SctEvent] = None
+
+
+class EventsCoalescer:
+    """Coalesce storms of equivalent events.
+
+    First `threshold' events of a kind in a `window' are published as is.  Next ones are held and published as
+    one summary event (the last held event with `coalesced' info) when the window ends.  The first occurrence and
+    any escalation of the severity above the already published ones (and all critical events) are never held.
+    Only events of classes with `coalesce_storms' set are coalesced.
+
+    EventsDevice coalesces events after filters are applied, so held events keep the filtering decision and the
+    severity which were in effect when they arrived.
+    """
+
+    def __init__(self,
+                 publish: Callable[[SctEvent], None],
+                 window: float = EVENTS_STORM_WINDOW,
+                 threshold: int = EVENTS_STORM_THRESHOLD,
+                 samples: int = EVENTS_STORM_SAMPLES):
+        self.publish = publish
+        self.window = window
+        self.threshold = threshold
+        self.samples = samples
+
+        self._pid = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pid"] = None  # per-process state should be initialized again.
+        for attr in ("_storms", "_lock", "_closed", "_flusher", ):
+            state.pop(attr, None)
+        return state
+
+    def _init_process_state(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with _EVENTS_COALESCER_INIT_LOCK:
+            if self._pid == os.getpid():
+                return
+            self._storms: Dict[EventsStormKey, EventsStorm] = {}  # storms inherited from the parent are its own.
+            self._lock = threading.RLock()
+            self._closed = threading.Event()
+            self._flusher = threading.Thread(target=self._flush_periodically, name=f"{self}-flusher", daemon=True)
+            self._pid = os.getpid()
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(timeout=self.window / 2):
+            with verbose_suppress("%s: failed to flush", self):
+                self.flush()
+
+    @staticmethod
+    def get_key(event: SctEvent) -> EventsStormKey:
+        message = getattr(event, "line", None) or str(event)
+        return (type(event).__name__,
+                str(getattr(event, "node", "")),
+                " ".join(NORMALIZE_MESSAGE_RE.sub("#", message).split()), )
+
+    def accept(self, event: SctEvent) -> bool:
+        """Return True if the event should be published now or hold it and return False."""
+
+        if not event.coalesce_storms or event.coalesced:
+            return True
+
+        self._init_process_state()
+        if self._closed.is_set():
+            return True  # nothing would publish a summary of the held events after the close.
+        key = self.get_key(event)
+        now = time.perf_counter()
+        with self._lock:
+            if (storm := self._storms.get(key)) is not None and now - storm.window_start >= self.window:
+                self._end_window(key=key, storm=storm, now=now)
+                storm = self._storms.get(key)
+            if storm is None:
+                self._storms[key] = EventsStorm(window_start=now, severity=event.severity)
+                return True
+            storm.count += 1
+            if storm.count <= self.threshold \
+                    or event.severity == Severity.CRITICAL or event.severity.value > storm.max_severity.value:
+                storm.max_severity = max(storm.max_severity, event.severity, key=lambda severity: severity.value)
+                return True
+            if not storm.held:
+                storm.first_timestamp = event.timestamp
+            storm.held += 1
+            storm.held_severity = max(storm.held_severity, event.severity, key=lambda severity: severity.value)
+            storm.last_timestamp = event.timestamp
+            if len(storm.samples) < self.samples:
+                storm.samples.append(getattr(event, "line", None) or str(event))
+            storm.last_event = event
+        return False
+
+    def _end_window(self, key: EventsStormKey, storm: EventsStorm, now: float) -> None:
+        if storm.held:
+            self._publish_summary(storm)
+            storm.count = self.threshold  # the storm continues: keep coalescing in the next window.
+            storm.window_start = now
+        else:
+            del self._storms[key]  # the storm is over or there was no storm at all.
+
+    def _publish_summary(self, storm: EventsStorm) -> None:
+        summary, storm.last_event = storm.last_event, None
+        summary.severity = storm.held_severity
+        summary.coalesced = {
+            "count": storm.held,
+            "first_timestamp": storm.first_timestamp,
+            "last_timestamp": storm.last_timestamp,
+            "samples": storm.samples,
+        }
+        storm.held = 0
+        storm.held_severity = Severity.UNKNOWN
+        storm.samples = []
+        with verbose_suppress("%s: failed to publish a summary of %s events", self, summary.coalesced["count"]):
+            self.publish(summary)
+
+    def flush(self, force: bool = False) -> None:
+        """Publish summaries of the ended windows (or of all windows if `force' is set) and forget quiet storms."""
+
+        if self._pid != os.getpid():
+            return
+        now = time.perf_counter()
+        with self._lock:
+            for key, storm in list(self._storms.items()):
+                if force and storm.held:
+                    self._publish_summary(storm)
+                elif now - storm.window_start >= self.window:
+                    self._end_window(key=key, storm=storm, now=now)
+
+    def close(self) -> None:
+        if self._pid != os.getpid():
+            return
+        self._closed.set()
+        self.flush(force=True)
+
+    def __str__(self):
+        return f"{type(self).__name__}[window={self.window},threshold={self.threshold}]"
+
+
+__all__ = ("EventsCoalescer", )
@@ -13,7 +13,7 @@
 
 import re
 import logging
-from typing import Type, List, Tuple, Generic, Optional
+from typing import Type, List, Tuple, Generic, Optional, Iterable
 
 from sdcm.sct_events import Severity, SctEventProtocol
 from sdcm.sct_events.base import SctEvent, LogEvent, LogEventProtocol, T_log_event
@@ -25,6 +25,8 @@ LOGGER = logging.getLogger(__name__)
 
 
 class DatabaseLogEvent(LogEvent, abstract=True):
+    coalesce_storms = True
+
     NO_SPACE_ERROR: Type[LogEventProtocol]
     UNKNOWN_VERB: Type[LogEventProtocol]
     CLIENT_DISCONNECT: Type[LogEventProtocol]
@@ -129,6 +131,85 @@ SYSTEM_ERROR_EVENTS_PATTERNS: List[Tuple[re.Pattern, LogEventProtocol]] = \
 BACKTRACE_RE = re.compile(r'(?P<other_bt>/lib.*?\+0x[0-f]*\n)|(?P<scylla_bt>0x[0-f]*\n)', re.IGNORECASE)
 
 
+def get_required_literal(regex: str) -> Optional[str]:
+    """Get the longest literal part of a simple regex which should be in any string matched by it.
+
+    Return None for regexes with alternatives, groups or character classes.
+    """
+
+    runs, run = [], ""
+    idx = 0
+    while idx < len(regex):
+        char = regex[idx]
+        idx += 1
+        if char == "\\":
+            char, idx = regex[idx:idx + 1], idx + 1
+            if char.isalnum():  # character classes and special sequences, e.g., `\d' or `\b'
+                runs.append(run)
+                run = ""
+                continue
+        elif char in "|([":
+            return None
+        elif char in "*?{":
+            runs.append(run[:-1])  # the previous character is optional
+            run = ""
+            if char == "{":
+                idx = regex.index("}", idx) + 1
+            continue
+        elif char in ".^$+":
+            runs.append(run)
+            run = ""
+            continue
+        run += char
+    return max((*runs, run), key=len) or None
+
+
+class SystemLogScanner:
+    """Find lines in a chunk of a system log which can match given patterns.
+
+    Patterns are reduced to required literals where possible, so a chunk is scanned for a few substrings instead of
+    running all regexes over each line.  Found lines should be checked using the original patterns.
+    """
+
+    def __init__(self, patterns: Iterable[str], literals: Iterable[str] = ()):
+        literals = {literal.lower().encode("utf-8") for literal in literals}
+        regexps = []
+        for pattern in patterns:
+            if literal := get_required_literal(pattern):
+                literals.add(literal.lower().encode("utf-8"))
+            else:
+                regexps.append(pattern)
+
+        # Drop literals which contain shorter ones: they can't add new lines.
+        self.literals = [literal for literal in literals if not any(other != literal and other in literal
+                                                                    for other in literals)]
+        self.regex = None
+        if regexps:
+            self.regex = re.compile("|".join(f"(?:{regex})" for regex in regexps).encode("utf-8"),
+                                    re.IGNORECASE | re.MULTILINE)
+
+    def find_lines(self, data: bytes) -> List[int]:
+        """Get sorted offsets of found lines in a chunk of complete lines."""
+
+        positions = []
+        data_lower = data.lower()  # only ASCII characters are changed, so offsets stay the same
+        for literal in self.literals:
+            position = data_lower.find(literal)
+            while position != -1:
+                positions.append(position)
+                if not (next_line := data_lower.find(b"\n", position) + 1):
+                    break
+                position = data_lower.find(literal, next_line)
+        if self.regex is not None:
+            positions.extend(match.start() for match in self.regex.finditer(data))
+        return sorted({data.rfind(b"\n", 0, position) + 1 for position in positions})
+
+
+# Lines which can be interesting for the search of SYSTEM_ERROR_EVENTS or backtraces (see BACKTRACE_RE.)
+SYSTEM_LOG_SCANNER = SystemLogScanner(patterns=[event.regex for event in SYSTEM_ERROR_EVENTS],
+                                      literals=["0x", "backtrace:", ])
+
+
 class FullScanEvent(SctEvent, abstract=True):
     start: Type[SctEventProtocol]
     finish: Type[SctEventProtocol]
@@ -35,6 +35,8 @@ class TestFailure(Exception):
 
 
 class EventsAnalyzer(BaseEventsProcess[Tuple[str, Any], None], threading.Thread):
+    inbound_events_severities = (Severity.CRITICAL, )
+
     def run(self) -> None:
         for event_tuple in self.inbound_events():
             with verbose_suppress("EventsAnalyzer failed to process %s", event_tuple):
@@ -13,35 +13,186 @@
 
 # pylint: disable=no-member; disable `no-member' messages because of zmq.
 
+import os
+import zlib
 import time
 import queue
 import ctypes
-import pickle
+import uuid
 import logging
+import threading
 import multiprocessing
-from typing import Optional, Generator, Any, Tuple, Callable, cast
+import multiprocessing.util
+from collections import deque
+from typing import Optional, Generator, Any, Tuple, Callable, List, Iterable, cast
 from pathlib import Path
 from functools import cached_property, partial
 
 import zmq
 
+from sdcm.sct_events import Severity
+from sdcm.sct_events.base import SctEvent, SystemEvent, BaseFilter, max_severity
+from sdcm.sct_events.filters import EventsFiltersIndex
+from sdcm.sct_events.coalescing import EVENTS_STORM_WINDOW, EVENTS_STORM_THRESHOLD, EventsCoalescer
+from sdcm.sct_events.serialization import encode_event, decode_event
 from sdcm.sct_events.events_processes import \
-    EVENTS_MAIN_DEVICE_ID, StopEvent, EventsProcessesRegistry, \
+    EVENTS_MAIN_DEVICE_ID, StopEvent, EventsProcessesRegistry, EventsSubscription, \
     start_events_process, get_events_process, verbose_suppress, suppress_interrupt
 
 
 EVENTS_DEVICE_START_DELAY: float = 0  # seconds
 EVENTS_DEVICE_START_TIMEOUT: float = 30  # seconds
 SUB_POLLING_TIMEOUT: int = 1000  # milliseconds
-PUB_QUEUE_WAIT_TIMEOUT: float = 1  # seconds
+PUB_QUEUE_WAIT_TIMEOUT: float = 0.1  # seconds
 PUB_QUEUE_EVENTS_RATE: float = 0  # seconds
+PUB_QUEUE_BATCH_SIZE: int = 100  # events
+PUB_WATERMARK_INTERVAL: float = 5  # seconds
 PUBLISH_EVENT_TIMEOUT: float = 5  # seconds
+DRAIN_POLLING_INTERVAL: float = 0.01  # seconds
+READY_HANDSHAKE_POLLING_TIMEOUT: int = 10  # milliseconds
+
+# Prefix of topics used for the readiness handshake between EventsDevice and its subscribers.
+READY_TOPIC_PREFIX: bytes = b"\x00SCT_EVENTS_READY:"
+
+# Events are published under `<partition>/<severity>/<event base class>/' topics, where the partition is used
+# to split events between shards of a subscriber.  Events of one node and type always go to the same partition.
+EVENTS_TOPIC_PARTITIONS: int = 16
+SEQ_NUMBER_SIZE: int = 8  # bytes
+
+# Events dropped by filters are not sent, only their number is sent under this topic, so subscribers of all events
+# can still count them.
+DROPPED_EVENTS_TOPIC: bytes = b"\x00SCT_EVENTS_DROPPED/"
+DROPPED_EVENTS_COUNT_SIZE: int = 4  # bytes
 
 EVENTS_LOG_DIR: str = "events_log"
 RAW_EVENTS_LOG: str = "raw_events.log"
+RAW_EVENTS_BUFFER_SIZE: int = 256 * 1024  # bytes
+RAW_EVENTS_FLUSH_INTERVAL: float = 1  # seconds
+RAW_EVENTS_MAX_SIZE: int = 0  # bytes; 0 means no rotation
+RAW_EVENTS_BACKUP_COUNT: int = 5
 
 LOGGER = logging.getLogger(__name__)
 
+_RAW_EVENTS_JOURNAL_INIT_LOCK = threading.Lock()
+
+
+class RawEventsJournal:
+    """Append-only journal of raw events which keeps one long-lived file handle per process.
+
+    Records are accumulated in a bounded in-memory buffer and written to the file when the buffer size reaches
+    `buffer_size' bytes or every `flush_interval' seconds.  Buffers are per process and writes are serialized
+    by `lock', so the journal can be used from any process forked after its creation.
+    """
+
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 path: Path,
+                 lock: multiprocessing.RLock,
+                 buffer_size: int = RAW_EVENTS_BUFFER_SIZE,
+                 flush_interval: float = RAW_EVENTS_FLUSH_INTERVAL,
+                 max_size: int = RAW_EVENTS_MAX_SIZE,
+                 backup_count: int = RAW_EVENTS_BACKUP_COUNT):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self.backup_count = backup_count
+
+        self._lock = lock
+        self._pid = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pid"] = None  # per-process state should be initialized again.
+        for attr in ("_buffer", "_buffer_len", "_buffer_lock", "_file", "_closed", "_flusher", ):
+            state.pop(attr, None)
+        return state
+
+    def _init_process_state(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with _RAW_EVENTS_JOURNAL_INIT_LOCK:
+            if self._pid == os.getpid():
+                return
+            self._buffer = []  # drop records inherited from the parent process: it will write them by itself.
+            self._buffer_len = 0
+            self._buffer_lock = threading.RLock()
+            self._file = None
+            self._closed = threading.Event()
+            self._flusher = threading.Thread(target=self._flush_periodically, name=f"{self}-flusher", daemon=True)
+            self._pid = os.getpid()
+        self._flusher.start()
+
+        # Children of multiprocessing exit by os._exit() and don't run atexit callbacks, but run these finalizers.
+        multiprocessing.util.Finalize(self, self.close, exitpriority=0)
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(timeout=self.flush_interval):
+            with verbose_suppress("%s: failed to flush", self):
+                self.flush()
+
+    def write(self, record: bytes) -> None:
+        self._init_process_state()
+        with self._buffer_lock:
+            self._buffer.append(record)
+            self._buffer_len += len(record)
+            if self._buffer_len >= self.buffer_size:
+                self.flush()
+
+    def flush(self, fsync: bool = False) -> None:
+        self._init_process_state()
+        with self._buffer_lock:
+            data = b"".join(self._buffer)
+            self._buffer.clear()
+            self._buffer_len = 0
+            if not data and (not fsync or self._file is None):
+                return
+            with self._lock:
+                log_file = self._get_file()
+                log_file.write(data)
+                log_file.flush()
+                if fsync:
+                    os.fsync(log_file.fileno())
+                if self.max_size and log_file.tell() >= self.max_size:
+                    self._rotate()
+
+    def _get_file(self):
+        # Reopen the file if it was rotated by another process.
+        if self._file is not None:
+            try:
+                if os.fstat(self._file.fileno()).st_ino != os.stat(self.path).st_ino:
+                    self._close_file()
+            except FileNotFoundError:
+                self._close_file()
+        if self._file is None:
+            self._file = open(self.path, "ab")  # pylint: disable=consider-using-with
+        return self._file
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _rotate(self) -> None:
+        self._close_file()
+        if self.backup_count < 1:
+            self.path.unlink()
+            return
+        for idx in range(self.backup_count - 1, 0, -1):
+            if (backup := self.path.with_name(f"{self.path.name}.{idx}")).exists():
+                backup.replace(self.path.with_name(f"{self.path.name}.{idx + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+
+    def close(self) -> None:
+        if self._pid != os.getpid():
+            return
+        self._closed.set()
+        with self._buffer_lock:
+            self.flush(fsync=True)
+            self._close_file()
+
+    def __str__(self):
+        return f"{type(self).__name__}[{self.path}]"
+
 
 class EventsDevice(multiprocessing.Process):
     start_delay = EVENTS_DEVICE_START_DELAY
@@ -49,17 +200,26 @@ class EventsDevice(multiprocessing.Process):
     sub_polling_timeout = SUB_POLLING_TIMEOUT
     pub_queue_wait_timeout = PUB_QUEUE_WAIT_TIMEOUT
     pub_queue_events_rate = PUB_QUEUE_EVENTS_RATE
+    pub_queue_batch_size = PUB_QUEUE_BATCH_SIZE
+    pub_watermark_interval = PUB_WATERMARK_INTERVAL
+    events_storm_window = EVENTS_STORM_WINDOW
+    events_storm_threshold = EVENTS_STORM_THRESHOLD
 
     def __init__(self, _registry: EventsProcessesRegistry):
         self._registry = _registry
         self._events_counter = multiprocessing.Value(ctypes.c_uint32, 0)
+        self._drain_events_count = multiprocessing.Value(ctypes.c_uint32, 0)
+        self._drain_requested = multiprocessing.Event()
+        self._drained = multiprocessing.Event()
 
         self._running = multiprocessing.Event()
+        self._ready = multiprocessing.Event()
         self._sub_port = multiprocessing.Value(ctypes.c_uint16, 0)
         self._queue = multiprocessing.Queue()
         self._raw_events_lock = multiprocessing.RLock()
 
         self.events_log_base_dir.mkdir(parents=True, exist_ok=True)
+        self.raw_events_journal = RawEventsJournal(path=self.raw_events_log, lock=self._raw_events_lock)
 
         super().__init__(daemon=True)
 
@@ -75,9 +235,32 @@ class EventsDevice(multiprocessing.Process):
     def raw_events_log(self) -> Path:
         return self.events_log_base_dir / RAW_EVENTS_LOG
 
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Publish summaries of held events storms and wait until all events published so far are delivered.
+
+        Should be called before subscribers are stopped, otherwise the last events can be lost.  Storms are not
+        coalesced after that.
+        """
+
+        self._drained.clear()
+        self._drain_events_count.value = self._events_counter.value
+        self._drain_requested.set()
+        end_time = None if timeout is None else time.perf_counter() + timeout
+        while not self._drained.wait(timeout=DRAIN_POLLING_INTERVAL):
+            if not self.is_alive() or end_time is not None and time.perf_counter() > end_time:
+                return False
+        return True
+
     def stop(self, timeout: Optional[float] = None) -> None:
         self._running.clear()
         self.join(timeout)
+        with verbose_suppress("%s: failed to close %s", self, self.raw_events_journal):
+            self.raw_events_journal.close()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the device is able to verify delivery of events."""
+
+        return self._ready.wait(timeout)
 
     @property
     def subscribe_address(self) -> str:
@@ -87,7 +270,7 @@ class EventsDevice(multiprocessing.Process):
 
     def run(self):
         with suppress_interrupt(), verbose_suppress("EventsDevice failed"):
-            with zmq.Context() as ctx, ctx.socket(zmq.PUB) as pub, ctx.socket(zmq.SUB) as sub:
+            with zmq.Context() as ctx, ctx.socket(zmq.XPUB) as pub, ctx.socket(zmq.SUB) as sub:
                 self._sub_port.value = pub.bind_to_random_port("tcp://*")
                 self._running.set()
 
@@ -96,96 +279,302 @@ class EventsDevice(multiprocessing.Process):
                 # Delivery verification subscriber.
                 sub.connect(self.subscribe_address)
                 sub.subscribe(b"")
+                for _ in self._ready_handshake(sub=sub, pub=pub):
+                    pass  # no events can be sent before the handshake.
+                self._ready.set()
 
                 time.sleep(self.start_delay)
 
+                # Events are filtered once here and sent in batches as multipart messages: the first frame is a topic
+                # of the events followed by a sequence number of the batch and the rest are serialized events.  Instead
+                # of waiting for a round trip of each batch, the delivery verification subscriber is drained without
+                # blocking and checked against a periodic watermark.
+                #
+                # Storms of equivalent events are coalesced after the filters, so held events get the filtering
+                # decision and the severity which were in effect when they arrived, not when their summary is sent.
+                filters = EventsFiltersIndex()
+                summaries = deque()
+                coalescer = EventsCoalescer(
+                    publish=summaries.append, window=self.events_storm_window, threshold=self.events_storm_threshold)
+                sent_seq = verified_seq = watermark_seq = 0
+                watermark_time = time.perf_counter()
+                routed_events = 0
+                drain_seq = None
+
                 while self._running.is_set() or not self._queue.empty():
-                    try:
-                        event = self._queue.get(timeout=self.pub_queue_wait_timeout)
-                        try:
-                            pub.send(event)
-                        except zmq.ZMQError:
-                            LOGGER.exception("EventsDevice failed to send %s", pickle.loads(event))
-                        else:
-                            try:
-                                if sub.poll(timeout=self.sub_polling_timeout) and sub.recv(zmq.NOBLOCK) == event:
-                                    continue  # everything is OK, we can go to send next event in the queue.
-                            except zmq.ZMQError:
-                                pass
-                            LOGGER.error("EventsDevice failed to verify delivery of %s", pickle.loads(event))
+                    if batch := self._get_events_batch():
+                        messages = self._route_events(batch=batch, filters=filters, coalescer=coalescer)
+                        sent_seq = self._send_messages(pub=pub, messages=messages, sent_seq=sent_seq)
+                        routed_events += len(batch)
                         time.sleep(self.pub_queue_events_rate)
-                    except queue.Empty:
-                        pass
+
+                    if self._drain_requested.is_set() and routed_events >= self._drain_events_count.value:
+                        self._drain_requested.clear()
+                        with verbose_suppress("%s: failed to close %s", self, coalescer):
+                            coalescer.close()
+                        sent_seq = drain_seq = self._send_messages(
+                            pub=pub, messages=self._route_summaries(summaries), sent_seq=sent_seq)
+                    elif summaries:
+                        sent_seq = self._send_messages(pub=pub, messages=self._route_summaries(summaries),
+                                                       sent_seq=sent_seq)
+
+                    self._reply_ready_handshakes(pub=pub)
+                    verified_seq = self._verify_delivery(sub=sub, verified_seq=verified_seq)
+                    if drain_seq is not None and verified_seq >= drain_seq:
+                        self._drained.set()
+                        drain_seq = None
+
+                    if time.perf_counter() - watermark_time >= self.pub_watermark_interval:
+                        if verified_seq < watermark_seq:
+                            LOGGER.error("EventsDevice failed to verify delivery of batches #%d..#%d in %s seconds",
+                                         verified_seq + 1, watermark_seq, self.pub_watermark_interval)
+                            verified_seq = watermark_seq
+                        watermark_seq = sent_seq
+                        watermark_time = time.perf_counter()
+
+                with verbose_suppress("%s: failed to close %s", self, coalescer):
+                    coalescer.close()
+                sent_seq = self._send_messages(pub=pub, messages=self._route_summaries(summaries), sent_seq=sent_seq)
+
+                # Wait for the delivery verification of the last batches.
+                while verified_seq < sent_seq and sub.poll(timeout=self.sub_polling_timeout):
+                    verified_seq = self._verify_delivery(sub=sub, verified_seq=verified_seq)
+                if verified_seq < sent_seq:
+                    LOGGER.error("EventsDevice failed to verify delivery of batches #%d..#%d",
+                                 verified_seq + 1, sent_seq)
+
+    def _get_events_batch(self) -> List[bytes]:
+        try:
+            batch = [self._queue.get(timeout=self.pub_queue_wait_timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.pub_queue_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    def _send_messages(pub: zmq.Socket, messages: List[Tuple[bytes, List[bytes]]], sent_seq: int) -> int:
+        """Send messages made by `_route_events()' and return the sequence number of the last sent one."""
+
+        for topic, events in messages:
+            try:
+                pub.send_multipart([topic + (sent_seq + 1).to_bytes(SEQ_NUMBER_SIZE, "big"), *events])
+            except zmq.ZMQError:
+                LOGGER.exception("EventsDevice failed to send %s", [decode_event(event) for event in events])
+            else:
+                sent_seq += 1
+        return sent_seq
+
+    @staticmethod
+    def _route_events(batch: List[bytes],
+                      filters: EventsFiltersIndex,
+                      coalescer: Optional[EventsCoalescer] = None) -> List[Tuple[bytes, List[bytes]]]:
+        """Apply filters to the batch of events, hold storms of equivalent events and group the rest by topics.
+
+        Order of events is kept: only consecutive events with the same topic are grouped into one message.
+        """
+
+        messages = []
+        dropped = 0
+        for data in batch:
+            with verbose_suppress("EventsDevice failed to route %r", data):
+                event = decode_event(data)
+                severity = event.severity
+                if (event := apply_filters(event=event, filters=filters)) is None:
+                    dropped += 1
+                    continue
+                if coalescer is not None and not coalescer.accept(event):
+                    continue  # held events are counted when the summary of the storm is sent.
+                if event.severity != severity:
+                    data = encode_event(event)
+                topic = get_event_topic(event)
+                if dropped:
+                    messages.append((DROPPED_EVENTS_TOPIC, [dropped.to_bytes(DROPPED_EVENTS_COUNT_SIZE, "big")]))
+                    dropped = 0
+                if messages and messages[-1][0] == topic:
+                    messages[-1][1].append(data)
+                else:
+                    messages.append((topic, [data]))
+        if dropped:
+            messages.append((DROPPED_EVENTS_TOPIC, [dropped.to_bytes(DROPPED_EVENTS_COUNT_SIZE, "big")]))
+        return messages
+
+    @staticmethod
+    def _route_summaries(summaries: deque) -> List[Tuple[bytes, List[bytes]]]:
+        """Make messages for summaries of held events storms, which are filtered already.
+
+        A summary stands for all held events of a storm, so other held events are sent as dropped ones to keep
+        counters of subscribers in sync with the number of published events.
+        """
+
+        messages = []
+        while summaries:
+            summary = summaries.popleft()
+            with verbose_suppress("EventsDevice failed to route %s", summary):
+                if held := summary.coalesced["count"] - 1:
+                    messages.append((DROPPED_EVENTS_TOPIC, [held.to_bytes(DROPPED_EVENTS_COUNT_SIZE, "big")]))
+                messages.append((get_event_topic(summary), [encode_event(summary)]))
+        return messages
+
+    def _ready_handshake(self, sub: zmq.Socket, pub: Optional[zmq.Socket] = None) -> Generator[List[bytes], None, None]:
+        """Make sure that the subscription of `sub' socket is seen by the device.
+
+        Subscribe to a unique topic and wait for a reply which the device publishes when the subscription arrives.
+        Subscriptions are processed by the device in order, so after the reply all events will be delivered to `sub'.
+        Messages received during the handshake are yielded to the caller.
+        """
+
+        topic = READY_TOPIC_PREFIX + uuid.uuid4().bytes
+        sub.subscribe(topic)
+        end_time = time.perf_counter() + self.start_timeout
+        while True:
+            if pub is not None:
+                self._reply_ready_handshakes(pub=pub)
+            if sub.poll(timeout=READY_HANDSHAKE_POLLING_TIMEOUT):
+                if (message := sub.recv_multipart(flags=zmq.NOBLOCK)) == [topic]:
+                    break
+                yield message
+            elif time.perf_counter() > end_time:
+                LOGGER.error("%s: no readiness handshake reply in %s seconds", self, self.start_timeout)
+                break
+        sub.unsubscribe(topic)
+
+    @staticmethod
+    def _reply_ready_handshakes(pub: zmq.Socket) -> None:
+        while True:
+            try:
+                message = pub.recv(zmq.NOBLOCK)  # subscription messages: b"\x01" + topic or b"\x00" + topic
+            except zmq.Again:
+                return
+            if message[:1] == b"\x01" and message[1:].startswith(READY_TOPIC_PREFIX):
+                pub.send(message[1:])
+
+    @staticmethod
+    def _verify_delivery(sub: zmq.Socket, verified_seq: int) -> int:
+        while True:
+            try:
+                frame = sub.recv(zmq.NOBLOCK)
+            except zmq.Again:
+                return verified_seq
+            while sub.getsockopt(zmq.RCVMORE):  # we need the sequence number only.
+                sub.recv(zmq.NOBLOCK)
+            if frame.startswith(READY_TOPIC_PREFIX):
+                continue  # a reply to the readiness handshake of some subscriber.
+            seq = int.from_bytes(frame[-SEQ_NUMBER_SIZE:], "big")
+            if seq > verified_seq + 1:
+                LOGGER.error("EventsDevice failed to verify delivery of batches #%d..#%d", verified_seq + 1, seq - 1)
+            verified_seq = max(verified_seq, seq)
 
     def publish_event(self, event, timeout=PUBLISH_EVENT_TIMEOUT) -> None:
         with verbose_suppress("%s: failed to write %s to %s", self, event, self.raw_events_log):
-            with self._raw_events_lock, open(self.raw_events_log, "ab+", buffering=0) as log_file:
-                log_file.write(event.to_json().encode("utf-8") + b"\n")
+            self.raw_events_journal.write(event.to_json().encode("utf-8") + b"\n")
 
         with verbose_suppress("%s: failed to publish %s", self, event):
-            self._queue.put(pickle.dumps(event), timeout=timeout)
+            self._queue.put(encode_event(event), timeout=timeout)
             self._events_counter.value += 1
 
-    def _sub_socket(self, ctx: zmq.Context) -> zmq.Socket:
+    def _sub_socket(self, ctx: zmq.Context, topics: Iterable[bytes] = (b"", )) -> zmq.Socket:
         LOGGER.info("Subscribe to %s", self.subscribe_address)
         sub = ctx.socket(zmq.SUB)
         sub.connect(self.subscribe_address)
-        sub.subscribe(b"")
+        for topic in topics:
+            sub.subscribe(topic)
         return sub
 
-    def inbound_events(self, stop_event: StopEvent) -> Generator[Any, None, None]:
-        with zmq.Context() as ctx, self._sub_socket(ctx) as sub:
+    def inbound_events(self,
+                       stop_event: StopEvent,
+                       ready_event: Optional[StopEvent] = None,
+                       topics: Iterable[bytes] = (b"", )) -> Generator[Any, None, None]:
+        with zmq.Context() as ctx, self._sub_socket(ctx, topics=topics) as sub:
+            pending_messages = list(self._ready_handshake(sub=sub))
+            if ready_event is not None:
+                ready_event.set()
+            for message in pending_messages:
+                yield from self._decode_message(message)
+
             while not stop_event.is_set():
                 while sub.poll(timeout=self.sub_polling_timeout):
-                    yield sub.recv_pyobj(flags=zmq.NOBLOCK)
+                    yield from self._decode_message(sub.recv_multipart(flags=zmq.NOBLOCK))
 
-    def outbound_events(self,
-                        stop_event: StopEvent,
-                        events_counter: multiprocessing.Value) -> Generator[Tuple[str, Any], None, None]:
-        from sdcm.sct_events.base import LogEvent, max_severity
-        from sdcm.sct_events.system import SystemEvent
-        from sdcm.sct_events.filters import BaseFilter, EventsFilter
+    @staticmethod
+    def _decode_message(message: List[bytes]) -> Generator[Any, None, None]:
+        """Yield events of a message or a number of events which were dropped by filters."""
 
-        filters = dict()
+        topic, *batch = message  # skip sequence number of the batch in the topic frame.
+        if topic.startswith(DROPPED_EVENTS_TOPIC):
+            yield int.from_bytes(batch[0], "big")
+            return
+        for event in batch:
+            yield decode_event(event)
 
+    def outbound_events(self,
+                        stop_event: StopEvent,
+                        events_counter: multiprocessing.Value,
+                        ready_event: Optional[StopEvent] = None,
+                        subscription: Optional[EventsSubscription] = None) -> Generator[Tuple[str, Any], None, None]:
         with suppress_interrupt():
-            for events_counter.value, obj in enumerate(self.inbound_events(stop_event=stop_event), start=1):
-                for filter_key, filter_obj in list(filters.items()):
-                    if filter_obj.expire_time and filter_obj.expire_time < obj.timestamp:
-                        if (isinstance(obj, LogEvent) and getattr(filter_obj, "filter_node", None) == obj.node) or \
-                                isinstance(filter_obj, EventsFilter):
-                            LOGGER.debug("%s: delete filter with uuid=%s", self, filter_key)
-                            del filters[filter_key]
-
-                if isinstance(obj, BaseFilter):
-                    if obj.clear_filter and not obj.expire_time:
-                        LOGGER.debug("%s: delete filter with uuid=%s", self, obj.uuid)
-                        filters.pop(obj.uuid, None)
-                    elif obj.clear_filter and obj.expire_time and obj.uuid in filters:
-                        LOGGER.debug("%s: set expire_time to %s for filter with uuid=%s",
-                                     self, obj.expire_time, obj.uuid)
-                        filters[obj.uuid].expire_time = obj.expire_time
-                    else:
-                        LOGGER.debug("%s: add filter %s with uuid=%s", self, obj, obj.uuid)
-                        filters[obj.uuid] = obj
-
-                if isinstance(obj, SystemEvent):
+            inbound_events = self.inbound_events(
+                stop_event=stop_event, ready_event=ready_event, topics=get_events_topics(subscription))
+            for obj in inbound_events:
+                if isinstance(obj, int):  # events dropped by filters are counted as received.
+                    events_counter.value += obj
                     continue
+                events_counter.value += 1
+                yield obj.base, obj
 
-                obj_filtered = any([f.eval_filter(obj) for f in filters.values()])
 
-                if obj_filtered:
-                    continue
+def apply_filters(event: SctEvent, filters: EventsFiltersIndex) -> Optional[SctEvent]:
+    """Update the filters and return the event to send to subscribers with its final severity or None."""
 
-                if (obj_max_severity := max_severity(obj)).value < obj.severity.value:
-                    LOGGER.warning("Limit %s severity to %s as configured", obj, obj_max_severity)
-                    obj.severity = obj_max_severity
+    filters.expire(event)
 
-                yield obj.base, obj
+    if isinstance(event, BaseFilter):
+        filters.update(event)
+
+    if isinstance(event, SystemEvent):
+        return None
+
+    if filters.eval_filters(event):
+        return None
+
+    if (event_max_severity := max_severity(event)).value < event.severity.value:
+        LOGGER.warning("Limit %s severity to %s as configured", event, event_max_severity)
+        event.severity = event_max_severity
+
+    return event
+
+
+def get_event_topic(event: SctEvent) -> bytes:
+    partition = zlib.crc32(f"{event.base}:{getattr(event, 'node', '')}".encode("utf-8")) % EVENTS_TOPIC_PARTITIONS
+    return f"{partition:x}/{event.severity.name}/{event.base}/".encode("utf-8")
+
+
+def get_events_topics(subscription: Optional[EventsSubscription] = None) -> List[bytes]:
+    """Get topic prefixes of events which should be received by a subscriber."""
+
+    if subscription is None:
+        return [b"", ]
+    if not 0 < subscription.shards <= EVENTS_TOPIC_PARTITIONS:
+        raise ValueError(f"Number of shards should be between 1 and {EVENTS_TOPIC_PARTITIONS}")
+
+    if subscription.shards == 1 and subscription.severities is None and subscription.types is None:
+        return [b"", ]
+    topics = [f"{partition:x}/" for partition in range(EVENTS_TOPIC_PARTITIONS)
+              if partition % subscription.shards == subscription.shard]
+    if subscription.severities is not None or subscription.types is not None:
+        severities = tuple(Severity) if subscription.severities is None else subscription.severities
+        topics = [f"{topic}{severity.name}/" for topic in topics for severity in severities]
+    if subscription.types is not None:
+        topics = [f"{topic}{event_type}/" for topic in topics for event_type in subscription.types]
+    return [topic.encode("utf-8") for topic in topics]
 
 
 start_events_main_device = partial(start_events_process, EVENTS_MAIN_DEVICE_ID, EventsDevice)
 get_events_main_device = cast(Callable[..., EventsDevice], partial(get_events_process, EVENTS_MAIN_DEVICE_ID))
 
 
-__all__ = ("EventsDevice", "start_events_main_device", "get_events_main_device", )
+__all__ = ("RawEventsJournal", "EventsDevice", "start_events_main_device", "get_events_main_device",
+           "get_event_topic", "get_events_topics", )
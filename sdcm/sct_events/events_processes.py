@@ -14,17 +14,20 @@
 from __future__ import annotations
 
 import abc
+import time
 import queue
 import ctypes
 import logging
 import threading
 import multiprocessing
-from typing import Union, Generator, Protocol, TypeVar, Generic, Type, Optional, cast
+from typing import Union, Generator, Protocol, TypeVar, Generic, Type, Optional, NamedTuple, Tuple, List, cast
 from pathlib import Path
 from contextlib import contextmanager
 
 from weakref import proxy as weakproxy
 
+from sdcm.sct_events import Severity
+
 
 EVENTS_MAIN_DEVICE_ID = "MainDevice"
 EVENTS_FILE_LOGGER_ID = "EVENTS_FILE_LOGGER"
@@ -49,20 +52,41 @@ InboundEventsGenerator = Generator[T_inbound_event, None, None]
 OutboundEventsGenerator = Generator[T_outbound_event, None, None]
 
 
+class EventsSubscription(NamedTuple):
+    """Part of outbound events of a process which a subscriber wants to receive.
+
+    `severities' and `types' (names of base event classes, e.g., "DatabaseLogEvent") set to None mean all of them.
+    A subscriber which runs as a group of `shards' processes receives the `shard' part of the events.
+    """
+
+    severities: Optional[Tuple[Severity, ...]] = None
+    types: Optional[Tuple[str, ...]] = None
+    shard: int = 0
+    shards: int = 1
+
+
 class OutboundEventsProtocol(Protocol[T_outbound_events_protocol]):
     def outbound_events(self,
                         stop_event: StopEvent,
-                        events_counter: multiprocessing.Value) -> Generator[T_outbound_events_protocol, None, None]:
+                        events_counter: multiprocessing.Value,
+                        ready_event: Optional[StopEvent] = None,
+                        subscription: Optional[EventsSubscription] = None,
+                        ) -> Generator[T_outbound_events_protocol, None, None]:
         ...
 
 
 class BaseEventsProcess(Generic[T_inbound_event, T_outbound_event], abc.ABC):
     inbound_events_process = EVENTS_MAIN_DEVICE_ID
+    inbound_events_severities: Optional[Tuple[Severity, ...]] = None  # all severities
+    inbound_events_types: Optional[Tuple[str, ...]] = None  # all event types
+    shards: int = 1  # number of processes which share the inbound events; see EventsProcessShards.
+    shard: int = 0
     stop_event: StopEvent
 
     def __init__(self, _registry: EventsProcessesRegistry):
         self._registry = _registry
         self._events_counter = multiprocessing.Value(ctypes.c_uint32, 0)
+        self._ready_event = multiprocessing.Event()
 
         if isinstance(self, threading.Thread):
             self.stop_event = threading.Event()
@@ -77,12 +101,31 @@ class BaseEventsProcess(Generic[T_inbound_event, T_outbound_event], abc.ABC):
     def events_counter(self) -> int:
         return self._events_counter.value
 
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the process is subscribed to its inbound events."""
+
+        return self._ready_event.wait(timeout)
+
+    @property
+    def subscription(self) -> EventsSubscription:
+        return EventsSubscription(severities=self.inbound_events_severities,
+                                  types=self.inbound_events_types,
+                                  shard=self.shard,
+                                  shards=self.shards)
+
     def inbound_events(self) -> InboundEventsGenerator:
         yield from cast(OutboundEventsProtocol[T_inbound_event],
                         get_events_process(name=self.inbound_events_process, _registry=self._registry)) \
-            .outbound_events(stop_event=self.stop_event, events_counter=self._events_counter)
+            .outbound_events(stop_event=self.stop_event,
+                             events_counter=self._events_counter,
+                             ready_event=self._ready_event,
+                             subscription=self.subscription)
 
-    def outbound_events(self, stop_event: StopEvent, events_counter: multiprocessing.Value) -> OutboundEventsGenerator:
+    def outbound_events(self,
+                        stop_event: StopEvent,
+                        events_counter: multiprocessing.Value,
+                        ready_event: Optional[StopEvent] = None,
+                        subscription: Optional[EventsSubscription] = None) -> OutboundEventsGenerator:
         yield from []
 
     def terminate(self) -> None:
@@ -103,7 +146,14 @@ class EventsProcessPipe(BaseEventsProcess[T_inbound_event, T_outbound_event], th
 
         super().__init__(_registry=_registry)
 
-    def outbound_events(self, stop_event: StopEvent, events_counter: multiprocessing.Value) -> OutboundEventsGenerator:
+    def outbound_events(self,
+                        stop_event: StopEvent,
+                        events_counter: multiprocessing.Value,
+                        ready_event: Optional[StopEvent] = None,
+                        subscription: Optional[EventsSubscription] = None) -> OutboundEventsGenerator:
+        # Pipes have one consumer each, so the subscription is ignored and all events are passed through.
+        if ready_event is not None:
+            ready_event.set()  # the outbound queue exists since the pipe creation, so no events can be lost.
         while not stop_event.is_set():
             try:
                 yield self.outbound_queue.get(timeout=self.outbound_queue_wait_timeout)
@@ -112,6 +162,15 @@ class EventsProcessPipe(BaseEventsProcess[T_inbound_event, T_outbound_event], th
             except queue.Empty:
                 pass
 
+        # The consumer is stopped after this pipe is finished, so deliver all events which are left in the queue.
+        while True:
+            try:
+                event = self.outbound_queue.get_nowait()
+            except queue.Empty:
+                break
+            yield event
+            events_counter.value += 1
+
 
 class EventsProcessProcess(BaseEventsProcess[T_inbound_event, T_outbound_event], multiprocessing.Process):
     ...
@@ -121,6 +180,54 @@ class EventsProcessThread(BaseEventsProcess[T_inbound_event, T_outbound_event],
     ...
 
 
+class EventsProcessShards:
+    """Group of processes of one subscriber which share its inbound events.
+
+    Each shard subscribes to its own part of the events, so the load of a CPU-heavy subscriber can be spread between
+    `klass.shards' processes.  The group is registered under the subscriber's name and can be used as a single process.
+    """
+
+    def __init__(self, klass: Type[EventsProcess], _registry: EventsProcessesRegistry):
+        self._registry = _registry
+        self.processes: List[EventsProcess] = []
+        for shard in range(klass.shards):
+            process = klass(_registry=_registry)
+            process.shard = shard
+            self.processes.append(process)
+
+    @property
+    def events_counter(self) -> int:
+        return sum(process.events_counter for process in self.processes)
+
+    def start(self) -> None:
+        for process in self.processes:
+            process.start()
+
+    def is_alive(self) -> bool:
+        return any(process.is_alive() for process in self.processes)
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        end_time = None if timeout is None else time.perf_counter() + timeout
+        return all(process.wait_ready(timeout=None if end_time is None else max(end_time - time.perf_counter(), 0))
+                   for process in self.processes)
+
+    def terminate(self) -> None:
+        for process in self.processes:
+            process.terminate()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        end_time = None if timeout is None else time.perf_counter() + timeout
+        for process in self.processes:
+            process.join(timeout=None if end_time is None else max(end_time - time.perf_counter(), 0))
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self.terminate()
+        self.join(timeout)
+
+    def __str__(self):
+        return f"{type(self).__name__}[{', '.join(map(str, self.processes))}]"
+
+
 EventsProcess = Union[EventsProcessProcess, EventsProcessThread]
 
 
@@ -134,7 +241,11 @@ class EventsProcessesRegistry:
 
     def start_events_process(self, name: str, klass: Type[EventsProcess]) -> None:
         with self._registry_dict_lock:
-            self._registry_dict[name] = process = klass(_registry=weakproxy(self))
+            if getattr(klass, "shards", 1) > 1:
+                process = EventsProcessShards(klass=klass, _registry=weakproxy(self))
+            else:
+                process = klass(_registry=weakproxy(self))
+            self._registry_dict[name] = process
         process.start()
         LOGGER.debug("New process `%s' started at %s", name, self)
 
@@ -197,6 +308,7 @@ def suppress_interrupt():
 
 __all__ = ("EVENTS_MAIN_DEVICE_ID", "EVENTS_FILE_LOGGER_ID", "EVENTS_GRAFANA_ANNOTATOR_ID",
            "EVENTS_GRAFANA_AGGREGATOR_ID", "EVENTS_GRAFANA_POSTMAN_ID", "EVENTS_ANALYZER_ID",
-           "StopEvent", "BaseEventsProcess", "EventsProcessPipe", "EventsProcessesRegistry",
+           "StopEvent", "EventsSubscription", "BaseEventsProcess", "EventsProcessPipe", "EventsProcessShards",
+           "EventsProcessesRegistry",
            "create_default_events_process_registry", "start_events_process", "get_events_process",
            "verbose_suppress", "suppress_interrupt",)
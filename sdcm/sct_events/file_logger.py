@@ -11,16 +11,18 @@
 #
 # Copyright (c) 2020 ScyllaDB
 
-import re
+import os
 import json
 import logging
+import threading
 import collections
 import multiprocessing
-from typing import Tuple, Optional, Callable, Any, Dict, List, cast
+from array import array
+from typing import Tuple, Optional, Callable, Any, Dict, List, BinaryIO, cast
 from pathlib import Path
 from functools import partial
 from itertools import chain
-from collections import deque
+from contextlib import suppress
 
 from sdcm.sct_events import Severity
 from sdcm.sct_events.base import SctEvent
@@ -37,8 +39,13 @@ CRITICAL_LOG: str = "critical.log"
 ERROR_LOG: str = "error.log"
 WARNING_LOG: str = "warning.log"
 NORMAL_LOG: str = "normal.log"
+INDEX_SUFFIX: str = ".idx"
 
-LINE_START_RE = re.compile(r"^\d{4}-\d{2}-\d{2} ")  # date in YYYY-MM-DD format
+SUMMARY_LOG_UPDATE_INTERVAL: float = 0.5  # seconds
+
+# Each entry of an index file is an end offset of an event in the corresponding log file.
+INDEX_ENTRY_TYPECODE: str = "Q"
+INDEX_ENTRY_SIZE: int = array(INDEX_ENTRY_TYPECODE).itemsize
 
 LOGGER = logging.getLogger(__name__)
 
@@ -54,22 +61,72 @@ class EventsFileLogger(BaseEventsProcess[Tuple[str, Any], None], multiprocessing
             Severity.WARNING:  base_dir / WARNING_LOG,
             Severity.NORMAL:   base_dir / NORMAL_LOG,
         }
+        self.events_indexes_by_severity = {
+            severity: log_file.with_name(log_file.name + INDEX_SUFFIX)
+            for severity, log_file in self.events_logs_by_severity.items()
+        }
 
         self.events_summary = collections.defaultdict(int)
         self.events_summary_log = base_dir / SUMMARY_LOG
 
+        # Open files and summary updater are per process and initialized on first write.
+        self._pid = None
+        self._events_log_file: Optional[BinaryIO] = None
+        self._events_log_files_by_severity: Dict[Severity, BinaryIO] = {}
+        self._events_index_files_by_severity: Dict[Severity, BinaryIO] = {}
+        self._events_summary_lock = threading.RLock()
+        self._events_summary_timer: Optional[threading.Timer] = None
+
         super().__init__(_registry=_registry)
 
     def run(self) -> None:
         LOGGER.info("Writing to %s", self.events_log)
 
-        for log_file in chain((self.events_log, self.events_summary_log, ), self.events_logs_by_severity.values(), ):
+        for log_file in chain((self.events_log, self.events_summary_log, ),
+                              self.events_logs_by_severity.values(),
+                              self.events_indexes_by_severity.values(), ):
             log_file.touch()
 
-        for event_tuple in self.inbound_events():
-            with verbose_suppress("EventsFileLogger failed to process %s", event_tuple):
-                _, event = event_tuple  # try to unpack event from EventsDevice
-                self.write_event(event=event, tee=LOGGER.info)
+        try:
+            for event_tuple in self.inbound_events():
+                with verbose_suppress("EventsFileLogger failed to process %s", event_tuple):
+                    _, event = event_tuple  # try to unpack event from EventsDevice
+                    self.write_event(event=event, tee=LOGGER.info)
+        finally:
+            self.close_files()
+
+    def _open_files(self) -> None:
+        if self._pid == os.getpid():
+            return
+
+        # Continue the summary if the events were written by another process before.
+        with suppress(OSError, ValueError), self.events_summary_log.open() as fobj:
+            self.events_summary.update(json.load(fobj))
+
+        self._events_log_file = self.events_log.open("ab")
+        self._events_log_files_by_severity = {
+            severity: log_file.open("ab") for severity, log_file in self.events_logs_by_severity.items()
+        }
+        self._events_index_files_by_severity = {
+            severity: index_file.open("ab") for severity, index_file in self.events_indexes_by_severity.items()
+        }
+        self._events_summary_lock = threading.RLock()
+        self._events_summary_timer = None
+        self._pid = os.getpid()
+
+    def close_files(self) -> None:
+        if self._pid != os.getpid():
+            return
+        with self._events_summary_lock:
+            if self._events_summary_timer is not None:
+                self._events_summary_timer.cancel()
+            self.save_events_summary()
+        for fobj in chain((self._events_log_file, ),
+                          self._events_log_files_by_severity.values(),
+                          self._events_index_files_by_severity.values(), ):
+            with verbose_suppress("%s: failed to close %s", self, fobj):
+                fobj.close()
+        self._pid = None
 
     def write_event(self, event: SctEvent, tee: Optional[Callable[[str], Any]] = None) -> None:
         message = f"{event.formatted_timestamp}: {str(event).strip()}"
@@ -78,47 +135,72 @@ class EventsFileLogger(BaseEventsProcess[Tuple[str, Any], None], multiprocessing
                 tee(message)
         message = message.encode("utf-8") + b"\n"
 
+        with verbose_suppress("%s: failed to open log files", self):
+            self._open_files()
+
         # Update events.log file (all events.)
         with verbose_suppress("%s: failed to write %s to %s", self, event, self.events_log):
-            with self.events_log.open("ab+", buffering=0) as fobj:
-                fobj.write(message)
+            self._events_log_file.write(message)
+            self._events_log_file.flush()
 
-        # Update {event.severity}.log file.
+        # Update {event.severity}.log file and its index.
         log_file = self.events_logs_by_severity[event.severity]
         with verbose_suppress("%s: failed to write %s to %s", self, event, log_file):
-            with log_file.open("ab+", buffering=0) as fobj:
-                fobj.write(message)
-
-        # Update summary.log file (statistics.)
-        self.events_summary[Severity(event.severity).name] += 1
+            fobj = self._events_log_files_by_severity[event.severity]
+            fobj.write(message)
+            fobj.flush()
+            index_fobj = self._events_index_files_by_severity[event.severity]
+            index_fobj.write(array(INDEX_ENTRY_TYPECODE, (fobj.tell(), )).tobytes())
+            index_fobj.flush()
+
+        # Update summary.log file (statistics) not more often than once in SUMMARY_LOG_UPDATE_INTERVAL.
+        with self._events_summary_lock:
+            self.events_summary[Severity(event.severity).name] += 1
+            if self._events_summary_timer is None:
+                self._events_summary_timer = threading.Timer(SUMMARY_LOG_UPDATE_INTERVAL, self.save_events_summary)
+                self._events_summary_timer.start()
+
+    def save_events_summary(self) -> None:
+        with self._events_summary_lock:
+            self._events_summary_timer = None
+            summary = json.dumps(dict(self.events_summary), indent=4).encode("utf-8")
+        tmp_summary_log = self.events_summary_log.with_name(f".{self.events_summary_log.name}.{os.getpid()}.tmp")
         with verbose_suppress("%s: failed to update %s", self, self.events_summary_log):
-            with self.events_summary_log.open("wb", buffering=0) as fobj:
-                fobj.write(json.dumps(dict(self.events_summary), indent=4).encode("utf-8"))
+            tmp_summary_log.write_bytes(summary)
+            tmp_summary_log.replace(self.events_summary_log)
 
     def get_events_by_category(self, limit: Optional[int] = None) -> Dict[str, List[str]]:
         output = {}
         for severity, log_file in self.events_logs_by_severity.items():
-            events_bucket = deque(maxlen=limit)
-            event = []
             try:
-                with log_file.open() as fobj:
-                    for line in fobj:
-                        if line := line.strip():
-                            if LINE_START_RE.match(line):
-                                if event:
-                                    events_bucket.append("\n".join(event))
-                                event.clear()
-                            event.append(line)
-                if event:
-                    events_bucket.append("\n".join(event))
+                events_bucket = self._read_events(
+                    log_file=log_file, index_file=self.events_indexes_by_severity[severity], limit=limit)
             except Exception as exc:  # pylint: disable=broad-except
                 error_msg = f"{self}: failed to read {log_file}: {exc}"
                 LOGGER.info(error_msg)
-                if not events_bucket:
-                    events_bucket.append(error_msg)
-            output[severity.name] = list(events_bucket)
+                events_bucket = [error_msg]
+            output[severity.name] = events_bucket
         return output
 
+    @staticmethod
+    def _read_events(log_file: Path, index_file: Path, limit: Optional[int] = None) -> List[str]:
+        with index_file.open("rb") as fobj:
+            count = fobj.seek(0, os.SEEK_END) // INDEX_ENTRY_SIZE
+            first = 0 if limit is None else max(count - limit, 0)
+            fobj.seek(max(first - 1, 0) * INDEX_ENTRY_SIZE)
+            offsets = array(INDEX_ENTRY_TYPECODE)
+            offsets.frombytes(fobj.read((count - max(first - 1, 0)) * INDEX_ENTRY_SIZE))
+        if first == 0:
+            offsets.insert(0, 0)
+        with log_file.open("rb") as fobj:
+            fobj.seek(offsets[0])
+            data = fobj.read(offsets[-1] - offsets[0])
+        events = []
+        for start, end in zip(offsets, offsets[1:]):
+            event = data[start - offsets[0]:end - offsets[0]].decode("utf-8", errors="replace")
+            events.append("\n".join(line for line in map(str.strip, event.splitlines()) if line))
+        return events
+
 
 start_events_logger = partial(start_events_process, EVENTS_FILE_LOGGER_ID, EventsFileLogger)
 get_events_logger = cast(Callable[..., EventsFileLogger], partial(get_events_process, EVENTS_FILE_LOGGER_ID))
@@ -13,11 +13,18 @@
 
 import re
 import time
-from typing import Optional, Type, Union
+import heapq
+import logging
+import itertools
+from typing import Optional, Type, Union, Dict, List, Tuple, Iterable
 from functools import cached_property
+from collections import defaultdict
 
 from sdcm.sct_events import Severity
-from sdcm.sct_events.base import SctEvent, SctEventProtocol, BaseFilter, LogEventProtocol
+from sdcm.sct_events.base import SctEvent, SctEventProtocol, BaseFilter, LogEvent, LogEventProtocol
+
+
+LOGGER = logging.getLogger(__name__)
 
 
 class DbEventsFilter(BaseFilter):
@@ -108,3 +115,174 @@ class EventsSeverityChangerFilter(EventsFilter):
         if super().eval_filter(event) and self.new_severity:
             event.severity = self.new_severity
         return False
+
+
+class EventsFiltersIndex:
+    """Set of active filters indexed for evaluation against a stream of events.
+
+    DbEventsFilter instances are dispatched by event type and node, EventsFilter instances by the event class name
+    prefix, and regexes of EventsFilter instances from the same bucket are combined into a single pattern.
+    EventsSeverityChangerFilter instances are applied before any other filter.  Expiration times are kept in heaps.
+    """
+
+    def __init__(self):
+        self._filters: Dict[str, BaseFilter] = {}
+        self._order: Dict[str, int] = {}
+        self._counter = itertools.count()
+
+        self._db_filters: Dict[str, Dict[Optional[str], Dict[str, DbEventsFilter]]] = \
+            defaultdict(lambda: defaultdict(dict))
+        self._events_filters: Dict[Optional[str], Dict[str, EventsFilter]] = defaultdict(dict)
+        self._severity_changers: Dict[Optional[str], Dict[str, EventsSeverityChangerFilter]] = defaultdict(dict)
+        self._other_filters: Dict[str, BaseFilter] = {}
+        self._compiled_events_filters: Dict[Optional[str], Tuple[bool, List[re.Pattern], List[EventsFilter]]] = {}
+
+        # Heaps of (expire_time, uuid).  EventsFilter instances expire by any event, others by a LogEvent
+        # from the same node only.
+        self._events_filters_expiration: List[Tuple[float, str]] = []
+        self._node_filters_expiration: Dict[Optional[str], List[Tuple[float, str]]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._filters)
+
+    def __contains__(self, filter_uuid: str) -> bool:
+        return filter_uuid in self._filters
+
+    def update(self, filter_obj: BaseFilter) -> None:
+        if filter_obj.clear_filter and not filter_obj.expire_time:
+            LOGGER.debug("%s: delete filter with uuid=%s", self, filter_obj.uuid)
+            self.remove(filter_obj.uuid)
+        elif filter_obj.clear_filter and filter_obj.expire_time and filter_obj.uuid in self._filters:
+            LOGGER.debug("%s: set expire_time to %s for filter with uuid=%s",
+                         self, filter_obj.expire_time, filter_obj.uuid)
+            self.set_expire_time(filter_obj.uuid, filter_obj.expire_time)
+        else:
+            LOGGER.debug("%s: add filter %s with uuid=%s", self, filter_obj, filter_obj.uuid)
+            self.add(filter_obj)
+
+    def add(self, filter_obj: BaseFilter) -> None:
+        self.remove(filter_obj.uuid)
+        self._filters[filter_obj.uuid] = filter_obj
+        self._order[filter_obj.uuid] = next(self._counter)
+        if isinstance(filter_obj, DbEventsFilter):
+            self._db_filters[filter_obj.filter_type][filter_obj.filter_node][filter_obj.uuid] = filter_obj
+        elif isinstance(filter_obj, EventsSeverityChangerFilter):
+            self._severity_changers[filter_obj.event_class][filter_obj.uuid] = filter_obj
+        elif isinstance(filter_obj, EventsFilter):
+            self._events_filters[filter_obj.event_class][filter_obj.uuid] = filter_obj
+            self._compiled_events_filters.pop(filter_obj.event_class, None)
+        else:
+            self._other_filters[filter_obj.uuid] = filter_obj
+        if filter_obj.expire_time:
+            self._push_expire_time(filter_obj)
+
+    def remove(self, filter_uuid: str) -> None:
+        if (filter_obj := self._filters.pop(filter_uuid, None)) is None:
+            return
+        del self._order[filter_uuid]
+        if isinstance(filter_obj, DbEventsFilter):
+            self._db_filters[filter_obj.filter_type][filter_obj.filter_node].pop(filter_uuid, None)
+        elif isinstance(filter_obj, EventsSeverityChangerFilter):
+            self._severity_changers[filter_obj.event_class].pop(filter_uuid, None)
+        elif isinstance(filter_obj, EventsFilter):
+            self._events_filters[filter_obj.event_class].pop(filter_uuid, None)
+            self._compiled_events_filters.pop(filter_obj.event_class, None)
+        else:
+            self._other_filters.pop(filter_uuid, None)
+
+    def set_expire_time(self, filter_uuid: str, expire_time: float) -> None:
+        filter_obj = self._filters[filter_uuid]
+        filter_obj.expire_time = expire_time
+        self._push_expire_time(filter_obj)
+
+    def _push_expire_time(self, filter_obj: BaseFilter) -> None:
+        if isinstance(filter_obj, EventsFilter):
+            heap = self._events_filters_expiration
+        else:
+            heap = self._node_filters_expiration[getattr(filter_obj, "filter_node", None)]
+        heapq.heappush(heap, (filter_obj.expire_time, filter_obj.uuid))
+
+    def expire(self, event: SctEvent) -> None:
+        """Remove filters which expired before the event."""
+
+        self._expire_heap(self._events_filters_expiration, event.timestamp)
+        if isinstance(event, LogEvent) and event.node in self._node_filters_expiration:
+            self._expire_heap(self._node_filters_expiration[event.node], event.timestamp)
+
+    def _expire_heap(self, heap: List[Tuple[float, str]], timestamp: float) -> None:
+        while heap and heap[0][0] < timestamp:
+            expire_time, filter_uuid = heapq.heappop(heap)
+
+            # Skip entries of removed filters and of filters with updated expire_time.
+            if (filter_obj := self._filters.get(filter_uuid)) is not None and filter_obj.expire_time == expire_time:
+                LOGGER.debug("%s: delete filter with uuid=%s", self, filter_uuid)
+                self.remove(filter_uuid)
+
+    def eval_filters(self, event: SctEventProtocol) -> bool:
+        """Apply all severity changers to the event and return True if any other filter matches it."""
+
+        class_name_prefixes = self._class_name_prefixes(type(event).__name__)
+
+        for changer in sorted(self._iter_buckets(self._severity_changers, class_name_prefixes),
+                              key=lambda filter_obj: self._order[filter_obj.uuid]):
+            changer.eval_filter(event)
+
+        if self._other_filters and any([f.eval_filter(event) for f in self._other_filters.values()]):
+            return True
+
+        if (event_type := getattr(event, "type", None)) and (db_filters := self._db_filters.get(event_type)):
+            candidates = db_filters.get(None, {}).values()
+            if (node := getattr(event, "node", None)) is not None:
+                candidates = itertools.chain(candidates, db_filters.get(node, {}).values())
+            if any(f.eval_filter(event) for f in candidates):
+                return True
+
+        event_str = None
+        for prefix in class_name_prefixes:
+            if not self._events_filters.get(prefix):
+                continue
+            match_any, patterns, filters = self._get_compiled_events_filters(prefix)
+            if match_any:
+                return True
+            if event_str is None:
+                event_str = str(event)
+            if any(pattern.match(event_str) for pattern in patterns) or \
+                    any(f._regex.match(event_str) for f in filters):  # pylint: disable=protected-access
+                return True
+
+        return False
+
+    @staticmethod
+    def _class_name_prefixes(class_name: str) -> List[Optional[str]]:
+        names = class_name.split(".")
+        return [None, ] + [".".join(names[:idx]) + "." for idx in range(1, len(names) + 1)]
+
+    @staticmethod
+    def _iter_buckets(buckets: Dict[Optional[str], Dict[str, BaseFilter]],
+                      keys: Iterable[Optional[str]]) -> Iterable[BaseFilter]:
+        for key in keys:
+            if bucket := buckets.get(key):
+                yield from bucket.values()
+
+    def _get_compiled_events_filters(self, prefix: Optional[str]) -> Tuple[bool, List[re.Pattern], List[EventsFilter]]:
+        if (compiled := self._compiled_events_filters.get(prefix)) is None:
+            match_any = False
+            regexes_by_flags = defaultdict(list)
+            patterns, filters = [], []
+            for filter_obj in self._events_filters[prefix].values():
+                if not filter_obj.regex:
+                    match_any = True
+                elif filter_obj._regex.groups:  # pylint: disable=protected-access
+                    filters.append(filter_obj)  # numbered backreferences can't be combined safely.
+                else:
+                    regexes_by_flags[filter_obj.regex_flags].append(filter_obj)
+            for flags, group in regexes_by_flags.items():
+                try:
+                    patterns.append(re.compile("|".join(f"(?:{f.regex})" for f in group), flags))
+                except re.error:
+                    filters.extend(group)
+            self._compiled_events_filters[prefix] = compiled = (match_any, patterns, filters, )
+        return compiled
+
+    def __str__(self):
+        return f"{type(self).__name__}[filters={len(self._filters)}]"
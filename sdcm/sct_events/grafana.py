@@ -12,14 +12,17 @@
 # Copyright (c) 2020 ScyllaDB
 
 import time
+import queue
 import logging
 import threading
-from typing import NewType, Dict, Any, Tuple, Optional, Callable, cast
+from typing import NewType, Dict, Any, Tuple, List, Optional, Callable, cast
 from functools import partial
 from collections import defaultdict
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from sdcm.sct_events import Severity
 from sdcm.sct_events.events_processes import \
     EVENTS_GRAFANA_ANNOTATOR_ID, EVENTS_GRAFANA_AGGREGATOR_ID, EVENTS_GRAFANA_POSTMAN_ID, \
     EventsProcessesRegistry, BaseEventsProcess, EventsProcessPipe, \
@@ -31,6 +34,15 @@ GRAFANA_EVENT_AGGREGATOR_MAX_DUPLICATES: int = 5
 GRAFANA_EVENT_AGGREGATOR_QUEUE_WAIT_TIMEOUT: float = 1  # seconds
 GRAFANA_ANNOTATIONS_API_ENDPOINT: str = "/api/annotations"
 GRAFANA_ANNOTATIONS_API_AUTH: Tuple[str, str] = ("admin", "admin", )
+GRAFANA_EVENT_POSTMAN_SENDERS: int = 4
+GRAFANA_EVENT_POSTMAN_QUEUE_SIZE: int = 1000  # annotations
+GRAFANA_EVENT_POSTMAN_LOW_SEVERITY_SAMPLE_RATE: int = 10  # post every 10th low severity annotation on overflow
+GRAFANA_EVENT_POSTMAN_COALESCE_TIME_WINDOW: int = 1000  # milliseconds
+GRAFANA_EVENT_POSTMAN_COALESCE_MAX_BATCH: int = 100  # annotations
+GRAFANA_EVENT_POSTMAN_POST_TIMEOUT: float = 10  # seconds
+GRAFANA_EVENT_POSTMAN_POST_RETRIES: int = 3
+GRAFANA_EVENT_POSTMAN_POST_BACKOFF: float = 0.5  # seconds
+GRAFANA_EVENT_POSTMAN_STOP_TIMEOUT: float = 10  # seconds
 
 LOGGER = logging.getLogger(__name__)
 
@@ -94,23 +106,156 @@ class GrafanaEventAggregator(EventsProcessPipe[Annotation, Annotation]):
 
 
 class GrafanaEventPostman(BaseEventsProcess[Annotation, None], threading.Thread):
+    """Post annotations to Grafana using a pool of sender threads which share one keep-alive HTTP session.
+
+    Annotations are put to a bounded queue.  When the queue is full, only every `low_severity_sample_rate'th low
+    severity annotation is kept and the rest of them are dropped, while other annotations block the pipeline until
+    senders free some space in the queue (for up to `stop_timeout' seconds, then the annotation is dropped.)  Senders
+    coalesce queued annotations with the same tags from the same time window into a single region annotation and
+    retry failed requests with an exponential backoff.
+    """
+
     inbound_events_process = EVENTS_GRAFANA_AGGREGATOR_ID
     api_endpoint = GRAFANA_ANNOTATIONS_API_ENDPOINT
     api_auth = GRAFANA_ANNOTATIONS_API_AUTH
+    senders = GRAFANA_EVENT_POSTMAN_SENDERS
+    queue_size = GRAFANA_EVENT_POSTMAN_QUEUE_SIZE
+    low_severity_sample_rate = GRAFANA_EVENT_POSTMAN_LOW_SEVERITY_SAMPLE_RATE
+    low_severities = frozenset((Severity.NORMAL.name, Severity.WARNING.name, ))
+    coalesce_time_window = GRAFANA_EVENT_POSTMAN_COALESCE_TIME_WINDOW
+    coalesce_max_batch = GRAFANA_EVENT_POSTMAN_COALESCE_MAX_BATCH
+    post_timeout = GRAFANA_EVENT_POSTMAN_POST_TIMEOUT
+    post_retries = GRAFANA_EVENT_POSTMAN_POST_RETRIES
+    post_backoff = GRAFANA_EVENT_POSTMAN_POST_BACKOFF
+    stop_timeout = GRAFANA_EVENT_POSTMAN_STOP_TIMEOUT
 
     def __init__(self, _registry: EventsProcessesRegistry):
         self.url_set = threading.Event()
         self._grafana_post_url = ""
 
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_maxsize=self.senders))
+        self._session.mount("https://", HTTPAdapter(pool_maxsize=self.senders))
+
+        self._send_queue: queue.Queue[Annotation] = queue.Queue(maxsize=self.queue_size)
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, int] = defaultdict(int)
+
         super().__init__(_registry=_registry)
 
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats, queue_size=self._send_queue.qsize())
+
+    def _update_stats(self, **kwargs: int) -> None:
+        with self._stats_lock:
+            for key, value in kwargs.items():
+                self._stats[key] += value
+
     def run(self) -> None:
         # Waiting until the monitor URL is set, and we can start using the API.
         self.url_set.wait()
 
+        senders = [threading.Thread(target=self._sender, name=f"{self.name}-sender-{idx}", daemon=True)
+                   for idx in range(self.senders)]
+        for sender in senders:
+            sender.start()
+
         for annotation in self.inbound_events():  # events from GrafanaAggregator
-            with verbose_suppress("GrafanaEventPostman failed to post an annotation %s", annotation):
-                requests.post(self._grafana_post_url, json=annotation, auth=self.api_auth).raise_for_status()
+            with verbose_suppress("GrafanaEventPostman failed to enqueue an annotation %s", annotation):
+                self._enqueue(annotation)
+
+        end_time = time.perf_counter() + self.stop_timeout
+        for sender in senders:
+            sender.join(max(end_time - time.perf_counter(), 0))
+        self._session.close()
+
+        LOGGER.debug("GrafanaEventPostman stats: %s", self.stats)
+
+    def _enqueue(self, annotation: Annotation) -> None:
+        try:
+            self._send_queue.put_nowait(annotation)
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["queue_overflows"] += 1
+                if self.low_severities.intersection(annotation["tags"]):
+                    self._stats["low_severity_overflows"] += 1
+                    if self._stats["low_severity_overflows"] % self.low_severity_sample_rate:
+                        self._stats["dropped"] += 1
+                        return
+            # Backpressure: block the pipeline until senders free some space in the queue.
+            try:
+                self._send_queue.put(annotation, timeout=self.stop_timeout)
+            except queue.Full:
+                self._update_stats(dropped=1)
+                raise
+        with self._stats_lock:
+            self._stats["queue_max_size"] = max(self._stats["queue_max_size"], self._send_queue.qsize())
+
+    def _sender(self) -> None:
+        while not self.stop_event.is_set() or not self._send_queue.empty():
+            try:
+                batch = [self._send_queue.get(timeout=1)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.coalesce_max_batch:
+                try:
+                    batch.append(self._send_queue.get_nowait())
+                except queue.Empty:
+                    break
+            for annotation, count in self.coalesce(batch, time_window=self.coalesce_time_window):
+                with verbose_suppress("GrafanaEventPostman failed to post an annotation %s", annotation):
+                    self._post(annotation, count=count)
+
+    def _post(self, annotation: Annotation, count: int) -> None:
+        for attempt in range(self.post_retries + 1):
+            try:
+                self._session.post(self._grafana_post_url,
+                                   json=annotation,
+                                   auth=self.api_auth,
+                                   timeout=self.post_timeout).raise_for_status()
+            except requests.RequestException as exc:
+                response = getattr(exc, "response", None)
+                if attempt == self.post_retries or self.stop_event.is_set() or \
+                        response is not None and response.status_code < 500:
+                    self._update_stats(failed=count)
+                    raise
+                self._update_stats(retries=1)
+                time.sleep(self.post_backoff * 2 ** attempt)
+            else:
+                self._update_stats(requests=1, posted=count, coalesced=count - 1)
+                return
+
+    @staticmethod
+    def coalesce(annotations: List[Annotation], time_window: int) -> List[Tuple[Annotation, int]]:
+        """Merge annotations with same tags from same time window into region annotations.
+
+        Return list of (annotation, number of merged annotations) tuples.
+        """
+
+        groups: Dict[Tuple[Tuple[str, ...], int], List[Annotation]] = {}
+        for annotation in annotations:
+            groups.setdefault((tuple(annotation["tags"]), annotation["time"] // time_window), []).append(annotation)
+
+        coalesced = []
+        for group in groups.values():
+            if len(group) == 1:
+                coalesced.append((group[0], 1, ))
+                continue
+            start_time = min(annotation["time"] for annotation in group)
+            end_time = max(annotation["time"] for annotation in group)
+            coalesced.append((
+                Annotation({
+                    "time": start_time,
+                    "timeEnd": end_time,
+                    "tags": group[0]["tags"],
+                    "isRegion": end_time > start_time,
+                    "text": f"{len(group)} events:\n" + "\n".join(annotation["text"] for annotation in group),
+                }),
+                len(group),
+            ))
+        return coalesced
 
     def set_grafana_url(self, grafana_base_url: str) -> None:
         if not grafana_base_url:
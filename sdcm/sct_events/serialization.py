@@ -0,0 +1,127 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+"""Wire format of SCT events sent between the events processes.
+
+Each encoded event starts with a fixed header:
+
+    +---------+----------+-------------------+---------------------+---------------------+
+    | version | severity | type name length  | type name (utf-8)   | body                |
+    | 1 byte  | 1 byte   | 2 bytes (network) |                     |                     |
+    +---------+----------+-------------------+---------------------+---------------------+
+
+Type name is `<module>:<event class name>' where the class name is the key of the event type in
+SctEventTypesRegistry.  Body of WIRE_FORMAT_JSON version is a JSON object with public fields of the event only.
+Events which can't be represented this way (e.g., have own `__reduce__()' or non-JSON fields) are sent using
+WIRE_FORMAT_PICKLE version.
+"""
+
+import json
+import struct
+import pickle
+import importlib
+from typing import Type, Dict, Any
+from functools import lru_cache
+
+from sdcm.sct_events import Severity
+from sdcm.sct_events.base import SctEvent
+
+
+WIRE_FORMAT_JSON: int = 1
+WIRE_FORMAT_PICKLE: int = 2
+
+HEADER = struct.Struct("!BBH")
+UNKNOWN_SEVERITY: int = 255
+
+# Keys used to mark values which have no native JSON representation.
+TUPLE_KEY: str = "__tuple__"
+SEVERITY_KEY: str = "__severity__"
+
+
+class _EventStateEncoder(json.JSONEncoder):
+    def default(self, o):  # pylint: disable=method-hidden
+        if isinstance(o, Severity):
+            return {SEVERITY_KEY: o.name}
+        raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+    def iterencode(self, o, _one_shot=False):
+        return super().iterencode(_mark_tuples(o), _one_shot)
+
+
+def _mark_tuples(value: Any) -> Any:
+    if isinstance(value, tuple):
+        return {TUPLE_KEY: [_mark_tuples(item) for item in value]}
+    if isinstance(value, list):
+        return [_mark_tuples(item) for item in value]
+    if isinstance(value, dict):
+        if not all(isinstance(key, str) for key in value):
+            raise TypeError("Only string keys can be used in JSON objects")
+        return {key: _mark_tuples(item) for key, item in value.items()}
+    return value
+
+
+def _state_object_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        if TUPLE_KEY in obj:
+            return tuple(obj[TUPLE_KEY])
+        if SEVERITY_KEY in obj:
+            return Severity[obj[SEVERITY_KEY]]
+    return obj
+
+
+_STATE_ENCODER = _EventStateEncoder(ensure_ascii=False, check_circular=False, separators=(",", ":"))
+_STATE_DECODER = json.JSONDecoder(object_hook=_state_object_hook)
+
+
+def encode_event(event: SctEvent) -> bytes:
+    event_type = type(event)
+    name = f"{event_type.__module__}:{event_type.__name__}".encode("utf-8")
+    severity = event.severity.value if isinstance(event.severity, Severity) else UNKNOWN_SEVERITY
+    body = None
+    if event_type.__reduce__ is SctEvent.__reduce__:  # pylint: disable=comparison-with-callable
+        try:
+            body = _STATE_ENCODER.encode(event.__getstate__()).encode("utf-8")
+            version = WIRE_FORMAT_JSON
+        except (TypeError, ValueError):
+            pass
+    if body is None:
+        body = pickle.dumps(event)
+        version = WIRE_FORMAT_PICKLE
+    return HEADER.pack(version, severity, len(name)) + name + body
+
+
+def decode_event(data: bytes) -> SctEvent:
+    version, _, name_length = HEADER.unpack_from(data)
+    body = memoryview(data)[HEADER.size + name_length:]
+    if version == WIRE_FORMAT_PICKLE:
+        return pickle.loads(body)
+    if version != WIRE_FORMAT_JSON:
+        raise ValueError(f"Unsupported version of the events wire format: {version}")
+    module, name = data[HEADER.size:HEADER.size + name_length].decode("utf-8").split(":", 1)
+
+    # Rebuild the event without calling `__init__()', same as unpickling does.
+    event_type = get_event_type(module=module, name=name)
+    event = event_type.__new__(event_type)
+    event.__dict__.update(_STATE_DECODER.decode(str(body, "utf-8")))
+    return event
+
+
+@lru_cache(maxsize=None)
+def get_event_type(module: str, name: str) -> Type[SctEvent]:
+    # pylint: disable=protected-access,unsupported-membership-test,unsubscriptable-object
+    if name not in SctEvent._sct_event_types_registry:
+        importlib.import_module(module)  # the event type can be defined in a module which is not imported yet.
+    return SctEvent._sct_event_types_registry[name].__mro__[0]  # get the class itself instead of the weak proxy.
+
+
+__all__ = ("encode_event", "decode_event", "get_event_type", )
@@ -22,7 +22,7 @@ from sdcm.sct_events.grafana import start_grafana_pipeline
 from sdcm.sct_events.filters import DbEventsFilter
 from sdcm.sct_events.database import DatabaseLogEvent
 from sdcm.sct_events.file_logger import start_events_logger
-from sdcm.sct_events.events_device import start_events_main_device
+from sdcm.sct_events.events_device import start_events_main_device, get_events_main_device
 from sdcm.sct_events.events_analyzer import start_events_analyzer
 from sdcm.sct_events.events_processes import \
     EVENTS_MAIN_DEVICE_ID, EVENTS_FILE_LOGGER_ID, EVENTS_ANALYZER_ID, \
@@ -30,10 +30,16 @@ from sdcm.sct_events.events_processes import \
     EventsProcessesRegistry, create_default_events_process_registry, get_events_process
 
 
-EVENTS_DEVICE_START_DELAY = 1  # seconds
-EVENTS_SUBSCRIBERS_START_DELAY = 3  # seconds
+EVENTS_DEVICE_START_TIMEOUT = 30  # seconds
+EVENTS_SUBSCRIBERS_START_TIMEOUT = 30  # seconds
 EVENTS_PROCESS_STOP_TIMEOUT = 10  # seconds
 
+# Processes which subscribed to the main device directly and can miss events published before they are ready.
+EVENTS_MAIN_DEVICE_SUBSCRIBERS = (EVENTS_FILE_LOGGER_ID, EVENTS_GRAFANA_ANNOTATOR_ID, EVENTS_ANALYZER_ID, )
+
+# Stages of the Grafana pipeline, each one reads the outbound queue of the previous one.
+EVENTS_GRAFANA_PIPELINE = (EVENTS_GRAFANA_ANNOTATOR_ID, EVENTS_GRAFANA_AGGREGATOR_ID, EVENTS_GRAFANA_POSTMAN_ID, )
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -45,14 +51,17 @@ def start_events_device(log_dir: Optional[Union[str, Path]] = None,
         _registry = create_default_events_process_registry(log_dir=log_dir)
 
     start_events_main_device(_registry=_registry)
-
-    time.sleep(EVENTS_DEVICE_START_DELAY)
+    if not get_events_main_device(_registry=_registry).wait_ready(timeout=EVENTS_DEVICE_START_TIMEOUT):
+        LOGGER.error("Events main device is not ready after %s seconds", EVENTS_DEVICE_START_TIMEOUT)
 
     start_events_logger(_registry=_registry)
     start_grafana_pipeline(_registry=_registry)
     start_events_analyzer(_registry=_registry)
 
-    time.sleep(EVENTS_SUBSCRIBERS_START_DELAY)
+    end_time = time.perf_counter() + EVENTS_SUBSCRIBERS_START_TIMEOUT
+    for name in EVENTS_MAIN_DEVICE_SUBSCRIBERS:
+        if not get_events_process(name, _registry=_registry).wait_ready(timeout=max(end_time - time.perf_counter(), 0)):
+            LOGGER.error("Events process `%s' is not ready after %s seconds", name, EVENTS_SUBSCRIBERS_START_TIMEOUT)
 
     # Default filters.
     DbEventsFilter(db_event=DatabaseLogEvent.BACKTRACE, line='Rate-limit: supressed').publish()
@@ -72,11 +81,36 @@ def stop_events_device(_registry: Optional[EventsProcessesRegistry] = None) -> N
         EVENTS_MAIN_DEVICE_ID,
     )
     events_stat = {}
-    for name in processes:
-        if (proc := get_events_process(name, _registry=_registry)) and proc.is_alive():
-            LOGGER.debug("Signaling %s to terminate and wait for finish...", name)
+    alive_processes = {name: proc for name in processes
+                       if (proc := get_events_process(name, _registry=_registry)) and proc.is_alive()}
+
+    # Deliver summaries of held events storms and events which are still queued before the consumers stop.
+    if (main_device := alive_processes.get(EVENTS_MAIN_DEVICE_ID)) is not None:
+        LOGGER.debug("Wait for %s to deliver all events...", EVENTS_MAIN_DEVICE_ID)
+        if not main_device.drain(timeout=EVENTS_PROCESS_STOP_TIMEOUT):
+            LOGGER.error("Events main device didn't deliver all events in %s seconds", EVENTS_PROCESS_STOP_TIMEOUT)
+
+    # Signal independent consumers and the head of the Grafana pipeline to terminate at once.  Next stages of the
+    # pipeline are signaled only after their upstream stage finished, so each one drains its upstream's queue first.
+    for name, proc in alive_processes.items():
+        if name != EVENTS_MAIN_DEVICE_ID and name not in EVENTS_GRAFANA_PIPELINE[1:]:
+            LOGGER.debug("Signaling %s to terminate...", name)
+            proc.terminate()
+    end_time = time.perf_counter() + EVENTS_PROCESS_STOP_TIMEOUT
+    for upstream, name in zip(EVENTS_GRAFANA_PIPELINE, EVENTS_GRAFANA_PIPELINE[1:]):
+        if (proc := alive_processes.get(upstream)) is not None:
+            LOGGER.debug("Wait for %s to finish...", upstream)
+            proc.join(timeout=max(end_time - time.perf_counter(), 0))
+        if (proc := alive_processes.get(name)) is not None:
+            LOGGER.debug("Signaling %s to terminate...", name)
+            proc.terminate()
+    for name, proc in alive_processes.items():
+        LOGGER.debug("Wait for %s to finish...", name)
+        if name == EVENTS_MAIN_DEVICE_ID:
             proc.stop(timeout=EVENTS_PROCESS_STOP_TIMEOUT)
-            events_stat[f"{proc._registry}[{name}]"] = proc.events_counter
+        else:
+            proc.join(timeout=max(end_time - time.perf_counter(), 0))
+        events_stat[f"{proc._registry}[{name}]"] = proc.events_counter
     LOGGER.debug("All events consumers stopped.")
 
     if events_stat:
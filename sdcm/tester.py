@@ -78,7 +78,7 @@ from sdcm.send_email import build_reporter, read_email_data_from_file, get_runni
     save_email_data_to_file
 from sdcm.utils import alternator
 from sdcm.utils.profiler import ProfilerFactory
-from sdcm.remote import RemoteCmdRunnerBase
+from sdcm.remote import RemoteCmdRunnerBase, RemoteLibSSH2CmdRunner
 from sdcm.utils.gce_utils import get_gce_services
 from sdcm.keystore import KeyStore
 from sdcm.utils.latency import calculate_latency
@@ -230,6 +230,7 @@ class ClusterTester(db_stats.TestStatsMixin, unittest.TestCase):  # pylint: disa
         Setup.set_tester_obj(self)
         self._init_logging()
         RemoteCmdRunnerBase.set_default_ssh_transport(self.params.get('ssh_transport'))
+        RemoteLibSSH2CmdRunner.persistent_shell = self.params.get('ssh_persistent_shell')
 
         self._profile_factory = None
         if self.params.get('enable_test_profiling'):
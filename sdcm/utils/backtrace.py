@@ -0,0 +1,87 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+ADDR2LINE_INLINED_PREFIX = " (inlined by) "
+
+BacktraceAddresses = Tuple[str, ...]
+
+
+def get_backtrace_addresses(raw_backtrace: str) -> BacktraceAddresses:
+    """Return a normalized list of addresses of a raw backtrace.
+
+    Hex addresses are written in the same way regardless of zero padding and case, other items (e.g.,
+    `/opt/scylladb/libreloc/libc.so.6+0x3f00f') are left as is.
+    """
+
+    addresses = []
+    for address in raw_backtrace.split():
+        try:
+            address = hex(int(address, 16)) if address[:2].lower() == "0x" else address
+        except ValueError:
+            pass
+        addresses.append(address)
+    return tuple(addresses)
+
+
+def split_addr2line_output(output: str, addresses_count: int) -> Optional[List[str]]:
+    """Split output of `addr2line -pi' to decoded parts of each address or return None if it can't be done.
+
+    Each address is decoded to one line, which can be followed by lines of functions inlined into it.
+    """
+
+    parts = []
+    for line in output.splitlines(keepends=True):
+        if line.startswith(ADDR2LINE_INLINED_PREFIX) and parts:
+            parts[-1] += line
+        else:
+            parts.append(line)
+    return parts if len(parts) == addresses_count else None
+
+
+class DecodedBacktracesCache:
+    """Thread-safe cache of decoded backtraces keyed by a debug info file and normalized addresses."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._backtraces: Dict[Tuple[str, BacktraceAddresses], str] = {}
+
+    def get(self, debug_file: str, addresses: BacktraceAddresses) -> Optional[str]:
+        with self._lock:
+            return self._backtraces.get((debug_file, addresses))
+
+    def put(self, debug_file: str, addresses: BacktraceAddresses, decoded: str) -> None:
+        with self._lock:
+            self._backtraces[(debug_file, addresses)] = decoded
+
+    def put_batch(self, debug_file: str, backtraces: List[BacktraceAddresses], output: str) -> bool:
+        """Split output of a decoding of all unique addresses of `backtraces' and cache each backtrace.
+
+        Return False if the output can't be split.
+        """
+
+        unique_addresses = list(dict.fromkeys(address for addresses in backtraces for address in addresses))
+        if (parts := split_addr2line_output(output, len(unique_addresses))) is None:
+            return False
+        decoded_addresses = dict(zip(unique_addresses, parts))
+        for addresses in backtraces:
+            self.put(debug_file, addresses, "".join(decoded_addresses[address] for address in addresses))
+        return True
+
+    def __len__(self):
+        return len(self._backtraces)
+
+
+__all__ = ("get_backtrace_addresses", "split_addr2line_output", "DecodedBacktracesCache", )
@@ -26,7 +26,6 @@ import time
 import datetime
 import errno
 import threading
-import select
 import shutil
 import copy
 import string
@@ -34,11 +33,11 @@ import warnings
 import getpass
 import json
 import uuid
-from typing import Iterable, List, Callable, Optional, Dict, Union, Literal
+from typing import Iterable, Iterator, List, Callable, Optional, Dict, Union, Literal
 from urllib.parse import urlparse
 from unittest.mock import Mock
 
-from functools import wraps, cached_property
+from functools import wraps, cached_property, partial
 from collections import defaultdict, namedtuple
 import concurrent.futures
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
@@ -59,15 +58,25 @@ from packaging.version import Version
 
 from sdcm.utils.ssh_agent import SSHAgent
 from sdcm.utils.decorators import retrying
+from sdcm.utils.inotify import Inotify, IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE, IN_MOVE_SELF, IN_DELETE_SELF
 from sdcm import wait
 
 
 LOGGER = logging.getLogger('utils')
+
+FILE_FOLLOWER_READ_SIZE: int = 1024 * 1024  # bytes
+FILE_FOLLOWER_WAIT_TIMEOUT: float = 0.5  # seconds; how often an idle follower checks if its thread is stopped
+FILE_FOLLOWER_POLL_INTERVAL: float = 0.1  # seconds; used if inotify is not available
+FILE_FOLLOWER_INOTIFY_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVE_SELF | IN_DELETE_SELF
+
+PARALLEL_OBJECT_SHARED_POOL_SIZE: int = 128  # max threads of the process-wide pool used by ParallelObject.iter_results
+
 DEFAULT_AWS_REGION = "eu-west-1"
 DOCKER_CGROUP_RE = re.compile("/docker/([0-9a-f]+)")
 SCYLLA_AMI_OWNER_ID = "797456418907"
 MAX_SPOT_DURATION_TIME = 360
 SCYLLA_YAML_PATH = "/etc/scylla/scylla.yaml"
+SCHEMA_AGREEMENT_TIMEOUT = 180  # seconds
 
 
 def deprecation(message):
@@ -325,6 +334,67 @@ def all_aws_regions(cached=False):
         return [region['RegionName'] for region in client.describe_regions()['Regions']]
 
 
+_SHARED_THREAD_POOL: Optional[ThreadPoolExecutor] = None
+_SHARED_THREAD_POOL_LOCK = threading.Lock()
+_SHARED_THREAD_POOL_THREAD = threading.local()
+_ABANDONED_TASKS = 0
+_ABANDONED_TASKS_LOCK = threading.Lock()
+
+
+def _mark_shared_thread_pool_thread() -> None:
+    _SHARED_THREAD_POOL_THREAD.active = True
+
+
+def in_shared_thread_pool() -> bool:
+    """Return True if called from a thread of the process-wide thread pool."""
+
+    return getattr(_SHARED_THREAD_POOL_THREAD, "active", False)
+
+
+def get_shared_thread_pool() -> ThreadPoolExecutor:
+    """Return a process-wide thread pool, threads of which are started on demand and reused by following calls.
+
+    Don't wait for tasks submitted to this pool from its own threads: if all threads are busy with such waiting
+    nobody is left to run the tasks.
+    """
+
+    global _SHARED_THREAD_POOL  # pylint: disable=global-statement
+    with _SHARED_THREAD_POOL_LOCK:
+        if _SHARED_THREAD_POOL is None:
+            _SHARED_THREAD_POOL = ThreadPoolExecutor(max_workers=PARALLEL_OBJECT_SHARED_POOL_SIZE,
+                                                     thread_name_prefix="ParallelObject",
+                                                     initializer=_mark_shared_thread_pool_thread)
+            # don't wait for abandoned tasks when interpreter exits, same as ParallelObject.clean_up() does
+            atexit.unregister(_python_exit)
+        return _SHARED_THREAD_POOL
+
+
+def get_abandoned_tasks_count() -> int:
+    """Return number of timed out tasks of ParallelObject.iter_results which are still running."""
+
+    return _ABANDONED_TASKS
+
+
+def _abandon_task(future: concurrent.futures.Future) -> None:
+    """Cancel a timed out task or, if it's running already, count its thread as occupied until the task is done."""
+
+    global _ABANDONED_TASKS  # pylint: disable=global-statement
+    if future.cancel():
+        return
+    with _ABANDONED_TASKS_LOCK:
+        _ABANDONED_TASKS += 1
+        abandoned = _ABANDONED_TASKS
+    LOGGER.warning("Timed out task is still running and occupies a thread, %d timed out task(s) are running now",
+                   abandoned)
+    future.add_done_callback(_release_abandoned_task)
+
+
+def _release_abandoned_task(_: concurrent.futures.Future) -> None:
+    global _ABANDONED_TASKS  # pylint: disable=global-statement
+    with _ABANDONED_TASKS_LOCK:
+        _ABANDONED_TASKS -= 1
+
+
 class ParallelObject:
     """
         Run function in with supplied args in parallel using thread.
@@ -350,7 +420,7 @@ class ParallelObject:
         self.timeout = timeout
         self.num_workers = num_workers
         self.disable_logging = disable_logging
-        self._thread_pool = ThreadPoolExecutor(max_workers=self.num_workers)
+        self._thread_pool = None
 
     def run(self, func: Callable, ignore_exceptions=False, unpack_objects: bool = False):
         """Run callable object "func" in parallel
@@ -372,37 +442,10 @@ class ParallelObject:
         :rtype: {List[FutureResult]}
         """
 
-        def func_wrap(fun):
-            @wraps(fun)
-            def inner(*args, **kwargs):
-                thread_name = threading.current_thread().name
-                fun_args = args
-                fun_kwargs = kwargs
-                fun_name = fun.__name__
-                LOGGER.debug("[{thread_name}] {fun_name}({fun_args}, {fun_kwargs})".format(thread_name=thread_name,
-                                                                                           fun_name=fun_name,
-                                                                                           fun_args=fun_args,
-                                                                                           fun_kwargs=fun_kwargs))
-                return_val = fun(*args, **kwargs)
-                LOGGER.debug("[{thread_name}] Done.".format(thread_name=thread_name))
-                return return_val
-            return inner
-
         results = []
-
-        if not self.disable_logging:
-            LOGGER.debug("Executing in parallel: '{}' on {}".format(func.__name__, self.objects))
-            func = func_wrap(func)
-
-        futures = []
-
-        for obj in self.objects:
-            if unpack_objects and isinstance(obj, (list, tuple)):
-                futures.append(self._thread_pool.submit(func, *obj))
-            elif unpack_objects and isinstance(obj, dict):
-                futures.append(self._thread_pool.submit(func, **obj))
-            else:
-                futures.append(self._thread_pool.submit(func, obj))
+        func = self._wrap_with_logging(func)
+        self._thread_pool = ThreadPoolExecutor(max_workers=self.num_workers)
+        futures = [self._submit(self._thread_pool, func, obj, unpack_objects) for obj in self.objects]
         time_out = self.timeout
         for obj_idx, future in enumerate(futures):
             try:
@@ -428,6 +471,127 @@ class ParallelObject:
             raise ParallelObjectException(results=results)
         return results
 
+    def iter_results(self, func: Callable, unpack_objects: bool = False,
+                     task_timeout: Optional[float] = None) -> Iterator["ParallelObjectResult"]:
+        """Run callable object "func" in parallel and yield results in order of completion
+
+        Unlike `run', a result can be processed while the rest of the objects are still being handled, and an
+        exception raised by func doesn't stop the run: it's returned in `exc' attribute of the result.
+
+        Tasks are run by a process-wide thread pool, unless `num_workers' is set or it's called from a task of the
+        process-wide pool (e.g., nested ParallelObject): a dedicated thread pool is used then, so such runs can't
+        starve other users of the process-wide pool or wait for it forever.  `num_workers' limits number of tasks
+        of this run which are running at the same time.  `timeout' is applied to the whole run and `task_timeout'
+        to each task from the moment it's started.  A task which reaches any of them gets FuturesTimeoutError as
+        `exc'.  Python threads can't be interrupted, so a timed out task which is already running is abandoned, not
+        stopped: it keeps its thread until done, such tasks are logged and counted by get_abandoned_tasks_count().
+
+        Closing the iterator (e.g., by leaving a for loop with `break') cancels all the tasks that are not started.
+
+        :param func: Callable object to run in parallel
+        :param unpack_objects: set to True when unpacking of objects to the func as args or kwargs needed
+        :param task_timeout: timeout for a single call of func, defaults to None
+        :returns: iterator of ParallelObjectResult objects
+        """
+
+        func = self._wrap_with_logging(func)
+        if dedicated_thread_pool := bool(self.num_workers or in_shared_thread_pool()):
+            thread_pool = ThreadPoolExecutor(max_workers=PARALLEL_OBJECT_SHARED_POOL_SIZE,
+                                             thread_name_prefix="ParallelObject")
+        else:
+            thread_pool = get_shared_thread_pool()
+        max_pending = self.num_workers or PARALLEL_OBJECT_SHARED_POOL_SIZE
+        end_time = None if self.timeout is None else time.perf_counter() + self.timeout
+        objects = enumerate(self.objects)
+        pending = {}  # future -> (index, object)
+        start_times = {}  # index -> time when the task has been started
+
+        def run_task(index, *args, **kwargs):
+            start_times[index] = time.perf_counter()
+            return func(*args, **kwargs)
+
+        def submit_next() -> bool:
+            for index, obj in objects:
+                pending[self._submit(thread_pool, partial(run_task, index), obj, unpack_objects)] = (index, obj)
+                return True
+            return False
+
+        def get_deadline(future) -> Optional[float]:
+            if task_timeout is None or (start_time := start_times.get(pending[future][0])) is None:
+                return end_time
+            return start_time + task_timeout if end_time is None else min(end_time, start_time + task_timeout)
+
+        def get_wait_timeout() -> Optional[float]:
+            now = time.perf_counter()
+            timeouts = [deadline - now for deadline in map(get_deadline, pending) if deadline is not None]
+            if task_timeout is not None and len(start_times) < len(pending):
+                timeouts.append(task_timeout)  # a task which is not started yet can't expire earlier
+            return max(min(timeouts), 0) if timeouts else None
+
+        try:
+            while len(pending) < max_pending and submit_next():
+                pass
+            while pending:
+                done, _ = concurrent.futures.wait(
+                    pending, timeout=get_wait_timeout(), return_when=concurrent.futures.FIRST_COMPLETED)
+                now = time.perf_counter()
+                expired = [future for future in pending
+                           if future not in done and (deadline := get_deadline(future)) is not None and deadline <= now]
+                for future in done:
+                    index, obj = pending.pop(future)
+                    start_times.pop(index, None)
+                    if exc := future.exception():
+                        yield ParallelObjectResult(obj=obj, exc=exc, result=None)
+                    else:
+                        yield ParallelObjectResult(obj=obj, exc=None, result=future.result())
+                for future in expired:
+                    index, obj = pending.pop(future)
+                    _abandon_task(future)
+                    start_times.pop(index, None)
+                    yield ParallelObjectResult(obj=obj, exc=FuturesTimeoutError(f"when running on: {obj}"), result=None)
+                if end_time is not None and time.perf_counter() >= end_time:
+                    for _, obj in objects:
+                        yield ParallelObjectResult(obj=obj, exc=FuturesTimeoutError(f"when running on: {obj}"),
+                                                   result=None)
+                while len(pending) < max_pending and submit_next():
+                    pass
+        finally:
+            for future in pending:
+                future.cancel()
+            if dedicated_thread_pool:
+                thread_pool.shutdown(wait=False)
+                atexit.unregister(_python_exit)
+
+    def _wrap_with_logging(self, func: Callable) -> Callable:
+        if self.disable_logging:
+            return func
+
+        LOGGER.debug("Executing in parallel: '{}' on {}".format(func.__name__, self.objects))
+
+        @wraps(func)
+        def inner(*args, **kwargs):
+            thread_name = threading.current_thread().name
+            fun_args = args
+            fun_kwargs = kwargs
+            fun_name = func.__name__
+            LOGGER.debug("[{thread_name}] {fun_name}({fun_args}, {fun_kwargs})".format(thread_name=thread_name,
+                                                                                       fun_name=fun_name,
+                                                                                       fun_args=fun_args,
+                                                                                       fun_kwargs=fun_kwargs))
+            return_val = func(*args, **kwargs)
+            LOGGER.debug("[{thread_name}] Done.".format(thread_name=thread_name))
+            return return_val
+        return inner
+
+    @staticmethod
+    def _submit(thread_pool: ThreadPoolExecutor, func: Callable, obj,
+                unpack_objects: bool) -> concurrent.futures.Future:
+        if unpack_objects and isinstance(obj, (list, tuple)):
+            return thread_pool.submit(func, *obj)
+        if unpack_objects and isinstance(obj, dict):
+            return thread_pool.submit(func, **obj)
+        return thread_pool.submit(func, obj)
+
     def clean_up(self, futures):
         # if there are futures that didn't run  we cancel them
         for future in futures:
@@ -1107,25 +1271,75 @@ def safe_kill(pid, signal):
 
 
 class FileFollowerIterator():  # pylint: disable=too-few-public-methods
+    """Iterate over lines of a growing file until the follower thread is stopped.
+
+    Wait for changes of the file using inotify (or poll it if inotify is not available), read new data in big chunks
+    into a reusable buffer and yield complete lines.  A truncated file is followed from the beginning again and a
+    rotated one (i.e., there is another file with the same name) is reopened after the rest of the old file is read.
+    The last yielded line is an incomplete tail of the file (maybe empty.)
+    """
+
     def __init__(self, filename, thread_obj):
         self.filename = filename
         self.thread_obj = thread_obj
 
-    def __iter__(self):
-        with open(self.filename, 'r') as input_file:
-            line = ''
+    def _get_inotify(self) -> Optional[Inotify]:
+        try:
+            return Inotify()
+        except OSError as exc:
+            LOGGER.debug("Follow %s by polling: %s", self.filename, exc)
+            return None
+
+    def _is_rotated(self, input_file) -> bool:
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            return False  # wait for a new file or for more data in the old one.
+        input_file_stat = os.fstat(input_file.fileno())
+        return (stat.st_dev, stat.st_ino) != (input_file_stat.st_dev, input_file_stat.st_ino)
+
+    def __iter__(self):  # pylint: disable=too-many-branches
+        buffer = bytearray(FILE_FOLLOWER_READ_SIZE)
+        view = memoryview(buffer)
+        tail = b""
+        inotify = self._get_inotify()
+        watch = None
+        input_file = open(self.filename, "rb", buffering=0)  # pylint: disable=consider-using-with
+        try:
+            if inotify:
+                watch = inotify.add_watch(self.filename, FILE_FOLLOWER_INOTIFY_MASK)
             while not self.thread_obj.stopped():
-                poller = select.poll()  # pylint: disable=no-member
-                poller.register(input_file, select.POLLIN)  # pylint: disable=no-member
-                if poller.poll(100):
-                    line += input_file.readline()
-                if not line or not line.endswith('\n'):
-                    time.sleep(0.1)
+                if size := input_file.readinto(buffer):
+                    lines = (tail + view[:size]).split(b"\n")
+                    tail = lines.pop()
+                    for line in lines:
+                        yield line.decode(errors="replace") + "\n"
+                    continue
+                if os.fstat(input_file.fileno()).st_size < input_file.tell():
+                    LOGGER.debug("%s was truncated, follow it from the beginning", self.filename)
+                    input_file.seek(0)
+                    tail = b""
                     continue
-                poller.unregister(input_file)
-                yield line
-                line = ''
-            yield line
+                if self._is_rotated(input_file):
+                    LOGGER.debug("%s was rotated, follow the new file", self.filename)
+                    input_file.close()
+                    input_file = open(self.filename, "rb", buffering=0)  # pylint: disable=consider-using-with
+                    if inotify:
+                        inotify.rm_watch(watch)
+                        watch = inotify.add_watch(self.filename, FILE_FOLLOWER_INOTIFY_MASK)
+                    if tail:
+                        yield tail.decode(errors="replace")
+                        tail = b""
+                    continue
+                if inotify:
+                    inotify.wait(timeout=FILE_FOLLOWER_WAIT_TIMEOUT)
+                else:
+                    time.sleep(FILE_FOLLOWER_POLL_INTERVAL)
+            yield tail.decode(errors="replace")
+        finally:
+            input_file.close()
+            if inotify:
+                inotify.close()
 
 
 class FileFollowerThread():
@@ -1182,6 +1396,18 @@ class ScyllaCQLSession:
         self.cluster.shutdown()
 
 
+def wait_for_schema_agreement_in_session(session, timeout: float = SCHEMA_AGREEMENT_TIMEOUT) -> bool:
+    """Wait until schema versions in system.local and system.peers converge and return False if they don't.
+
+    The driver polls the versions over the control connection of the session, so it returns as soon as they converge.
+    Nodes which are down from the driver's point of view are not checked.
+    """
+    if session.cluster.control_connection.wait_for_schema_agreement(wait_time=timeout):
+        return True
+    LOGGER.warning("Schema agreement is not reached in %s seconds", timeout)
+    return False
+
+
 class MethodVersionNotFound(Exception):
     pass
 
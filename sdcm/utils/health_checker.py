@@ -13,7 +13,8 @@
 
 import time
 import logging
-from typing import Generator
+import itertools
+from typing import Generator, Iterable, NamedTuple
 
 from sdcm.sct_events import Severity
 from sdcm.sct_events.health import ClusterHealthValidatorEvent
@@ -22,6 +23,15 @@ from sdcm.sct_events.health import ClusterHealthValidatorEvent
 CHECK_NODE_HEALTH_RETRIES = 3
 CHECK_NODE_HEALTH_RETRY_DELAY = 5
 
+# Numbers of gossip application states in the output of `/failure_detector/endpoints' REST API call
+GOSSIP_APPLICATION_STATE_STATUS = 0
+GOSSIP_APPLICATION_STATE_SCHEMA = 2
+GOSSIP_APPLICATION_STATE_DC = 3
+GOSSIP_APPLICATION_STATE_RPC_ADDRESS = 8
+
+PEERS_INFO_COLUMNS = ('data_center', 'host_id', 'rack', 'release_version', 'rpc_address', 'schema_version',
+                      'supported_features', )
+
 LOGGER = logging.getLogger(__name__)
 
 # Every health check function returns a generator of health events which should be published by a consumer:
@@ -33,6 +43,77 @@ LOGGER = logging.getLogger(__name__)
 HealthEventsGenerator = Generator[ClusterHealthValidatorEvent, None, None]
 
 
+class NodeHealthInfo(NamedTuple):
+    """Views of the cluster from a node which are cross-checked by the health check."""
+
+    nodes_status: dict
+    peers_details: dict
+    gossip_info: dict
+
+
+def parse_gossip_endpoints(endpoints: list) -> dict:
+    """Convert output of `/failure_detector/endpoints' REST API call to same format as `nodetool gossipinfo' parsing.
+
+    Endpoints without schema or status are skipped, same as `BaseNode.get_gossip_info()' does.
+    """
+    gossip_info = {}
+    for endpoint in endpoints:
+        states = {state["application_state"]: state["value"] for state in endpoint.get("application_state", [])}
+        ip = states.get(GOSSIP_APPLICATION_STATE_RPC_ADDRESS) or endpoint["addrs"]
+        schema = states.get(GOSSIP_APPLICATION_STATE_SCHEMA)
+        status = states.get(GOSSIP_APPLICATION_STATE_STATUS, "").split(",")[0]
+        if schema and status:
+            gossip_info[ip] = {
+                "schema": schema,
+                "status": status,
+                "dc": states.get(GOSSIP_APPLICATION_STATE_DC, "").split(",")[0],
+            }
+    return gossip_info
+
+
+def peers_rows_to_details(rows: Iterable) -> dict:
+    """Convert rows of system.peers got by CQL driver to same format as cqlsh output parsing.
+
+    Null values are converted to "null" string, the way cqlsh prints them.
+    """
+    return {str(row.peer): {column: "null" if getattr(row, column) is None else str(getattr(row, column))
+                            for column in PEERS_INFO_COLUMNS}
+            for row in rows}
+
+
+def check_node_health_info(current_node, health_info: NodeHealthInfo, removed_nodes_list=None,
+                           cluster_members=None) -> HealthEventsGenerator:
+    return itertools.chain(
+        check_nodes_status(
+            nodes_status=health_info.nodes_status,
+            current_node=current_node,
+            removed_nodes_list=removed_nodes_list),
+        check_node_status_in_gossip_and_nodetool_status(
+            gossip_info=health_info.gossip_info,
+            nodes_status=health_info.nodes_status,
+            current_node=current_node),
+        check_schema_version(
+            gossip_info=health_info.gossip_info,
+            peers_details=health_info.peers_details,
+            nodes_status=health_info.nodes_status,
+            current_node=current_node),
+        check_nulls_in_peers(
+            gossip_info=health_info.gossip_info,
+            peers_details=health_info.peers_details,
+            current_node=current_node),
+        check_cluster_membership(
+            nodes_status=health_info.nodes_status,
+            cluster_members=cluster_members or (),
+            current_node=current_node), )
+
+
+def get_cluster_members(health_info: Iterable[NodeHealthInfo]) -> set:
+    """Return addresses of nodes which are UN in the nodetool status of any node."""
+
+    return {ip for info in health_info for ip, node_properties in info.nodes_status.items()
+            if node_properties['status'] == "UN"}
+
+
 def check_nodes_status(nodes_status: dict, current_node, removed_nodes_list=None) -> HealthEventsGenerator:
     node_type = 'target' if current_node.running_nemesis else 'regular'
     if not nodes_status:
@@ -59,6 +140,23 @@ def check_nodes_status(nodes_status: dict, current_node, removed_nodes_list=None
             )
 
 
+def check_cluster_membership(nodes_status: dict, cluster_members: Iterable,
+                             current_node) -> HealthEventsGenerator:
+    """Validate that the node knows about all nodes which are UN for other nodes of the cluster."""
+
+    if not nodes_status:
+        return
+
+    for ip in sorted(set(cluster_members) - set(nodes_status)):
+        is_target = current_node.print_node_running_nemesis(ip)
+        yield ClusterHealthValidatorEvent.NodeStatus(
+            severity=Severity.ERROR,
+            node=current_node.name,
+            error=f"Current node {current_node.ip_address}. Node {ip}{is_target} is UN for other nodes "
+                  f"but doesn't exist in the nodetool.status of the current node",
+        )
+
+
 def check_nulls_in_peers(gossip_info, peers_details, current_node) -> HealthEventsGenerator:
     """
     This validation is added to recreate the issue: https://github.com/scylladb/scylla/issues/4652
@@ -245,11 +343,12 @@ def check_schema_agreement_in_gossip_and_peers(node, retries: int = CHECK_NODE_H
             LOGGER.warning("%s Schema version is not same on nodes in the gossip", message_pref)
             continue
 
-        for ip, data in gossip_info.items():
-            if data['status'] == "NORMAL" and ip in peers_info:
-                if data["schema"] != peers_info[ip]['schema_version']:
-                    LOGGER.warning("%s Schema version is not same in the gossip and peers for %s", message_pref, ip)
-                    continue
+        mismatched = [ip for ip, data in gossip_info.items()
+                      if data['status'] == "NORMAL" and ip in peers_info
+                      and data["schema"] != peers_info[ip]['schema_version']]
+        if mismatched:
+            LOGGER.warning("%s Schema version is not same in the gossip and peers for %s", message_pref, mismatched)
+            continue
 
         break  # Everything is OK, break the cycle.
     else:
@@ -0,0 +1,111 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+"""Minimal ctypes binding to Linux inotify(7), enough to wait for changes of a few files."""
+
+import os
+import errno
+import ctypes
+import ctypes.util
+import select
+from typing import Optional
+
+# Events from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+INOTIFY_READ_SIZE: int = 64 * 1024  # bytes
+
+_LIBC: Optional[ctypes.CDLL] = None
+
+
+def _get_libc() -> ctypes.CDLL:
+    global _LIBC  # pylint: disable=global-statement
+
+    if _LIBC is None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1.argtypes = (ctypes.c_int, )
+        libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32, )
+        libc.inotify_rm_watch.argtypes = (ctypes.c_int, ctypes.c_int, )
+        _LIBC = libc
+    return _LIBC
+
+
+def _raise_errno(what: str, path: Optional[str] = None) -> None:
+    err = ctypes.get_errno()
+    raise OSError(err, f"{what}: {os.strerror(err)}", path)
+
+
+class Inotify:
+    """Inotify instance which is used only to wake up on changes of the watched files.
+
+    Events are not parsed: a waiter should re-check the state of its files after `wait()' returned True.
+    Raise OSError if inotify is not available on the platform.
+    """
+
+    def __init__(self):
+        try:
+            libc = _get_libc()
+            self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError) as exc:
+            raise OSError(errno.ENOSYS, f"inotify is not available: {exc}") from None
+        if self._fd < 0:
+            _raise_errno("inotify_init1")
+        self._libc = libc
+        self._poller = select.poll()  # pylint: disable=no-member
+        self._poller.register(self._fd, select.POLLIN)  # pylint: disable=no-member
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def add_watch(self, path: str, mask: int) -> int:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), mask)
+        if wd < 0:
+            _raise_errno("inotify_add_watch", path)
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        # The watch is removed by the kernel when the watched file is deleted, so ignore errors.
+        self._libc.inotify_rm_watch(self._fd, wd)
+
+    def wait(self, timeout: float) -> bool:
+        """Wait for events up to `timeout' seconds, drain them and return True if there were any."""
+
+        if not self._poller.poll(timeout * 1000):
+            return False
+        try:
+            while os.read(self._fd, INOTIFY_READ_SIZE):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+__all__ = ("Inotify", "IN_MODIFY", "IN_ATTRIB", "IN_CLOSE_WRITE", "IN_DELETE_SELF", "IN_MOVE_SELF", )
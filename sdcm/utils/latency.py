@@ -22,18 +22,35 @@ def avg(values):
 
 
 def collect_latency(monitor_node, start, end, load_type, cluster, nodes_list):
+    # pylint: disable=too-many-locals,too-many-branches
     res = dict()
     prometheus = PrometheusDBStats(host=monitor_node.external_address)
     duration = int(end - start)
     cassandra_stress_precision = ['99', '95']  # in the future should include also 'max'
     scylla_precision = ['99']  # in the future should include also '95', '5'
 
+    if load_type == 'mixed':
+        load_type_list = ['read', 'write']
+    else:
+        load_type_list = [load_type]
+
+    # send all the queries to Prometheus concurrently
+    queries = {}
+    for precision in cassandra_stress_precision:
+        if not precision == 'max':
+            precision = f'perc_{precision}'
+        queries[('c-s', precision)] = f'collectd_cassandra_stress_{load_type}_gauge{{type="lat_{precision}"}}'
+    for load in load_type_list:
+        for precision in scylla_precision:
+            queries[(load, precision)] = f'histogram_quantile(0.{precision},sum(rate(scylla_storage_proxy_' \
+                                         f'coordinator_{load}_latency_bucket{{}}[{duration}s])) by (instance, le))'
+    queries_res = prometheus.query_all(queries, start, end)
+
     for precision in cassandra_stress_precision:
         metric = f'c-s {precision}' if precision == 'max' else f'c-s P{precision}'
         if not precision == 'max':
             precision = f'perc_{precision}'
-        query = f'collectd_cassandra_stress_{load_type}_gauge{{type="lat_{precision}"}}'
-        query_res = prometheus.query(query, start, end)
+        query_res = queries_res[('c-s', precision)]
         latency_values_lst = list()
         for entry in query_res:
             lat_value = None
@@ -52,16 +69,9 @@ def collect_latency(monitor_node, start, end, load_type, cluster, nodes_list):
             res[metric] = format(float(max([float(val) for val in latency_values_lst])), '.2f') if precision == 'max' \
                 else format(float(avg(latency_values_lst)), '.2f')
 
-    if load_type == 'mixed':
-        load_type = ['read', 'write']
-    else:
-        load_type = [load_type]
-
-    for load in load_type:
+    for load in load_type_list:
         for precision in scylla_precision:
-            query = f'histogram_quantile(0.{precision},sum(rate(scylla_storage_proxy_coordinator_{load}_' \
-                    f'latency_bucket{{}}[{duration}s])) by (instance, le))'
-            query_res = prometheus.query(query, start, end)
+            query_res = queries_res[(load, precision)]
             for entry in query_res:
                 node_ip = entry['metric']['instance'].replace('[', '').replace(']', '')
                 node = cluster.get_node_by_ip(node_ip)
@@ -0,0 +1,60 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+import time
+import threading
+from typing import Collection, Optional
+
+TOPOLOGY_CACHE_TTL = 30  # seconds
+
+
+class TopologyCache:
+    """Index of cluster nodes by IP address, which is expensive to build for big clusters.
+
+    The index is dropped by `invalidate()', which should be called after topology changing operations, and expires
+    after `ttl' seconds anyway, because the topology can be changed by something else (e.g., a node gets a new IP.)
+    """
+
+    def __init__(self, ttl: float = TOPOLOGY_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._nodes_by_ip = None
+        self._nodes_by_ip_time = 0.0
+        self._nodes_count = 0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._nodes_by_ip = None
+
+    def get_node_by_ip(self, nodes: Collection, node_ip: str, datacenter: Optional[str] = None):
+        """Return a node from `nodes' which has `node_ip' address (in `datacenter' if it's given) or None.
+
+        The index is rebuilt when number of `nodes' is changed, because a node could be added or removed, and when a
+        found node has another address already.  A miss doesn't rebuild the index while `nodes' are the same.
+        """
+
+        key = (datacenter, node_ip) if datacenter else node_ip
+        with self._lock:
+            if self._nodes_by_ip is not None and time.perf_counter() - self._nodes_by_ip_time < self.ttl \
+                    and len(nodes) == self._nodes_count:
+                node = self._nodes_by_ip.get(key)
+                if node is None or node.ip_address == node_ip:
+                    return node
+            self._nodes_by_ip = {}
+            for node in nodes:
+                self._nodes_by_ip.setdefault(node.ip_address, node)
+                if (node_datacenter := getattr(node, "datacenter", None)) is not None:
+                    self._nodes_by_ip.setdefault((node_datacenter, node.ip_address), node)
+            self._nodes_by_ip_time = time.perf_counter()
+            self._nodes_count = len(nodes)
+            return self._nodes_by_ip.get(key)
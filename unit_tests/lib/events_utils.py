@@ -17,7 +17,7 @@ import tempfile
 import unittest.mock
 from contextlib import contextmanager
 
-from sdcm.sct_events.setup import EVENTS_DEVICE_START_DELAY, start_events_device, stop_events_device
+from sdcm.sct_events.setup import EVENTS_DEVICE_START_TIMEOUT, start_events_device, stop_events_device
 from sdcm.sct_events.events_device import start_events_main_device, get_events_main_device
 from sdcm.sct_events.file_logger import get_events_logger
 from sdcm.sct_events.events_processes import EventsProcessesRegistry
@@ -44,8 +44,9 @@ class EventsUtilsMixin:
             start_events_device(_registry=cls.events_processes_registry)
         elif events_main_device:
             start_events_main_device(_registry=cls.events_processes_registry)
-            time.sleep(EVENTS_DEVICE_START_DELAY)
         cls.events_main_device = get_events_main_device(_registry=cls.events_processes_registry)
+        if cls.events_main_device:
+            cls.events_main_device.wait_ready(timeout=EVENTS_DEVICE_START_TIMEOUT)
 
     @classmethod
     def teardown_events_processes(cls):
@@ -75,4 +76,6 @@ class EventsUtilsMixin:
 
     @classmethod
     def get_raw_events_log(cls):
-        return get_events_main_device(_registry=cls.events_processes_registry).raw_events_log
+        events_main_device = get_events_main_device(_registry=cls.events_processes_registry)
+        events_main_device.raw_events_journal.flush()
+        return events_main_device.raw_events_log
@@ -0,0 +1,95 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from invoke.runners import Result
+
+from sdcm.remote import LocalCmdRunner, RemoteCmdRunner
+from sdcm.remote.chunked_transfer import ChunkedFileTransfer, get_chunks
+
+
+class LocalChunkedFileTransfer(ChunkedFileTransfer):
+    """Run `remote' commands locally instead of over SSH."""
+
+    def _remote_command(self, cmd: str) -> str:
+        return cmd
+
+
+class TestChunkedFileTransfer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.src = os.path.join(self.temp_dir, "src")
+        self.dst = os.path.join(self.temp_dir, "dst")
+        with open(self.src, "wb") as src_file:
+            src_file.write(os.urandom(10500))
+        self.transfer = LocalChunkedFileTransfer(remoter=LocalCmdRunner(), ssh_command="", chunk_size=1000, workers=3)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def assertFilesEqual(self, first, second):  # pylint: disable=invalid-name
+        with open(first, "rb") as first_file, open(second, "rb") as second_file:
+            self.assertEqual(first_file.read(), second_file.read())
+
+    def test_get_chunks(self):
+        self.assertEqual(get_chunks(0, 10), [])
+        self.assertEqual(get_chunks(10, 10), [(0, 10)])
+        self.assertEqual(get_chunks(25, 10), [(0, 10), (10, 10), (20, 5)])
+
+    def test_receive(self):
+        stat = self.transfer.receive(self.src, self.dst)
+        self.assertEqual(stat.size, 10500)
+        self.assertFilesEqual(self.src, self.dst)
+
+    def test_send(self):
+        self.transfer.send(self.src, self.dst)
+        self.assertFilesEqual(self.src, self.dst)
+
+    def test_resume(self):
+        shutil.copyfile(self.src, self.dst)
+        with open(self.dst, "r+b") as dst_file:
+            dst_file.seek(2500)
+            dst_file.write(b"\0" * 1000)
+        self.transfer.receive(self.src, self.dst)
+        self.assertFilesEqual(self.src, self.dst)
+
+
+class TestReceiveFiles(unittest.TestCase):
+    def setUp(self):
+        self.remoter = RemoteCmdRunner(hostname="127.0.0.1")
+        self.remoter._use_rsync = True  # pylint: disable=protected-access
+
+    def tearDown(self):
+        self.remoter.stop_ssh_up_thread()
+        os.remove(self.remoter.known_hosts_file)
+
+    @patch("sdcm.remote.remote_base.LocalCmdRunner.run", return_value=Result(exited=0))
+    def test_no_remote_commands_by_default(self, local_run):
+        with patch.object(self.remoter, "run") as remote_run:
+            self.assertTrue(self.remoter.receive_files("/var/log/small.log", tempfile.gettempdir()))
+        remote_run.assert_not_called()
+        local_run.assert_called_once()
+        self.assertTrue(local_run.call_args.args[0].startswith("rsync "))
+
+    @patch("sdcm.remote.remote_base.LocalCmdRunner.run", return_value=Result(exited=0))
+    def test_chunked_small_file(self, local_run):
+        with patch.object(self.remoter, "run", return_value=Result(stdout="1024 644 0\n")) as remote_run:
+            self.assertTrue(self.remoter.receive_files("/var/log/small.log", tempfile.gettempdir(), chunked=True))
+        remote_run.assert_called_once()
+        self.assertIn("stat", remote_run.call_args.args[0])
+        local_run.assert_called_once()
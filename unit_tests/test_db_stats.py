@@ -0,0 +1,155 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from sdcm.db_stats import PrometheusDBStats, get_query_sub_ranges, merge_query_results
+
+PROMETHEUS_CONFIG = """
+scrape_configs:
+- job_name: scylla
+  scrape_interval: 20s
+"""
+
+
+class FakePrometheusHandler(BaseHTTPRequestHandler):
+    """Answer range queries with one series per instance, value of a point is its timestamp.
+
+    Instant queries are answered by `instant_values' using a name of the outer function of a query.
+    """
+
+    requests = []
+    instant_values = {}
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        url = urlparse(self.path)
+        params = {key: value[0] for key, value in parse_qs(url.query).items()}
+        self.requests.append((url.path, params))
+        if url.path == "/api/v1/status/config":
+            data = {"yaml": PROMETHEUS_CONFIG}
+        elif url.path == "/api/v1/query":
+            value = self.instant_values.get(params["query"].split("(", 1)[0])
+            data = {"resultType": "vector",
+                    "result": [] if value is None else [{"metric": {}, "value": [params["time"], str(value)]}]}
+        else:
+            start, end, step = float(params["start"]), float(params["end"]), float(params["step"])
+            timestamps = []
+            while start <= end:
+                timestamps.append(start)
+                start += step
+            data = {"resultType": "matrix",
+                    "result": [{"metric": {"instance": instance},
+                                "values": [[timestamp, str(timestamp)] for timestamp in timestamps]}
+                               for instance in ("10.0.0.1", "10.0.0.2")]}
+        body = json.dumps({"status": "success", "data": data}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class TestPrometheusQuerySubRanges(unittest.TestCase):
+    def test_short_range(self):
+        self.assertEqual(get_query_sub_ranges(100, 200, 20, max_points=10), [(100, 200)])
+
+    def test_split(self):
+        self.assertEqual(get_query_sub_ranges(0, 100, 10, max_points=5), [(0, 40), (50, 90), (100, 100)])
+        self.assertEqual(get_query_sub_ranges(0, 95, 10, max_points=5), [(0, 40), (50, 90)])
+
+    def test_not_numbers(self):
+        self.assertEqual(get_query_sub_ranges("2020-01-01T00:00:00Z", "2020-01-02T00:00:00Z", 10),
+                         [("2020-01-01T00:00:00Z", "2020-01-02T00:00:00Z")])
+
+    def test_merge_query_results(self):
+        results = [
+            [{"metric": {"instance": "a"}, "values": [[1, "1"]]}, {"metric": {"instance": "b"}, "values": [[1, "2"]]}],
+            [{"metric": {"instance": "b"}, "values": [[2, "3"]]}],
+            [{"metric": {"instance": "a"}, "values": [[3, "4"]]}, {"metric": {"instance": "c"}, "values": [[3, "5"]]}],
+        ]
+        self.assertEqual(merge_query_results(results), [
+            {"metric": {"instance": "a"}, "values": [[1, "1"], [3, "4"]]},
+            {"metric": {"instance": "b"}, "values": [[1, "2"], [2, "3"]]},
+            {"metric": {"instance": "c"}, "values": [[3, "5"]]},
+        ])
+
+
+class TestPrometheusDBStats(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakePrometheusHandler)
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FakePrometheusHandler.requests = []
+        FakePrometheusHandler.instant_values = {}
+        self.prometheus = PrometheusDBStats("127.0.0.1", port=self.server.server_address[1])
+
+    def test_configuration_is_loaded_lazily(self):
+        self.assertEqual(FakePrometheusHandler.requests, [])
+        self.assertEqual(self.prometheus.scylla_scrape_interval, 20)
+        self.assertEqual(self.prometheus.scylla_scrape_interval, 20)
+        self.assertEqual([path for path, _ in FakePrometheusHandler.requests], ["/api/v1/status/config"])
+
+    def test_long_range_is_split(self):
+        start, end = 1000, 1000 + 20 * 2500
+        result = self.prometheus.query("up", start, end)
+        query_requests = [params for path, params in FakePrometheusHandler.requests if path.endswith("query_range")]
+        self.assertEqual(len(query_requests), 3)
+        self.assertEqual([series["metric"]["instance"] for series in result], ["10.0.0.1", "10.0.0.2"])
+        for series in result:
+            self.assertEqual([timestamp for timestamp, _ in series["values"]],
+                             [float(timestamp) for timestamp in range(start, end + 1, 20)])
+
+    def test_query_all(self):
+        results = self.prometheus.query_all({"a": "up", "b": "down"}, 1000, 2000, scrap_metrics_step=10)
+        self.assertEqual(set(results), {"a", "b"})
+        self.assertEqual(len(results["a"][0]["values"]), 101)
+        self.assertEqual(sorted(params["query"] for _, params in FakePrometheusHandler.requests), ["down", "up"])
+
+    def test_get_stats_over_time(self):
+        FakePrometheusHandler.instant_values = {
+            "max_over_time": 2000, "count_over_time": 10, "min_over_time": 100, "avg_over_time": 1000,
+            "stddev_over_time": 50,
+        }
+        stats = self.prometheus.get_stats_over_time("up", 1000, 2000, scrap_metrics_step=10)
+        self.assertEqual(stats, {"max": 2000, "min": 100, "avg": 1000, "stdev": 50})
+        queries = {params["query"] for path, params in FakePrometheusHandler.requests if path == "/api/v1/query"}
+        self.assertEqual(queries, {
+            "max_over_time((up)[1001s:10s])",
+            "count_over_time(((up) >= 20.000000)[1001s:10s])",
+            "min_over_time(((up) >= 20.000000)[1001s:10s])",
+            "avg_over_time(((up) >= 20.000000)[1001s:10s])",
+            "stddev_over_time(((up) >= 20.000000)[1001s:10s])",
+        })
+
+    def test_get_stats_over_time_not_enough_data(self):
+        self.assertEqual(self.prometheus.get_stats_over_time("up", 1000, 2000, scrap_metrics_step=10), {})
+        FakePrometheusHandler.instant_values = {
+            "max_over_time": 2000, "count_over_time": 3, "min_over_time": 100, "avg_over_time": 1000,
+            "stddev_over_time": 50,
+        }
+        self.assertEqual(self.prometheus.get_stats_over_time("up", 1000, 2000, scrap_metrics_step=10), {})
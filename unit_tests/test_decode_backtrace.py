@@ -17,8 +17,9 @@ import queue
 import unittest
 
 from sdcm.cluster import Setup
+from sdcm.utils.backtrace import get_backtrace_addresses
 
-from unit_tests.dummy_remote import DummyRemote
+from unit_tests.dummy_remote import DummyRemote, DummyOutput
 from unit_tests.test_cluster import DummyNode
 from unit_tests.lib.events_utils import EventsUtilsMixin
 
@@ -32,6 +33,16 @@ class DecodeDummyNode(DummyNode):  # pylint: disable=abstract-method
         return "scylla_debug_info_file"
 
 
+class Addr2lineDummyRemote(DummyRemote):
+    def __init__(self):
+        self.commands = []
+
+    def run(self, *args, **kwargs):
+        self.commands.append(args[0])
+        addresses = args[0].split()[3:]
+        return DummyOutput("".join(f"{address}: decoded\n (inlined by) {address}: inlined\n" for address in addresses))
+
+
 class TestDecodeBactraces(unittest.TestCase, EventsUtilsMixin):
     @classmethod
     def setUpClass(cls):
@@ -139,3 +150,40 @@ class TestDecodeBactraces(unittest.TestCase, EventsUtilsMixin):
             if event.get('backtrace') and event.get('raw_backtrace'):
                 self.assertEqual(event['backtrace'].strip(),
                                  "addr2line -Cpife scylla_debug_info_file {}".format(' '.join(event['raw_backtrace'].split("\n"))))
+
+    def test_05_decode_backtraces_batch(self):
+        Setup.DECODING_QUEUE = queue.Queue()
+        Setup.BACKTRACE_DECODING = True
+
+        self.monitor_node.remoter = Addr2lineDummyRemote()
+        try:
+            self.node.system_log = os.path.join(os.path.dirname(__file__), 'test_data', 'system.log')
+            with self.get_raw_events_log().open() as events_file:
+                published_before = len(events_file.readlines())
+            self.node._read_system_log_and_publish_events(start_from_beginning=True)
+            backtraces_count = Setup.DECODING_QUEUE.qsize()
+
+            self.monitor_node.start_decode_on_monitor_node_thread()
+            self.monitor_node.termination_event.set()
+            self.monitor_node.stop_task_threads()
+            self.monitor_node.wait_till_tasks_threads_are_stopped()
+            commands = self.monitor_node.remoter.commands
+        finally:
+            self.monitor_node.remoter = DummyRemote()
+
+        self.assertGreater(backtraces_count, 1)
+        self.assertEqual(len(commands), 1)
+
+        events = []
+        with self.get_raw_events_log().open() as events_file:
+            for line in events_file.readlines()[published_before:]:
+                events.append(json.loads(line))
+
+        decoded = 0
+        for event in events:
+            if event.get('backtrace') and event.get('raw_backtrace'):
+                addresses = get_backtrace_addresses(event['raw_backtrace'])
+                self.assertEqual(event['backtrace'], "".join(f"{address}: decoded\n (inlined by) {address}: inlined\n"
+                                                             for address in addresses))
+                decoded += 1
+        self.assertGreater(decoded, backtraces_count)  # same backtraces are queued for decoding once
@@ -0,0 +1,67 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+import unittest
+
+from sdcm.remote.libssh2_client import FloodPreventingFacility
+from sdcm.remote.libssh2_client.adaptive_limiter import AdaptiveLimiter
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    def test_limit(self):
+        limiter = AdaptiveLimiter(2)
+        self.assertTrue(limiter.acquire(blocking=False))
+        self.assertTrue(limiter.acquire(blocking=False))
+        self.assertFalse(limiter.acquire(blocking=False))
+        limiter.release()
+        self.assertTrue(limiter.acquire(blocking=False))
+        limiter.release()
+        limiter.release()
+        self.assertRaises(ValueError, limiter.release)
+
+    def test_increase_and_decrease(self):
+        limiter = AdaptiveLimiter(2, max_limit=8)
+        for _ in range(6):
+            limiter.report_success(0.1)
+        self.assertEqual(limiter.limit, 8)
+        limiter.report_success(0.1)
+        self.assertEqual(limiter.limit, 8)
+        limiter.report_failure()
+        self.assertEqual(limiter.limit, 4)
+        limiter.report_failure()
+        self.assertEqual(limiter.limit, 4, "decreased twice in a row")
+        self.assertEqual(limiter.backoff, 0.2)
+        for _ in range(4):
+            limiter.report_success(0.1)
+        self.assertEqual(limiter.limit, 4, "increased faster than by one per limit of successes")
+        limiter.report_success(0.1)
+        self.assertEqual(limiter.limit, 5)
+        self.assertEqual(limiter.backoff, 0)
+
+    def test_slow_operation(self):
+        limiter = AdaptiveLimiter(4, max_limit=8, latency_factor=4)
+        limiter.report_success(0.0)
+        limiter.report_success(1.0)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_metrics(self):
+        facility = FloodPreventingFacility(hash_items="host", limit=2, max_limit=4)
+        host = type("Host", (), {"host": "10.0.0.1"})()
+        with facility.get_lock(host) as lock:
+            lock.report_success(0.5)
+        lock.report_failure()
+        metrics = facility.get_metrics()["10.0.0.1"]
+        self.assertEqual(metrics["attempts"], 2)
+        self.assertEqual(metrics["success_rate"], 0.5)
+        self.assertEqual(metrics["avg_latency"], 0.5)
+        self.assertEqual(metrics["in_flight"], 0)
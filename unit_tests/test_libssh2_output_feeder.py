@@ -0,0 +1,70 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+import unittest
+from io import StringIO
+
+from parameterized import parameterized
+
+from sdcm.remote.libssh2_client import OutputFeeder
+
+
+class LinesCollector:  # pylint: disable=too-few-public-methods
+    def __init__(self):
+        self.lines = []
+
+    def submit_line(self, line: str):
+        self.lines.append(line)
+
+
+class ChunksCollector:  # pylint: disable=too-few-public-methods
+    accepts_chunks = True
+
+    def __init__(self):
+        self.chunks = []
+
+    def submit_line(self, line: str):
+        raise AssertionError(f"Line {line!r} is submitted to a chunk watcher")
+
+    def submit_chunk(self, chunk: str):
+        self.chunks.append(chunk)
+
+
+class TestOutputFeeder(unittest.TestCase):
+    @parameterized.expand([
+        ("empty", "", [], ""),
+        ("line", "abc\n", ["abc\n"], "abc\n"),
+        ("no_line_end", "abc", ["abc\n"], "abc\n"),
+        ("empty_lines", "a\n\n\n", ["a\n", "\n", "\n"], "a\n\n\n"),
+        ("multibyte", "привет\nмир", ["привет\n", "мир\n"], "привет\nмир\n"),
+    ])
+    def test_feed(self, _, output, lines, stdout):
+        data = output.encode("utf-8")
+        for chunk_size in (1, 2, 3, 1024):
+            line_watcher = LinesCollector()
+            chunk_watcher = ChunksCollector()
+            stream = StringIO()
+            feeder = OutputFeeder(stream, [line_watcher, chunk_watcher], "utf-8")
+            for pos in range(0, len(data), chunk_size):
+                feeder.feed(data[pos:pos + chunk_size])
+            feeder.feed(b"", final=True)
+            self.assertEqual(line_watcher.lines, lines)
+            self.assertEqual("".join(chunk_watcher.chunks), stdout)
+            self.assertEqual(stream.getvalue(), stdout)
+
+    def test_no_watchers(self):
+        stream = StringIO()
+        feeder = OutputFeeder(stream, [], "utf-8")
+        feeder.feed("abc\nd".encode("utf-8"))
+        feeder.feed(b"", final=True)
+        self.assertEqual(stream.getvalue(), "abc\nd")
@@ -0,0 +1,62 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+import unittest
+from io import StringIO
+
+from parameterized import parameterized
+
+from sdcm.remote.libssh2_client.shell import PersistentShellOutput
+
+
+class LinesCollector:  # pylint: disable=too-few-public-methods
+    def __init__(self):
+        self.lines = []
+
+    def submit_line(self, line: str):
+        self.lines.append(line)
+
+
+class TestPersistentShellOutput(unittest.TestCase):
+    @parameterized.expand([
+        ("empty", b"", [], ""),
+        ("line", b"abc\n", ["abc\n"], "abc\n"),
+        ("no_line_end", b"abc", ["abc\n"], "abc\n"),
+        ("empty_lines", b"a\n\n\n", ["a\n", "\n", "\n"], "a\n\n\n"),
+        ("lines", b"1\n22\n333", ["1\n", "22\n", "333\n"], "1\n22\n333\n"),
+    ])
+    def test_feed(self, _, output, lines, stdout):
+        for chunk_size in (1, 2, 3, 1024):
+            data = output + b"\n__DELIMITER_1_ 42\n"
+            watcher = LinesCollector()
+            stream = StringIO()
+            shell_output = PersistentShellOutput(b"__DELIMITER_1_", stream, [watcher], "utf-8")
+            for pos in range(0, len(data), chunk_size):
+                shell_output.feed(data[pos:pos + chunk_size])
+            self.assertEqual(shell_output.end, len(output))
+            self.assertEqual(int(shell_output.tail), 42)
+            shell_output.complete()
+            self.assertEqual(watcher.lines, lines)
+            self.assertEqual(stream.getvalue(), stdout)
+
+    def test_no_watchers(self):
+        stream = StringIO()
+        shell_output = PersistentShellOutput(b"__DELIMITER_1_", stream, [], "utf-8")
+        shell_output.feed(b"abc\n\n__DELIM")
+        self.assertIsNone(shell_output.end)
+        shell_output.feed(b"ITER_1_ 1")
+        self.assertIsNone(shell_output.end)
+        shell_output.feed(b"\n")
+        self.assertEqual(int(shell_output.tail), 1)
+        shell_output.complete()
+        self.assertEqual(stream.getvalue(), "abc\n")
@@ -3,9 +3,11 @@ import time
 import logging
 import random
 import concurrent.futures
+from unittest.mock import patch
 
 
-from sdcm.utils.common import ParallelObject, ParallelObjectException
+from sdcm.utils.common import ParallelObject, ParallelObjectException, get_abandoned_tasks_count
+from sdcm.utils import common
 
 LOGGER = logging.getLogger(name=__name__)
 
@@ -139,3 +141,84 @@ class ParallelObjectTester(unittest.TestCase):
         returned_results = [r.result for r in results]
         expected_results = [r[0][1] for r in self.list_as_arg]
         self.assertListEqual(returned_results, expected_results)
+
+
+class ParallelObjectIterResultsTester(unittest.TestCase):
+    def test_results_yielded_in_order_of_completion(self):
+        parallel_object = ParallelObject([0.6, 0.2, 0.4], timeout=5)
+        start_time = time.perf_counter()
+        first = next(parallel_object.iter_results(dummy_func_return_single))
+        self.assertEqual(first.result, 0.2)
+        self.assertLess(time.perf_counter() - start_time, 0.5)
+        results = list(parallel_object.iter_results(dummy_func_return_single))
+        self.assertListEqual([r.result for r in results], [0.2, 0.4, 0.6])
+
+    def test_exception_returned_in_result(self):
+        results = list(ParallelObject([1], timeout=5).iter_results(dummy_func_raising_exception))
+        self.assertEqual(len(results), 1)
+        self.assertIsNone(results[0].result)
+        self.assertIsInstance(results[0].exc, DummyException)
+
+    def test_task_timeout(self):
+        parallel_object = ParallelObject([0.1, 3, 0.2], timeout=None)
+        start_time = time.perf_counter()
+        results = list(parallel_object.iter_results(dummy_func_return_single, task_timeout=0.5))
+        self.assertLess(time.perf_counter() - start_time, 1)
+        self.assertListEqual([r.obj for r in results], [0.1, 0.2, 3])
+        self.assertListEqual([r.result for r in results], [0.1, 0.2, None])
+        self.assertIsInstance(results[-1].exc, concurrent.futures.TimeoutError)
+
+    def test_global_timeout_with_not_submitted_objects(self):
+        parallel_object = ParallelObject([3, 3, 3, 0.1], timeout=0.5, num_workers=2)
+        start_time = time.perf_counter()
+        results = list(parallel_object.iter_results(dummy_func_return_single))
+        self.assertLess(time.perf_counter() - start_time, 1)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(isinstance(r.exc, concurrent.futures.TimeoutError) for r in results))
+
+    def test_num_workers_limits_concurrency(self):
+        parallel_object = ParallelObject([0.2] * 4, timeout=5, num_workers=2)
+        start_time = time.perf_counter()
+        results = list(parallel_object.iter_results(dummy_func_return_single))
+        self.assertGreaterEqual(time.perf_counter() - start_time, 0.4)
+        self.assertListEqual([r.result for r in results], [0.2] * 4)
+
+    def test_unpack_args_for_func(self):
+        parallel_object = ParallelObject([[0.1, "a"], {"timeout": 0.2, "msg": "b"}], timeout=5)
+        results = parallel_object.iter_results(dummy_func_with_several_parameters, unpack_objects=True)
+        self.assertListEqual([r.result for r in results], [(0.1, "a"), (0.2, "b")])
+
+    def test_close_cancels_not_started_tasks(self):
+        calls = []
+
+        def func(timeout):
+            calls.append(timeout)
+            time.sleep(timeout)
+
+        results = ParallelObject([0.1, 0.1, 0.1, 0.1], timeout=5, num_workers=1).iter_results(func)
+        next(results)
+        results.close()
+        time.sleep(0.3)
+        self.assertLessEqual(len(calls), 2)
+
+    def test_nested_run_doesnt_wait_for_shared_pool(self):
+        shared_thread_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=2, initializer=common._mark_shared_thread_pool_thread)  # pylint: disable=protected-access
+
+        def run_nested(timeout):
+            return [r.result for r in ParallelObject([timeout] * 2, timeout=2).iter_results(dummy_func_return_single)]
+
+        with patch.object(common, "_SHARED_THREAD_POOL", shared_thread_pool):
+            results = list(ParallelObject([0.1, 0.1], timeout=5).iter_results(run_nested))
+        shared_thread_pool.shutdown()
+        self.assertListEqual([r.result for r in results], [[0.1, 0.1], [0.1, 0.1]])
+
+    def test_timed_out_task_is_counted_while_running(self):
+        abandoned_tasks = get_abandoned_tasks_count()  # tasks of other tests may be still running
+        with self.assertLogs(common.LOGGER, level="WARNING"):
+            results = list(ParallelObject([0.6], timeout=None).iter_results(dummy_func_return_single,
+                                                                            task_timeout=0.2))
+        self.assertIsInstance(results[0].exc, concurrent.futures.TimeoutError)
+        self.assertEqual(get_abandoned_tasks_count(), abandoned_tasks + 1)
+        time.sleep(0.6)
+        self.assertLessEqual(get_abandoned_tasks_count(), abandoned_tasks)
@@ -12,8 +12,12 @@
 # Copyright (c) 2020 ScyllaDB
 
 import os
+import time
+import shutil
 import getpass
+import tempfile
 import unittest
+import unittest.mock
 import threading
 from typing import Union, Optional
 from logging import getLogger
@@ -23,7 +27,7 @@ from parameterized import parameterized
 from sdcm.remote import RemoteLibSSH2CmdRunner, RemoteCmdRunner, LocalCmdRunner, RetryableNetworkException, \
     SSHConnectTimeoutError, shell_script_cmd
 from sdcm.remote.kubernetes_cmd_runner import KubernetesCmdRunner
-from sdcm.remote.base import CommandRunner, Result
+from sdcm.remote.base import CommandRunner, Result, LogWriteWatcher, LOG_WRITE_WATCHER_FLUSH_SIZE
 from sdcm.remote.remote_file import remote_file
 from sdcm.cluster_k8s import KubernetesCluster
 
@@ -353,6 +357,26 @@ class TestRemoteCmdRunners(unittest.TestCase):
         else:
             self.assertEqual(paramiko_thread_results[0].stdout, paramiko_thread_results[1].stdout)
 
+    # @parameterized.expand([
+    #     (RemoteLibSSH2CmdRunner, "echo 1; echo 2 >&2; false"),
+    #     (RemoteCmdRunner, "echo 1; echo 2 >&2; false"),
+    #     (RemoteLibSSH2CmdRunner, "seq 1 100000"),
+    #     (RemoteCmdRunner, "seq 1 100000"),
+    # ])
+    @unittest.skip('To be ran manually')
+    def test_run_on_all(self, remoter_type, stmt: str):
+        expected = LocalCmdRunner().run(stmt, ignore_status=True)
+        remoters = [remoter_type(hostname='127.0.0.1', user=getpass.getuser(), key_file=self.key_file)
+                    for _ in range(50)]
+        for _ in range(2):  # second time connections are reused
+            results = list(remoter_type.run_on_all(remoters, stmt, timeout=10))
+            self.assertEqual({id(remoter) for remoter, _, _ in results}, {id(remoter) for remoter in remoters})
+            for _, result, exc in results:
+                self.assertIsNone(exc)
+                self._compare_results(expected, result, stmt=stmt, kwargs={}, fields_to_compare=('stdout', 'exited'))
+        for remoter in remoters:
+            remoter.stop()
+
 
 class TestSudoAndRunShellScript(unittest.TestCase):
     @classmethod
@@ -383,6 +407,66 @@ class TestSudoAndRunShellScript(unittest.TestCase):
         self.assertEqual(shell_script_cmd("true"), 'bash -cxe "true"')
 
 
+class TestLogWriteWatcher(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_file = os.path.join(self.temp_dir, "command.log")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read_log(self) -> str:
+        with open(self.log_file) as log_file:
+            return log_file.read()
+
+    def test_flush_on_close(self):
+        watcher = LogWriteWatcher(self.log_file)
+        watcher.submit_line("line 1\n")
+        watcher.submit_chunk("line 2\nline")
+        watcher.close()
+        self.assertEqual(self._read_log(), "line 1\nline 2\nline")
+        watcher.submit_line(" 3\n")
+        watcher.close()
+        self.assertEqual(self._read_log(), "line 1\nline 2\nline 3\n")
+
+    def test_flush_on_size(self):
+        watcher = LogWriteWatcher(self.log_file)
+        chunk = "x" * (LOG_WRITE_WATCHER_FLUSH_SIZE - 1) + "\n"
+        watcher.submit_chunk(chunk)
+        self.assertEqual(self._read_log(), chunk)
+        watcher.close()
+
+    @unittest.mock.patch("sdcm.remote.base.LOG_WRITE_WATCHER_FLUSH_INTERVAL", 0.1)
+    def test_flush_on_interval(self):
+        watcher = LogWriteWatcher(self.log_file)
+        watcher.submit_line("line 1\n")
+        self.assertEqual(self._read_log(), "")
+        # No more output is needed to flush the buffered one.
+        time.sleep(0.5)
+        self.assertEqual(self._read_log(), "line 1\n")
+        watcher.submit_line("line 2\n")
+        time.sleep(0.5)
+        self.assertEqual(self._read_log(), "line 1\nline 2\n")
+        watcher.close()
+
+    def test_threads(self):
+        watcher = LogWriteWatcher(self.log_file)
+        watcher.submit("abc\n")
+        thread = threading.Thread(target=watcher.submit, args=("def\n", ))
+        thread.start()
+        thread.join()
+        watcher.submit("abc\nghi\n")
+        watcher.close()
+        self.assertEqual(self._read_log(), "abc\ndef\nghi\n")
+
+    def test_submit_stream(self):
+        watcher = LogWriteWatcher(self.log_file)
+        watcher.submit("abc\n")
+        watcher.submit("abc\ndef\n")
+        watcher.close()
+        self.assertEqual(self._read_log(), "abc\ndef\n")
+
+
 class TestRemoteFile(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
@@ -0,0 +1,135 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+import unittest
+import unittest.mock
+
+from sdcm.sct_events import Severity
+from sdcm.sct_events.setup import stop_events_device
+from sdcm.sct_events.filters import DbEventsFilter, EventsSeverityChangerFilter
+from sdcm.sct_events.events_device import EventsDevice
+from sdcm.sct_events.system import InfoEvent
+from sdcm.sct_events.database import DatabaseLogEvent
+from sdcm.sct_events.coalescing import EventsCoalescer
+
+from unit_tests.lib.events_utils import EventsUtilsMixin
+
+
+def reactor_stall(node: str, stall: int, line_number: int):
+    line = f"2020-06-11T11:18:58+00:00  node1 !INFO | scylla: [shard {line_number % 4}] seastar - " \
+           f"Reactor stalled for {stall} ms on shard 1."
+    event = DatabaseLogEvent.REACTOR_STALLED().add_info(node=node, line=line, line_number=line_number)
+    event.dont_publish()
+    return event
+
+
+class TestEventsCoalescer(unittest.TestCase):
+    def setUp(self):
+        self.published = []
+        self.coalescer = EventsCoalescer(publish=self.published.append, window=0.5, threshold=2, samples=2)
+
+    def tearDown(self):
+        self.coalescer.close()
+
+    def test_storm(self):
+        events = [reactor_stall(node="node1", stall=3000 + i, line_number=i) for i in range(10)]
+        self.assertEqual([self.coalescer.accept(event) for event in events], [True, True] + [False] * 8)
+
+        self.coalescer.flush(force=True)
+        self.assertEqual(len(self.published), 1)
+        summary = self.published[0]
+        self.assertIs(summary, events[-1])
+        self.assertEqual(summary.severity, Severity.WARNING)
+        self.assertEqual(summary.coalesced["count"], 8)
+        self.assertEqual(summary.coalesced["samples"], [events[2].line, events[3].line])
+        self.assertIn("coalesced 8 similar events", str(summary))
+
+    def test_different_events(self):
+        self.assertTrue(all(self.coalescer.accept(reactor_stall(node=f"node{i}", stall=3000, line_number=1))
+                            for i in range(5)))
+        event = InfoEvent(message="not coalesced")
+        self.assertTrue(all(self.coalescer.accept(event) for _ in range(5)))
+        event.dont_publish()
+
+    def test_escalation(self):
+        events = [reactor_stall(node="node1", stall=100, line_number=i) for i in range(3)]
+        self.assertEqual([self.coalescer.accept(event) for event in events], [True, True, False])
+        self.assertEqual(events[0].severity, Severity.NORMAL)
+
+        # Escalation of the severity and critical events are never held.
+        escalated = reactor_stall(node="node1", stall=3000, line_number=3)
+        self.assertTrue(self.coalescer.accept(escalated))
+        self.assertFalse(self.coalescer.accept(reactor_stall(node="node1", stall=3000, line_number=4)))
+        critical = reactor_stall(node="node1", stall=100, line_number=5)
+        critical.severity = Severity.CRITICAL
+        self.assertTrue(self.coalescer.accept(critical))
+
+    def test_window(self):
+        self.coalescer.window = 60
+
+        def end_window():
+            for storm in self.coalescer._storms.values():
+                storm.window_start -= self.coalescer.window
+            self.coalescer.flush()
+
+        for event in [reactor_stall(node="node1", stall=3000, line_number=i) for i in range(4)]:
+            self.coalescer.accept(event)
+        end_window()
+        self.assertEqual(len(self.published), 1)
+        self.assertEqual(self.published[0].coalesced["count"], 2)
+
+        # The storm continues in the next window, so the next equivalent event is held.
+        self.assertFalse(self.coalescer.accept(reactor_stall(node="node1", stall=3000, line_number=5)))
+        end_window()
+        self.assertEqual(len(self.published), 2)
+
+        # The storm is over after a quiet window.
+        end_window()
+        self.assertTrue(self.coalescer.accept(reactor_stall(node="node1", stall=3000, line_number=6)))
+
+
+class TestEventsStormOnStop(unittest.TestCase, EventsUtilsMixin):
+    def setUp(self) -> None:
+        with unittest.mock.patch.object(EventsDevice, "events_storm_threshold", 2):
+            self.setup_events_processes(events_device=True, events_main_device=False, registry_patcher=True)
+        self.events_log = self.get_events_logger().events_log
+
+    def tearDown(self) -> None:
+        self.teardown_events_processes()
+
+    def publish_storm(self):
+        for line_number in range(10):
+            self.events_main_device.publish_event(reactor_stall(node="node1", stall=3000, line_number=line_number))
+
+    def test_summary_is_logged_on_stop(self):
+        # The storm is held by the coalescer until the end of its window, which is after the stop.
+        self.publish_storm()
+        stop_events_device(_registry=self.events_processes_registry)
+
+        self.assertIn("coalesced 8 similar events", self.events_log.read_text())
+
+    def test_filter_cancelled_before_summary(self):
+        with DbEventsFilter(db_event=DatabaseLogEvent.REACTOR_STALLED, node="node1"):
+            self.publish_storm()
+        stop_events_device(_registry=self.events_processes_registry)
+
+        self.assertNotIn("Reactor stalled", self.events_log.read_text())
+
+    def test_severity_changed_before_summary(self):
+        with EventsSeverityChangerFilter(new_severity=Severity.NORMAL, event_class=DatabaseLogEvent):
+            self.publish_storm()
+        stop_events_device(_registry=self.events_processes_registry)
+
+        events_log = self.events_log.read_text()
+        self.assertIn("coalesced 8 similar events", events_log)
+        self.assertNotIn("WARNING", events_log)
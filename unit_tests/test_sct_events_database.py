@@ -16,7 +16,8 @@ import unittest
 from sdcm.sct_events import Severity
 from sdcm.sct_events.base import LogEvent
 from sdcm.sct_events.database import \
-    DatabaseLogEvent, FullScanEvent, IndexSpecialColumnErrorEvent, TOLERABLE_REACTOR_STALL, SYSTEM_ERROR_EVENTS
+    DatabaseLogEvent, FullScanEvent, IndexSpecialColumnErrorEvent, TOLERABLE_REACTOR_STALL, SYSTEM_ERROR_EVENTS, \
+    SYSTEM_LOG_SCANNER, SystemLogScanner, get_required_literal
 
 
 class TestDatabaseLogEvent(unittest.TestCase):
@@ -83,3 +84,31 @@ class TestIndexSpecialColumnErrorEvent(unittest.TestCase):
     def test_msgfmt(self):
         event = IndexSpecialColumnErrorEvent(message="m1")
         self.assertEqual(str(event), "(IndexSpecialColumnErrorEvent Severity.ERROR): message=m1")
+
+
+class TestSystemLogScanner(unittest.TestCase):
+    def test_get_required_literal(self):
+        self.assertEqual(get_required_literal("std::bad_alloc"), "std::bad_alloc")
+        self.assertEqual(get_required_literal(r"\!INFO.*cql_server - exception:.*"), "cql_server - exception:")
+        self.assertEqual(get_required_literal(r"nested_exception \(seastar\)$"), "nested_exception (seastar)")
+        self.assertEqual(get_required_literal(r"abcd?\d+xy"), "abc")
+        self.assertIsNone(get_required_literal("a|b"))
+        self.assertIsNone(get_required_literal("[ab]"))
+
+    def test_find_lines(self):
+        scanner = SystemLogScanner(patterns=["std::bad_alloc", "a|bcd", ], literals=["0x", ])
+        data = b"line 1\nfailed with STD::BAD_ALLOC\nbcd\nline 4\n0x1234\n"
+        self.assertEqual([data[offset:data.index(b"\n", offset)] for offset in scanner.find_lines(data)],
+                         [b"failed with STD::BAD_ALLOC", b"bcd", b"0x1234"])
+
+    def test_system_log_scanner(self):
+        lines = [
+            b"2020-06-11T11:18:58+00:00  node1 !INFO    | scylla: [shard 1] compaction - Compacted 4 sstables\n",
+            b"2020-06-11T11:18:58+00:00  node1 !WARNING | scylla: [shard 1] seastar - Reactor stalled for 3 ms\n",
+            b"2020-06-11T11:18:58+00:00  node1 !INFO    | scylla: Backtrace:\n",
+            b"  0x00000000006c5af2\n",
+        ]
+        data = b"".join(lines)
+        self.assertEqual(SYSTEM_LOG_SCANNER.find_lines(data), [len(lines[0]),
+                                                               len(lines[0]) + len(lines[1]),
+                                                               len(lines[0]) + len(lines[1]) + len(lines[2]), ])
@@ -11,12 +11,11 @@
 #
 # Copyright (c) 2020 ScyllaDB
 
-import time
 import unittest
 import unittest.mock
 
 from sdcm.sct_events.system import InfoEvent, SpotTerminationEvent
-from sdcm.sct_events.setup import EVENTS_SUBSCRIBERS_START_DELAY
+from sdcm.sct_events.setup import EVENTS_SUBSCRIBERS_START_TIMEOUT
 from sdcm.sct_events.events_analyzer import EventsAnalyzer, start_events_analyzer
 from sdcm.sct_events.events_processes import EVENTS_ANALYZER_ID, get_events_process
 
@@ -36,7 +35,7 @@ class TestEventsAnalyzer(unittest.TestCase, EventsUtilsMixin):
         start_events_analyzer(_registry=self.events_processes_registry)
         events_analyzer = get_events_process(name=EVENTS_ANALYZER_ID, _registry=self.events_processes_registry)
 
-        time.sleep(EVENTS_SUBSCRIBERS_START_DELAY)
+        self.assertTrue(events_analyzer.wait_ready(timeout=EVENTS_SUBSCRIBERS_START_TIMEOUT))
 
         try:
             self.assertIsInstance(events_analyzer, EventsAnalyzer)
@@ -48,11 +47,13 @@ class TestEventsAnalyzer(unittest.TestCase, EventsUtilsMixin):
             event2 = SpotTerminationEvent(node="n1", message="m2")
 
             with unittest.mock.patch("sdcm.sct_events.events_analyzer.EventsAnalyzer.kill_test") as mock:
-                with self.wait_for_n_events(events_analyzer, count=2, timeout=1):
+                with self.wait_for_n_events(events_analyzer, count=1, timeout=1):
                     self.events_main_device.publish_event(event1)
                     self.events_main_device.publish_event(event2)
 
-            self.assertEqual(self.events_main_device.events_counter, events_analyzer.events_counter)
+            # The analyzer is subscribed to critical events only.
+            self.assertEqual(self.events_main_device.events_counter, 2)
+            self.assertEqual(events_analyzer.events_counter, 1)
 
             mock.assert_called_once()
         finally:
@@ -11,16 +11,24 @@
 #
 # Copyright (c) 2020 ScyllaDB
 
+import time
 import ctypes
 import shutil
+import os.path
 import tempfile
 import unittest
 import threading
 import multiprocessing
+from pathlib import Path
 
+from sdcm.sct_events import Severity
 from sdcm.sct_events.health import ClusterHealthValidatorEvent
-from sdcm.sct_events.events_device import EventsDevice, start_events_main_device, get_events_main_device
-from sdcm.sct_events.events_processes import EventsProcessesRegistry
+from sdcm.sct_events.filters import EventsSeverityChangerFilter
+from sdcm.sct_events.database import DatabaseLogEvent
+from sdcm.sct_events.events_device import \
+    RawEventsJournal, EventsDevice, start_events_main_device, get_events_main_device, \
+    get_event_topic, get_events_topics
+from sdcm.sct_events.events_processes import EventsProcessesRegistry, EventsSubscription
 
 
 class TestEventsDevice(unittest.TestCase):
@@ -76,6 +84,92 @@ class TestEventsDevice(unittest.TestCase):
         self.assertEqual(self.events_device.events_counter, counter.value)
         self.assertEqual(counter.value, 2)
 
+    def test_publish_subscribe_batches(self):
+        events = [ClusterHealthValidatorEvent.NodeStatus() for _ in range(10)]
+
+        # Put events to the publish queue.
+        for event in events:
+            self.events_device.publish_event(event)
+
+        stop_event = threading.Event()
+        counter = multiprocessing.Value(ctypes.c_uint32, 0)
+
+        threading.Timer(interval=1, function=stop_event.set).start()  # stop subscriber in 1 second.
+        self.events_device.start_delay = 0.5
+        self.events_device.pub_queue_batch_size = 3
+        self.events_device.start()
+
+        try:
+            events_generator = self.events_device.outbound_events(stop_event=stop_event, events_counter=counter)
+            self.assertEqual([event for _, event in events_generator], events)
+        finally:
+            self.events_device.stop(timeout=1)
+
+        self.assertEqual(self.events_device.events_counter, counter.value)
+        self.assertEqual(counter.value, 10)
+
+    def test_publish_subscribe_filtered(self):
+        events = [ClusterHealthValidatorEvent.NodeStatus(severity=Severity.ERROR) for _ in range(3)]
+        severity_changer = EventsSeverityChangerFilter(new_severity=Severity.WARNING,
+                                                       event_class=ClusterHealthValidatorEvent.NodeStatus)
+        db_event = DatabaseLogEvent.BAD_ALLOC().add_info(node="node1", line="std::bad_alloc", line_number=1)
+
+        self.events_device.publish_event(events[0])
+        self.events_device.publish_event(severity_changer)
+        self.events_device.publish_event(events[1])
+        self.events_device.publish_event(db_event)
+        severity_changer.clear_filter = True
+        self.events_device.publish_event(severity_changer)
+        self.events_device.publish_event(events[2])
+
+        stop_event = threading.Event()
+        counter = multiprocessing.Value(ctypes.c_uint32, 0)
+
+        threading.Timer(interval=1, function=stop_event.set).start()  # stop subscriber in 1 second.
+        self.events_device.start_delay = 0.5
+        self.events_device.start()
+
+        try:
+            events_generator = self.events_device.outbound_events(
+                stop_event=stop_event,
+                events_counter=counter,
+                subscription=EventsSubscription(severities=(Severity.ERROR, ), types=("ClusterHealthValidatorEvent", )),
+            )
+            self.assertEqual([event for _, event in events_generator], [events[0], events[2]])
+        finally:
+            self.events_device.stop(timeout=1)
+
+        self.assertEqual(self.events_device.events_counter, 6)
+        self.assertEqual(counter.value, 2)
+
+    def test_get_events_topics(self):
+        event = DatabaseLogEvent.BAD_ALLOC().add_info(node="node1", line="std::bad_alloc", line_number=1)
+        topic = get_event_topic(event)
+        self.assertRegex(topic, rb"^[0-9a-f]/ERROR/DatabaseLogEvent/$")
+        self.assertEqual(get_event_topic(event.clone()), topic)
+        event.dont_publish()
+
+        self.assertEqual(get_events_topics(), [b""])
+        self.assertEqual(get_events_topics(EventsSubscription()), [b""])
+
+        def subscribed(subscription):
+            return any(topic.startswith(prefix) for prefix in get_events_topics(subscription))
+
+        self.assertTrue(subscribed(EventsSubscription(severities=(Severity.ERROR, ))))
+        self.assertFalse(subscribed(EventsSubscription(severities=(Severity.CRITICAL, ))))
+        self.assertTrue(subscribed(EventsSubscription(types=("DatabaseLogEvent", ))))
+        self.assertFalse(subscribed(EventsSubscription(types=("DatabaseLog", ))))
+        self.assertEqual(sum(subscribed(EventsSubscription(shard=shard, shards=3)) for shard in range(3)), 1)
+        self.assertRaises(ValueError, get_events_topics, EventsSubscription(shards=100))
+
+    def test_publish_from_child_process(self):
+        event = ClusterHealthValidatorEvent.NodeStatus()
+        child = multiprocessing.Process(target=self.events_device.publish_event, args=(event, ))
+        child.start()
+        child.join(timeout=10)
+        self.assertEqual(child.exitcode, 0)
+        self.assertIn(event.to_json() + "\n", self.events_device.raw_events_log.read_text())
+
     def test_start_get_events_main_device(self):
         self.assertIsNone(get_events_main_device(_registry=self.events_processes_registry))
         start_events_main_device(_registry=self.events_processes_registry)
@@ -87,3 +181,50 @@ class TestEventsDevice(unittest.TestCase):
             self.assertTrue(events_device.subscribe_address)
         finally:
             events_device.stop(timeout=1)
+
+
+class TestRawEventsJournal(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = Path(self.temp_dir) / "raw_events.log"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_buffered_write(self):
+        journal = RawEventsJournal(path=self.path, lock=multiprocessing.RLock(), buffer_size=10, flush_interval=60)
+        journal.write(b"event1\n")
+        self.assertFalse(self.path.exists())
+        journal.write(b"event2\n")
+        self.assertEqual(self.path.read_bytes(), b"event1\nevent2\n")
+        journal.write(b"event3\n")
+        journal.close()
+        self.assertEqual(self.path.read_bytes(), b"event1\nevent2\nevent3\n")
+
+    def test_periodic_flush(self):
+        journal = RawEventsJournal(path=self.path, lock=multiprocessing.RLock(), flush_interval=0.1)
+        try:
+            journal.write(b"event1\n")
+            time.sleep(0.5)
+            self.assertEqual(self.path.read_bytes(), b"event1\n")
+        finally:
+            journal.close()
+
+    def test_close_on_child_process_exit(self):
+        journal = RawEventsJournal(path=self.path, lock=multiprocessing.RLock(), flush_interval=60)
+        child = multiprocessing.Process(target=journal.write, args=(b"event1\n", ))
+        child.start()
+        child.join(timeout=10)
+        self.assertEqual(child.exitcode, 0)
+        self.assertEqual(self.path.read_bytes(), b"event1\n")
+
+    def test_rotation(self):
+        journal = RawEventsJournal(path=self.path, lock=multiprocessing.RLock(),
+                                   buffer_size=1, flush_interval=60, max_size=14, backup_count=2)
+        for idx in range(7):
+            journal.write(f"event{idx}\n".encode())
+        journal.close()
+        self.assertEqual(self.path.read_bytes(), b"event6\n")
+        self.assertEqual(Path(f"{self.path}.1").read_bytes(), b"event4\nevent5\n")
+        self.assertEqual(Path(f"{self.path}.2").read_bytes(), b"event2\nevent3\n")
+        self.assertFalse(os.path.exists(f"{self.path}.3"))
@@ -16,7 +16,8 @@ import unittest.mock
 from pathlib import Path
 
 from sdcm.sct_events.events_processes import \
-    EventsProcessesRegistry, create_default_events_process_registry, get_default_events_process_registry
+    EventsProcessesRegistry, EventsProcessShards, create_default_events_process_registry, \
+    get_default_events_process_registry
 
 
 class FakeProcess:
@@ -28,6 +29,11 @@ class FakeProcess:
         self.started = True
 
 
+class FakeShardedProcess(FakeProcess):
+    shards = 3
+    shard = 0
+
+
 class TestEventsProcessesRegistry(unittest.TestCase):
     def setUp(self):
         self.registry = EventsProcessesRegistry("some_path")
@@ -43,6 +49,15 @@ class TestEventsProcessesRegistry(unittest.TestCase):
         self.assertEqual(self.registry._registry_dict["test"]._registry, self.registry)
         self.assertTrue(self.registry._registry_dict["test"].started)
 
+    def test_start_sharded_events_process(self):
+        self.registry.start_events_process("test", FakeShardedProcess)
+        process = self.registry.get_events_process("test")
+        self.assertIsInstance(process, EventsProcessShards)
+        self.assertEqual(process._registry, self.registry)
+        self.assertEqual([shard.shard for shard in process.processes], [0, 1, 2])
+        self.assertTrue(all(shard.started for shard in process.processes))
+        self.assertTrue(all(shard._registry == self.registry for shard in process.processes))
+
     def test_get_events_process(self):
         process = self.registry.get_events_process("test")
         self.assertIsNone(process)
@@ -11,12 +11,11 @@
 #
 # Copyright (c) 2020 ScyllaDB
 
-import time
 import unittest
 
 from sdcm.sct_events import Severity
 from sdcm.sct_events.system import SpotTerminationEvent
-from sdcm.sct_events.setup import EVENTS_SUBSCRIBERS_START_DELAY
+from sdcm.sct_events.setup import EVENTS_SUBSCRIBERS_START_TIMEOUT
 from sdcm.sct_events.file_logger import \
     EventsFileLogger, start_events_logger, get_events_logger, get_events_grouped_by_category, get_logger_event_summary
 
@@ -36,7 +35,7 @@ class TestFileLogger(unittest.TestCase, EventsUtilsMixin):
         start_events_logger(_registry=self.events_processes_registry)
         file_logger = get_events_logger(_registry=self.events_processes_registry)
 
-        time.sleep(EVENTS_SUBSCRIBERS_START_DELAY)
+        self.assertTrue(file_logger.wait_ready(timeout=EVENTS_SUBSCRIBERS_START_TIMEOUT))
 
         try:
             self.assertIsInstance(file_logger, EventsFileLogger)
@@ -78,5 +77,12 @@ class TestFileLogger(unittest.TestCase, EventsUtilsMixin):
             self.assertEqual(len(grouped[Severity.WARNING.name]), 2)
             self.assertEqual(len(grouped[Severity.ERROR.name]), 3)
             self.assertEqual(len(grouped[Severity.CRITICAL.name]), 4)
+
+            grouped = get_events_grouped_by_category(limit=2, _registry=self.events_processes_registry)
+            self.assertEqual(len(grouped[Severity.NORMAL.name]), 1)
+            self.assertEqual(len(grouped[Severity.WARNING.name]), 2)
+            self.assertEqual(len(grouped[Severity.ERROR.name]), 2)
+            self.assertEqual(len(grouped[Severity.CRITICAL.name]), 2)
+            self.assertTrue(grouped[Severity.CRITICAL.name][-1].endswith(str(event_critical).strip()))
         finally:
             file_logger.stop(timeout=1)
@@ -12,11 +12,12 @@
 # Copyright (c) 2020 ScyllaDB
 
 import re
+import time
 import pickle
 import unittest
 
 from sdcm.sct_events import Severity
-from sdcm.sct_events.filters import DbEventsFilter, EventsFilter, EventsSeverityChangerFilter
+from sdcm.sct_events.filters import DbEventsFilter, EventsFilter, EventsSeverityChangerFilter, EventsFiltersIndex
 from sdcm.sct_events.database import DatabaseLogEvent
 
 
@@ -124,3 +125,77 @@ class TestEventsSeverityChangerFilter(unittest.TestCase):
         self.assertEqual(event.severity, Severity.ERROR)
         filter.eval_filter(event)
         self.assertEqual(event.severity, Severity.NORMAL)
+
+
+class TestEventsFiltersIndex(unittest.TestCase):
+    def test_eval_filters_db_events_filter(self):
+        filters = EventsFiltersIndex()
+        filters.add(DbEventsFilter(db_event=DatabaseLogEvent.BAD_ALLOC, node="node1"))
+        filters.add(DbEventsFilter(db_event=DatabaseLogEvent.NO_SPACE_ERROR, line="abc"))
+        event1 = DatabaseLogEvent.BAD_ALLOC().add_info(node="node1", line="xyz", line_number=1)
+        event2 = event1.clone().add_info(node="node2", line="xyz", line_number=1)
+        event3 = DatabaseLogEvent.NO_SPACE_ERROR().add_info(node="node2", line="abc", line_number=1)
+        event4 = event3.clone().add_info(node="node2", line="xyz", line_number=1)
+        self.assertTrue(filters.eval_filters(event1))
+        self.assertFalse(filters.eval_filters(event2))
+        self.assertTrue(filters.eval_filters(event3))
+        self.assertFalse(filters.eval_filters(event4))
+
+    def test_eval_filters_events_filter(self):
+        filters = EventsFiltersIndex()
+        filters.add(EventsFilter(event_class=DatabaseLogEvent.BAD_ALLOC, regex=".*xyz.*"))
+        filters.add(EventsFilter(event_class=DatabaseLogEvent.BAD_ALLOC, regex=".*(a)bc.*"))
+        filters.add(EventsFilter(event_class=DatabaseLogEvent.NO_SPACE_ERROR))
+        event1 = DatabaseLogEvent.BAD_ALLOC().add_info(node="node1", line="xyz", line_number=1)
+        event2 = event1.clone().add_info(node="node1", line="abc", line_number=1)
+        event3 = event1.clone().add_info(node="node1", line="klm", line_number=1)
+        event4 = DatabaseLogEvent.NO_SPACE_ERROR().add_info(node="node1", line="klm", line_number=1)
+        event5 = DatabaseLogEvent.DATABASE_ERROR().add_info(node="node1", line="xyz", line_number=1)
+        self.assertTrue(filters.eval_filters(event1))
+        self.assertTrue(filters.eval_filters(event2))
+        self.assertFalse(filters.eval_filters(event3))
+        self.assertTrue(filters.eval_filters(event4))
+        self.assertFalse(filters.eval_filters(event5))
+
+    def test_eval_filters_severity_changer(self):
+        filters = EventsFiltersIndex()
+        filters.add(EventsSeverityChangerFilter(new_severity=Severity.NORMAL, event_class=DatabaseLogEvent))
+        filters.add(EventsFilter(regex=".*Severity.NORMAL.*"))
+        event = DatabaseLogEvent.BAD_ALLOC()
+        self.assertTrue(filters.eval_filters(event))
+        self.assertEqual(event.severity, Severity.NORMAL)
+
+    def test_update(self):
+        filters = EventsFiltersIndex()
+        filter = DbEventsFilter(db_event=DatabaseLogEvent.BAD_ALLOC)
+        filters.update(filter)
+        self.assertIn(filter.uuid, filters)
+        filter.clear_filter = True
+        filters.update(filter)
+        self.assertNotIn(filter.uuid, filters)
+        self.assertEqual(len(filters), 0)
+
+    def test_expire(self):
+        filters = EventsFiltersIndex()
+        events_filter = EventsFilter(regex=".*xyz.*")
+        db_filter = DbEventsFilter(db_event=DatabaseLogEvent.BAD_ALLOC, node="node1")
+        filters.add(events_filter)
+        filters.add(db_filter)
+
+        expire_time = time.time()
+        for filter in (events_filter, db_filter, ):
+            filter.clear_filter = True
+            filter.expire_time = expire_time
+            filters.update(filter)
+        self.assertEqual(len(filters), 2)
+
+        event = DatabaseLogEvent.BAD_ALLOC().add_info(node="node2", line="xyz", line_number=1)
+        event.timestamp = expire_time + 1
+        filters.expire(event)
+        self.assertNotIn(events_filter.uuid, filters)
+        self.assertIn(db_filter.uuid, filters)
+
+        event = event.clone().add_info(node="node1", line="xyz", line_number=1)
+        event.timestamp = expire_time + 1
+        filters.expire(event)
+        self.assertNotIn(db_filter.uuid, filters)
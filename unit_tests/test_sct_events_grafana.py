@@ -11,13 +11,15 @@
 #
 # Copyright (c) 2020 ScyllaDB
 
+import sys
 import time
+import threading
 import unittest
 import unittest.mock
 
 from sdcm.sct_events import Severity
 from sdcm.sct_events.health import ClusterHealthValidatorEvent
-from sdcm.sct_events.setup import EVENTS_SUBSCRIBERS_START_DELAY
+from sdcm.sct_events.setup import EVENTS_SUBSCRIBERS_START_TIMEOUT, stop_events_device
 from sdcm.sct_events.grafana import \
     GrafanaAnnotator, GrafanaEventAggregator, GrafanaEventPostman, \
     start_grafana_pipeline, get_grafana_postman, set_grafana_url
@@ -42,7 +44,7 @@ class TestFileLogger(unittest.TestCase, EventsUtilsMixin):
         grafana_aggregator = get_events_process(EVENTS_GRAFANA_AGGREGATOR_ID, _registry=self.events_processes_registry)
         grafana_postman = get_grafana_postman(_registry=self.events_processes_registry)
 
-        time.sleep(EVENTS_SUBSCRIBERS_START_DELAY)
+        self.assertTrue(grafana_annotator.wait_ready(timeout=EVENTS_SUBSCRIBERS_START_TIMEOUT))
 
         try:
             self.assertIsInstance(grafana_annotator, GrafanaAnnotator)
@@ -61,10 +63,26 @@ class TestFileLogger(unittest.TestCase, EventsUtilsMixin):
             self.assertEqual(grafana_postman._registry, self.events_processes_registry)
 
             grafana_aggregator.time_window = 1
+            grafana_postman.senders = 1
 
             set_grafana_url("http://localhost", _registry=self.events_processes_registry)
 
-            with unittest.mock.patch("requests.post") as mock:
+            # Make coalescing deterministic: all annotations fall to one coalescing time window and the only
+            # sender is blocked by the first post (of the first run annotations at most) until the rest of the
+            # annotations are queued, so they are coalesced into the second post.
+            grafana_postman.coalesce_time_window = sys.maxsize
+            first_post_sent = threading.Event()
+            release_first_post = threading.Event()
+            first_post_count = []
+
+            def post(*_, json, **__):
+                if not first_post_sent.is_set():
+                    first_post_count.append(int(json["text"].split(" ", 1)[0]) if json.get("timeEnd") else 1)
+                    first_post_sent.set()
+                    release_first_post.wait(timeout=10)
+                return unittest.mock.MagicMock()
+
+            with unittest.mock.patch("requests.Session.post", side_effect=post) as mock:
                 for runs in range(1, 4):
                     with self.wait_for_n_events(grafana_annotator, count=10, timeout=1):
                         for _ in range(10):
@@ -72,11 +90,24 @@ class TestFileLogger(unittest.TestCase, EventsUtilsMixin):
                                 ClusterHealthValidatorEvent.NodeStatus(severity=Severity.NORMAL))
                     time.sleep(1)
 
-                self.assertEqual(mock.call_count, runs * 5)
+                self.assertTrue(first_post_sent.wait(timeout=10))
+                end_time = time.perf_counter() + 10
+                while grafana_postman.stats["queue_size"] < runs * 5 - first_post_count[0] \
+                        and time.perf_counter() < end_time:
+                    time.sleep(0.1)
+                release_first_post.set()
+                grafana_postman.stop(timeout=10)
+                self.assertFalse(grafana_postman.is_alive())
+
+                self.assertEqual(grafana_postman.stats["posted"], runs * 5)
+                self.assertEqual(grafana_postman.stats["coalesced"], runs * 5 - 2)
+                self.assertEqual(grafana_postman.stats["requests"], 2)
+                self.assertEqual(mock.call_count, 2)
                 self.assertEqual(
                     mock.call_args.kwargs["json"]["tags"],
                     ["ClusterHealthValidatorEvent", "NORMAL", "events", "NodeStatus"],
                 )
+                self.assertTrue(mock.call_args.kwargs["json"]["isRegion"])
 
             self.assertEqual(self.events_main_device.events_counter, grafana_annotator.events_counter)
             self.assertEqual(grafana_annotator.events_counter, grafana_aggregator.events_counter)
@@ -85,3 +116,58 @@ class TestFileLogger(unittest.TestCase, EventsUtilsMixin):
             grafana_annotator.stop(timeout=1)
             grafana_aggregator.stop(timeout=1)
             grafana_postman.stop(timeout=1)
+
+
+class TestGrafanaPipelineStop(unittest.TestCase, EventsUtilsMixin):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.setup_events_processes(events_device=False, events_main_device=True, registry_patcher=False)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.teardown_events_processes()
+
+    def test_stop_drains_pipeline_stages_in_order(self):
+        start_grafana_pipeline(_registry=self.events_processes_registry)
+        grafana_annotator = get_events_process(EVENTS_GRAFANA_ANNOTATOR_ID, _registry=self.events_processes_registry)
+        grafana_aggregator = get_events_process(EVENTS_GRAFANA_AGGREGATOR_ID, _registry=self.events_processes_registry)
+        grafana_postman = get_grafana_postman(_registry=self.events_processes_registry)
+
+        self.assertTrue(grafana_annotator.wait_ready(timeout=EVENTS_SUBSCRIBERS_START_TIMEOUT))
+
+        # The aggregator reads annotations slowly, so most of them are still queued by the annotator on stop.
+        grafana_annotator.outbound_queue_events_rate = 0.5
+        grafana_aggregator.max_duplicates = sys.maxsize
+        set_grafana_url("http://localhost", _registry=self.events_processes_registry)
+
+        with unittest.mock.patch("requests.Session.post") as mock:
+            with self.wait_for_n_events(grafana_annotator, count=10, timeout=5, last_event_processing_delay=0):
+                for _ in range(10):
+                    self.events_main_device.publish_event(
+                        ClusterHealthValidatorEvent.NodeStatus(severity=Severity.NORMAL))
+            stop_events_device(_registry=self.events_processes_registry)
+
+            self.assertFalse(grafana_annotator.is_alive())
+            self.assertFalse(grafana_aggregator.is_alive())
+            self.assertFalse(grafana_postman.is_alive())
+            self.assertEqual(grafana_aggregator.events_counter, 10)
+            self.assertEqual(grafana_postman.events_counter, 10)
+            self.assertEqual(grafana_postman.stats["posted"], 10)
+            self.assertGreaterEqual(mock.call_count, 1)
+
+
+class TestGrafanaEventPostman(unittest.TestCase):
+    def test_coalesce(self):
+        annotations = [
+            {"time": 1000, "tags": ["A", "NORMAL"], "isRegion": False, "text": "a1"},
+            {"time": 1500, "tags": ["A", "NORMAL"], "isRegion": False, "text": "a2"},
+            {"time": 1600, "tags": ["B", "ERROR"], "isRegion": False, "text": "b1"},
+            {"time": 2100, "tags": ["A", "NORMAL"], "isRegion": False, "text": "a3"},
+        ]
+        coalesced = GrafanaEventPostman.coalesce(annotations, time_window=1000)
+        self.assertEqual(coalesced, [
+            ({"time": 1000, "timeEnd": 1500, "tags": ["A", "NORMAL"], "isRegion": True,
+              "text": "2 events:\na1\na2"}, 2),
+            (annotations[2], 1),
+            (annotations[3], 1),
+        ])
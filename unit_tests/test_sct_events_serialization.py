@@ -0,0 +1,69 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+import unittest
+
+from sdcm.sct_events import Severity
+from sdcm.sct_events.system import TestResultEvent
+from sdcm.sct_events.filters import DbEventsFilter, EventsSeverityChangerFilter
+from sdcm.sct_events.database import DatabaseLogEvent
+from sdcm.sct_events.serialization import \
+    HEADER, WIRE_FORMAT_JSON, WIRE_FORMAT_PICKLE, encode_event, decode_event
+
+
+class TestEventsSerialization(unittest.TestCase):
+    def test_database_log_event(self):
+        event = DatabaseLogEvent.BAD_ALLOC().add_info(node="node1", line="std::bad_alloc", line_number=42)
+        data = encode_event(event)
+
+        version, severity, name_length = HEADER.unpack_from(data)
+        self.assertEqual(version, WIRE_FORMAT_JSON)
+        self.assertEqual(severity, Severity.ERROR.value)
+        self.assertEqual(data[HEADER.size:HEADER.size + name_length],
+                         b"sdcm.sct_events.database:DatabaseLogEvent.BAD_ALLOC")
+
+        decoded = decode_event(data)
+        self.assertIs(type(decoded), type(event))
+        self.assertEqual(decoded, event)
+        self.assertEqual(decoded.timestamp, event.timestamp)
+        self.assertEqual(str(decoded), str(event))
+
+    def test_filters(self):
+        db_filter = DbEventsFilter(db_event=DatabaseLogEvent.BAD_ALLOC, line="y")
+        self.assertEqual(decode_event(encode_event(db_filter)), db_filter)
+        db_filter.dont_publish()
+
+        severity_changer = EventsSeverityChangerFilter(new_severity=Severity.WARNING,
+                                                       event_class=DatabaseLogEvent.BAD_ALLOC,
+                                                       regex=r".*xyz.*")
+        decoded = decode_event(encode_event(severity_changer))
+        self.assertEqual(decoded, severity_changer)
+        self.assertIs(decoded.new_severity, Severity.WARNING)
+        severity_changer.dont_publish()
+        event = DatabaseLogEvent.BAD_ALLOC().add_info(node="node1", line="xyz", line_number=1)
+        self.assertFalse(decoded.eval_filter(event))
+        self.assertEqual(event.severity, Severity.WARNING)
+        event.dont_publish()
+
+    def test_pickle_fallback(self):
+        event = TestResultEvent(test_status="FAILED", events={"ERROR": ["error1", "error2"]})
+        data = encode_event(event)
+
+        version, severity, name_length = HEADER.unpack_from(data)
+        self.assertEqual(version, WIRE_FORMAT_PICKLE)
+        self.assertEqual(severity, Severity.ERROR.value)
+        self.assertEqual(data[HEADER.size:HEADER.size + name_length], b"sdcm.sct_events.system:TestResultEvent")
+
+        decoded = decode_event(data)
+        self.assertEqual(decoded, event)
+        self.assertEqual(decoded.events, event.events)
@@ -0,0 +1,87 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2020 ScyllaDB
+
+import time
+import unittest
+
+from sdcm.utils.topology_cache import TopologyCache
+
+
+class Node:  # pylint: disable=too-few-public-methods
+    def __init__(self, ip_address, datacenter="datacenter1"):
+        self.ip_address = ip_address
+        self.datacenter = datacenter
+        self.ip_address_reads = 0
+
+    def __getattribute__(self, item):
+        if item == "ip_address":
+            object.__setattr__(self, "ip_address_reads", object.__getattribute__(self, "ip_address_reads") + 1)
+        return object.__getattribute__(self, item)
+
+
+class TestTopologyCache(unittest.TestCase):
+    def setUp(self):
+        self.nodes = [Node("127.0.0.1"), Node("127.0.0.2"), Node("127.0.0.3", datacenter="datacenter2")]
+        self.cache = TopologyCache()
+
+    def test_get_node_by_ip(self):
+        self.assertIs(self.cache.get_node_by_ip(self.nodes, "127.0.0.2"), self.nodes[1])
+        self.assertIs(self.cache.get_node_by_ip(self.nodes, "127.0.0.3", "datacenter2"), self.nodes[2])
+        self.assertIsNone(self.cache.get_node_by_ip(self.nodes, "127.0.0.3", "datacenter1"))
+        self.assertIsNone(self.cache.get_node_by_ip(self.nodes, "127.0.0.4"))
+
+    def test_get_node_by_ip_uses_index(self):
+        self.cache.get_node_by_ip(self.nodes, "127.0.0.1")
+        reads = self.nodes[2].ip_address_reads
+        for _ in range(10):
+            self.assertIs(self.cache.get_node_by_ip(self.nodes, "127.0.0.1"), self.nodes[0])
+        self.assertEqual(self.nodes[2].ip_address_reads, reads)
+
+    def test_get_node_by_ip_miss_uses_index(self):
+        self.cache.get_node_by_ip(self.nodes, "127.0.0.1")
+        reads = self.nodes[2].ip_address_reads
+        for _ in range(10):
+            self.assertIsNone(self.cache.get_node_by_ip(self.nodes, "127.0.0.4"))
+        self.assertEqual(self.nodes[2].ip_address_reads, reads)
+
+    def test_get_node_by_ip_new_node(self):
+        self.cache.get_node_by_ip(self.nodes, "127.0.0.1")
+        self.nodes.append(Node("127.0.0.4"))
+        self.assertIs(self.cache.get_node_by_ip(self.nodes, "127.0.0.4"), self.nodes[-1])
+
+    def test_get_node_by_ip_changed_ip(self):
+        self.cache.get_node_by_ip(self.nodes, "127.0.0.1")
+        self.nodes[0].ip_address = "127.0.0.5"
+        self.assertIsNone(self.cache.get_node_by_ip(self.nodes, "127.0.0.1"))
+        self.cache.invalidate()  # BaseNode.refresh_ip_address() does it.
+        self.assertIs(self.cache.get_node_by_ip(self.nodes, "127.0.0.5"), self.nodes[0])
+
+    def test_get_node_by_ip_removed_node(self):
+        self.cache.get_node_by_ip(self.nodes, "127.0.0.1")
+        self.nodes.pop(0)
+        self.assertIsNone(self.cache.get_node_by_ip(self.nodes, "127.0.0.1"))
+
+    def test_invalidate(self):
+        self.cache.get_node_by_ip(self.nodes, "127.0.0.1")
+        replaced_node, self.nodes[0] = self.nodes[0], Node("127.0.0.1")
+        self.assertIs(self.cache.get_node_by_ip(self.nodes, "127.0.0.1"), replaced_node)
+        self.cache.invalidate()
+        self.assertIs(self.cache.get_node_by_ip(self.nodes, "127.0.0.1"), self.nodes[0])
+
+    def test_ttl(self):
+        cache = TopologyCache(ttl=0.1)
+        cache.get_node_by_ip(self.nodes, "127.0.0.1")
+        replaced_node, self.nodes[0] = self.nodes[0], Node("127.0.0.1")
+        self.assertIs(cache.get_node_by_ip(self.nodes, "127.0.0.1"), replaced_node)
+        time.sleep(0.2)
+        self.assertIs(cache.get_node_by_ip(self.nodes, "127.0.0.1"), self.nodes[0])
@@ -12,15 +12,18 @@
 # Copyright (c) 2020 ScyllaDB
 
 import os
+import queue
 import hashlib
 import shutil
 import logging
 import unittest
 import unittest.mock
+import tempfile
 from pathlib import Path
 
 from sdcm.utils.common import tag_ami
 from sdcm.utils.common import download_dir_from_cloud
+from sdcm.utils.common import FileFollowerThread
 
 logging.basicConfig(level=logging.DEBUG)
 
@@ -70,3 +73,54 @@ class TestDownloadDir(unittest.TestCase):
         sct_update_db_packages = None
         update_db_packages = download_dir_from_cloud(sct_update_db_packages)
         assert update_db_packages is None
+
+
+class LinesCollector(FileFollowerThread):
+    def __init__(self, filename):
+        super().__init__()
+        self.filename = filename
+        self.lines = queue.Queue()
+
+    def run(self):
+        for line in self.follow_file(self.filename):
+            self.lines.put(line)
+
+    def get_lines(self, count):
+        return [self.lines.get(timeout=5) for _ in range(count)]
+
+
+class TestFileFollower(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp_dir, "stress.log")
+        Path(self.filename).write_text("line1\nline2\nincomplete")
+        self.follower = LinesCollector(self.filename)
+        self.follower.start()
+
+    def tearDown(self):
+        self.follower.stop()
+        self.follower.future.result(timeout=5)
+        shutil.rmtree(self.temp_dir)
+
+    def test_follow(self):
+        self.assertEqual(self.follower.get_lines(2), ["line1\n", "line2\n"])
+        with open(self.filename, "a") as log_file:
+            log_file.write(" line3\n")
+            log_file.flush()
+            self.assertEqual(self.follower.get_lines(1), ["incomplete line3\n"])
+            log_file.write("line4\nline5\n")
+        self.assertEqual(self.follower.get_lines(2), ["line4\n", "line5\n"])
+        self.follower.stop()
+        self.assertEqual(self.follower.get_lines(1), [""])
+
+    def test_truncate(self):
+        self.assertEqual(self.follower.get_lines(2), ["line1\n", "line2\n"])
+        with open(self.filename, "w") as log_file:
+            log_file.write("new\n")
+        self.assertEqual(self.follower.get_lines(1), ["new\n"])
+
+    def test_rotate(self):
+        self.assertEqual(self.follower.get_lines(2), ["line1\n", "line2\n"])
+        os.rename(self.filename, self.filename + ".1")
+        Path(self.filename).write_text("rotated\n")
+        self.assertEqual(self.follower.get_lines(2), ["incomplete", "rotated\n"])
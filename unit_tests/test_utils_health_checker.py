@@ -14,10 +14,13 @@
 
 import unittest
 from copy import deepcopy
+from collections import namedtuple
 
 from sdcm.sct_events import Severity
 from sdcm.utils.health_checker import check_nodes_status, check_nulls_in_peers, \
-    check_node_status_in_gossip_and_nodetool_status, check_schema_version
+    check_node_status_in_gossip_and_nodetool_status, check_schema_version, check_cluster_membership, \
+    get_cluster_members, parse_gossip_endpoints, peers_rows_to_details, check_schema_agreement_in_gossip_and_peers, \
+    NodeHealthInfo, PEERS_INFO_COLUMNS
 
 
 NODES_STATUS = {
@@ -134,3 +137,82 @@ class TestHealthChecker(unittest.TestCase):
     def test_check_schema_version_all_ok(self):
         event = next(check_schema_version(GOSSIP_INFO, PEERS_INFO, NODES_STATUS, Node), None)
         self.assertIsNone(event)
+
+    def test_check_cluster_membership_all_ok(self):
+        event = next(check_cluster_membership(NODES_STATUS, ["127.0.0.1", "127.0.0.3"], Node), None)
+        self.assertIsNone(event)
+
+    def test_check_cluster_membership_missed_node(self):
+        event = next(check_cluster_membership(NODES_STATUS, ["127.0.0.1", "127.0.0.4"], Node), None)
+        self.assertEqual(event.type, "NodeStatus")
+        self.assertEqual(event.severity, Severity.ERROR)
+        self.assertIn("127.0.0.4", event.error)
+
+    def test_get_cluster_members(self):
+        nodes_status = deepcopy(NODES_STATUS)
+        nodes_status["127.0.0.2"]["status"] = "UN"
+        health_info = [NodeHealthInfo(nodes_status=NODES_STATUS, peers_details={}, gossip_info={}),
+                       NodeHealthInfo(nodes_status=nodes_status, peers_details={}, gossip_info={}),
+                       NodeHealthInfo(nodes_status={}, peers_details={}, gossip_info={}), ]
+        self.assertEqual(get_cluster_members(health_info), {"127.0.0.1", "127.0.0.2", "127.0.0.3"})
+
+    def test_parse_gossip_endpoints(self):
+        endpoints = [
+            {
+                "addrs": "127.0.0.1",
+                "is_alive": True,
+                "application_state": [
+                    {"application_state": 0, "value": "NORMAL,-9166289216429738540", "version": 10},
+                    {"application_state": 2, "value": "cbe15453-33f3-3387-aaf1-4120548f41e8", "version": 11},
+                    {"application_state": 3, "value": "datacenter1", "version": 3},
+                    {"application_state": 8, "value": "127.0.0.1", "version": 4},
+                ],
+            },
+            {
+                "addrs": "127.0.0.2",
+                "is_alive": False,
+                "application_state": [
+                    {"application_state": 0, "value": "shutdown,true", "version": 10},
+                    {"application_state": 2, "value": "cbe15453-33f3-3387-aaf1-4120548f41e8", "version": 11},
+                    {"application_state": 3, "value": "datacenter1", "version": 3},
+                ],
+            },
+            {
+                "addrs": "127.0.0.3",
+                "is_alive": True,
+                "application_state": [
+                    {"application_state": 3, "value": "datacenter1", "version": 3},
+                ],
+            },
+        ]
+        self.assertEqual(parse_gossip_endpoints(endpoints), {
+            "127.0.0.1": GOSSIP_INFO["127.0.0.1"],
+            "127.0.0.2": GOSSIP_INFO["127.0.0.2"],
+        })
+
+    def test_peers_rows_to_details(self):
+        row_type = namedtuple("Row", ("peer", ) + PEERS_INFO_COLUMNS)
+        rows = [row_type(peer=ip, supported_features="", **info) for ip, info in PEERS_INFO.items()]
+        rows.append(row_type("127.0.0.4", *([None] * len(PEERS_INFO_COLUMNS))))
+        peers_details = peers_rows_to_details(rows)
+        self.assertEqual(peers_details["127.0.0.2"], dict(PEERS_INFO["127.0.0.2"], supported_features=""))
+        self.assertEqual(set(peers_details["127.0.0.4"].values()), {"null"})
+        event = next(check_nulls_in_peers(GOSSIP_INFO, peers_details, Node), None)
+        self.assertIsNone(event)  # 127.0.0.4 is not in the gossip
+
+    def test_check_schema_agreement_in_gossip_and_peers(self):
+        class SchemaNode(Node):
+            gossip_info = GOSSIP_INFO
+            peers_info = PEERS_INFO
+
+            def get_gossip_info(self):
+                return self.gossip_info
+
+            def get_peers_info(self):
+                return self.peers_info
+
+        self.assertTrue(check_schema_agreement_in_gossip_and_peers(SchemaNode(), retries=1))
+        node = SchemaNode()
+        node.peers_info = deepcopy(PEERS_INFO)
+        node.peers_info["127.0.0.3"]["schema_version"] = "54f0a0a6-4ae2-3e14-9edb-2e5b4a1f4d1c"
+        self.assertFalse(check_schema_agreement_in_gossip_and_peers(node, retries=1))